@@ -20,7 +20,7 @@
 
 """This file contains the version of the Translate Toolkit."""
 
-build = 13001
+build = 13002
 """The build number is used by external users of the Translate Toolkit to
 trigger refreshes.  Thus increase the build number whenever changes are made to
 code touching stats or quality checks.  An increased build number will force a
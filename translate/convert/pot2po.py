@@ -111,9 +111,9 @@ def _prepare_merge(input_store, output_store, template_store, **kwargs):
                                       template_store, **kwargs)
 
     # Generate an index so we can search by source string and location later on
-    input_store.makeindex()
+    input_store.require_index()
     if template_store:
-        template_store.makeindex()
+        template_store.require_index()
 
 
 def _store_pre_merge(input_store, output_store, template_store, **kwargs):
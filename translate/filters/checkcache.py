@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2015 Zuza Software Foundation
+#
+# This file is part of translate.
+#
+# translate is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# translate is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>.
+
+"""A cache of check results that is kept between runs.
+
+Units are looked up by a hash of everything the checks look at: the source
+and target strings, the locations and the state of the unit, together with
+the checker classes, filters and configuration, and the toolkit build.  A
+unit that did not change since an earlier run gets the failures of that run
+without running any checks.
+"""
+
+import hashlib
+import json
+import os
+from sqlite3 import dbapi2
+
+from translate import __version__ as toolkitversion
+
+
+def checkersignature(checker):
+    """Returns a string that describes everything about ``checker`` that
+    influences the check results.
+
+    :param checker: A :class:`~translate.filters.checks.UnitChecker` or a
+                    :class:`~translate.filters.checks.TeeChecker`.
+    """
+    signature = []
+    for unitchecker in getattr(checker, "checkers", [checker]):
+        config = []
+        for name, value in sorted(unitchecker.config.__dict__.iteritems()):
+            if isinstance(value, dict):
+                value = sorted(value.iteritems())
+            config.append((name, value))
+        signature.append((unitchecker.__class__.__module__,
+                          unitchecker.__class__.__name__,
+                          sorted(unitchecker.defaultfilters), config))
+    return repr(signature)
+
+
+def unitstrings(strings):
+    """Returns a list of the (plural) strings in ``strings``."""
+    if strings is None:
+        return []
+    return [unicode(string) for string in getattr(strings, "strings", [strings])]
+
+
+def unitdata(unit):
+    """Returns everything about ``unit`` that influences the check results."""
+    if getattr(unit, "getalttrans", None):
+        hasalttrans = bool(unit.getalttrans())
+    else:
+        hasalttrans = False
+    return (unitstrings(unit.source), unitstrings(unit.target),
+            unit.hasplural(), unit.getlocations(), unit.isfuzzy(),
+            unit.isreview(), hasalttrans)
+
+
+class CheckCache(object):
+    """Runs the checks of a checker on units, reusing the results of earlier
+    runs for units that did not change.
+
+    The results are stored in an SQLite database.  Call :meth:`commit` to
+    save the new results, for example after every file.
+    """
+
+    def __init__(self, checker, cachefile):
+        self.checker = checker
+        self.cachefile = os.path.realpath(cachefile)
+        self.checkerkey = hashlib.sha1(repr((toolkitversion.build,
+                                             checkersignature(checker)))).hexdigest()
+        self.con = None
+        self._pid = None
+
+    def _connect(self):
+        """Connects to the database, again in every process that the cache
+        was forked into.
+        """
+        if self._pid == os.getpid():
+            return
+        # sqlite needs to get the name in utf-8 on all platforms
+        cachefile = self.cachefile
+        if isinstance(cachefile, unicode):
+            cachefile = cachefile.encode('utf-8')
+        self.con = dbapi2.connect(cachefile, timeout=60)
+        self.con.execute("""CREATE TABLE IF NOT EXISTS checks(
+            unitkey     TEXT PRIMARY KEY,
+            failures    TEXT NOT NULL);""")
+        self.con.commit()
+        self._pid = os.getpid()
+
+    def unitkey(self, unit):
+        """Returns the key of the check results of ``unit``."""
+        return hashlib.sha1(self.checkerkey + repr(unitdata(unit))).hexdigest()
+
+    def run_filters(self, unit, categorised=False):
+        """Returns the failures of ``unit``, like
+        :meth:`~translate.filters.checks.UnitChecker.run_filters`.
+        """
+        checkers = getattr(self.checker, "checkers", [self.checker])
+        if [checker for checker in checkers
+            if getattr(checker, "suggestion_store", None)]:
+            # The suggestions are not part of the key
+            return self.checker.run_filters(unit, categorised)
+
+        self._connect()
+        unitkey = self.unitkey(unit)
+        row = self.con.execute("""SELECT failures FROM checks
+            WHERE unitkey=?;""", (unitkey,)).fetchone()
+        if row is None:
+            failures = self.checker.run_filters(unit, categorised=True)
+            self.con.execute("""INSERT OR REPLACE INTO checks
+                VALUES (?, ?);""", (unitkey, json.dumps(failures)))
+        else:
+            failures = json.loads(row[0])
+
+        if not categorised:
+            failures = dict([(name, info['message'])
+                             for name, info in failures.iteritems()])
+        return failures
+
+    def run_filters_bulk(self, units, categorised=False):
+        """Returns the failures of every unit in ``units``, like
+        :meth:`~translate.filters.checks.TeeChecker.run_filters_bulk`.  Only
+        the units that are not in the cache are checked.
+        """
+        checkers = getattr(self.checker, "checkers", [self.checker])
+        if [checker for checker in checkers
+            if getattr(checker, "suggestion_store", None)]:
+            # The suggestions are not part of the key
+            return self.checker.run_filters_bulk(units, categorised)
+
+        self._connect()
+        allfailures = []
+        missing = []
+        for unit in units:
+            unitkey = self.unitkey(unit)
+            row = self.con.execute("""SELECT failures FROM checks
+                WHERE unitkey=?;""", (unitkey,)).fetchone()
+            if row is None:
+                allfailures.append(None)
+                missing.append((len(allfailures) - 1, unitkey, unit))
+            else:
+                allfailures.append(json.loads(row[0]))
+
+        if missing:
+            newfailures = self.checker.run_filters_bulk(
+                    [unit for index, unitkey, unit in missing], categorised=True)
+            for (index, unitkey, unit), failures in zip(missing, newfailures):
+                allfailures[index] = failures
+            self.con.executemany("""INSERT OR REPLACE INTO checks
+                VALUES (?, ?);""", [(unitkey, json.dumps(failures))
+                                    for (index, unitkey, unit), failures
+                                    in zip(missing, newfailures)])
+
+        if not categorised:
+            allfailures = [dict([(name, info['message'])
+                                 for name, info in failures.iteritems()])
+                           for failures in allfailures]
+        return allfailures
+
+    def commit(self):
+        """Saves the results that were added to the cache."""
+        if self.con is not None and self._pid == os.getpid():
+            self.con.commit()
+
+    def close(self):
+        """Saves the results and closes the database."""
+        self.commit()
+        if self.con is not None and self._pid == os.getpid():
+            self.con.close()
+        self.con = None
+        self._pid = None
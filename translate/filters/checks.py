@@ -30,8 +30,10 @@ When adding a new test here, please document and explain their behaviour on the
 :doc:`pofilter tests </commands/pofilter_tests>` page.
 """
 
+import json
 import logging
 import re
+from timeit import default_timer
 
 from translate.filters import decoration, helpers, prefilters, spelling
 from translate.filters.decorators import (cosmetic, critical, extraction,
@@ -270,10 +272,19 @@ class CheckerConfig(object):
         self.lang = factory.getlanguage(langcode)
 
 
-def cache_results(f):
+def cache_results(f, usesconfig=True):
+    """Caches the results of ``f`` in the checker's ``results_cache``.
+
+    The cache can be shared by the checkers of a :class:`TeeChecker`, so
+    unless ``usesconfig`` is False the key also includes the accelerator and
+    variable markers of the checker.
+    """
 
     def cached_f(self, param1):
-        key = (f.__name__, param1)
+        if usesconfig:
+            key = (f, self._prefilterkey, param1)
+        else:
+            key = (f, param1)
         res_cache = self.results_cache
 
         if key in res_cache:
@@ -286,6 +297,165 @@ def cache_results(f):
     return cached_f
 
 
+def bulkcheck(quickpass):
+    """Adds a ``quickpass`` function to a test of a :class:`TranslationChecker`,
+    for :meth:`~TranslationChecker.run_filters_bulk`.
+
+    ``quickpass(strs1, strs2)`` gets the source and target strings of many
+    units, and returns a list with a true value for every pair of strings that
+    certainly passes the test.  The test itself only runs on the others.
+    """
+
+    def addquickpass(f):
+        f.quickpass = quickpass
+        return f
+
+    return addquickpass
+
+
+def _getstrings(unit, results_cache):
+    """Returns the normalised source and target of ``unit``, caching them in
+    ``results_cache``."""
+    strings = results_cache.get("strings")
+    if strings is None:
+        strings = (data.normalized_unicode(unit.source) or u"",
+                   data.normalized_unicode(unit.target) or u"")
+        results_cache["strings"] = strings
+    return strings
+
+
+def _containsnone(strings, substrings):
+    """Returns whether none of ``strings`` contains any of ``substrings``,
+    searching all the strings at once."""
+    joined = u"\0".join(strings)
+    for substring in substrings:
+        if substring in joined:
+            return False
+    return True
+
+
+def _passes_untranslated(strs1, strs2):
+    # KDE comments are only removed from targets that contain "_:"
+    return [not str1.strip() or (str2 and u"_:" not in str2)
+            for str1, str2 in zip(strs1, strs2)]
+
+
+def _passes_blank(strs1, strs2):
+    return [not str2 or str2.strip() or not str1.strip()
+            for str1, str2 in zip(strs1, strs2)]
+
+
+def _isshort(str1, str2):
+    """Returns whether str2 is much shorter than str1, for the ``short``
+    check and its quickpass."""
+    len1 = len(str1.strip())
+    len2 = len(str2.strip())
+    return (len1 > 0) and (0 < len2 < (len1 * 0.1)) or ((len1 > 1) and (len2 == 1))
+
+
+def _islong(str1, str2):
+    """Returns whether str2 is much longer than str1, for the ``long`` check
+    and its quickpass."""
+    len1 = len(str1.strip())
+    len2 = len(str2.strip())
+    return (len1 > 0) and (0 < len1 < (len2 * 0.1)) or ((len1 == 1) and (len2 > 1))
+
+
+def _passes_short(strs1, strs2):
+    return [not _isshort(str1, str2) for str1, str2 in zip(strs1, strs2)]
+
+
+def _passes_long(strs1, strs2):
+    return [not _islong(str1, str2) for str1, str2 in zip(strs1, strs2)]
+
+
+def _passes_startwhitespace(strs1, strs2):
+    return [not str1[:1].isspace() and not str2[:1].isspace()
+            for str1, str2 in zip(strs1, strs2)]
+
+
+def _passes_without(substrings):
+    """Returns a quickpass function that passes the strings that don't contain
+    any of ``substrings``."""
+
+    def passes_without(strs1, strs2):
+        if _containsnone(strs1, substrings) and _containsnone(strs2, substrings):
+            return [True] * len(strs1)
+        return [_containsnone((str1, str2), substrings)
+                for str1, str2 in zip(strs1, strs2)]
+
+    return passes_without
+
+
+class CheckProfile(object):
+    """Counts the calls, time, failures and exceptions of every check.
+
+    Use :meth:`UnitChecker.setprofile` to profile the checks of a checker.
+    Exceptions include the :exc:`FilterFailure` exceptions of failed checks.
+    """
+
+    def __init__(self):
+        #: {checkname: [calls, time, failures, exceptions]}
+        self.stats = {}
+
+    def add(self, checkname, elapsed, calls=1, failures=0, exceptions=0):
+        """Adds the time and counts of running a check."""
+        stats = self.stats.get(checkname)
+        if stats is None:
+            stats = self.stats[checkname] = [0, 0.0, 0, 0]
+        stats[0] += calls
+        stats[1] += elapsed
+        stats[2] += failures
+        stats[3] += exceptions
+
+    def update(self, stats):
+        """Adds the ``stats`` of another profile, for example of another
+        process."""
+        for checkname, (calls, elapsed, failures, exceptions) in stats.iteritems():
+            self.add(checkname, elapsed, calls, failures, exceptions)
+
+    def format(self, format="table"):
+        """Returns the profile as a table sorted by time, or as JSON."""
+        checknames = sorted(self.stats, key=lambda checkname:
+                            (-self.stats[checkname][1], checkname))
+        if format == "json":
+            return json.dumps([{"check": checkname,
+                                "calls": self.stats[checkname][0],
+                                "time": self.stats[checkname][1],
+                                "failures": self.stats[checkname][2],
+                                "exceptions": self.stats[checkname][3]}
+                               for checkname in checknames], indent=2)
+        lines = ["%-24s %10s %10s %10s %10s" % ("check", "calls", "time (s)",
+                                                "failures", "exceptions")]
+        for checkname in checknames:
+            calls, elapsed, failures, exceptions = self.stats[checkname]
+            lines.append("%-24s %10d %10.3f %10d %10d" %
+                         (checkname, calls, elapsed, failures, exceptions))
+        return "\n".join(lines)
+
+
+def _profiled(functionname, filterfunction, profile):
+    """Returns a version of a test that adds its calls to ``profile``."""
+
+    def profiledfunction(*args):
+        start = default_timer()
+        try:
+            filterresult = filterfunction(*args)
+        except FilterFailure:
+            profile.add(functionname, default_timer() - start, failures=1,
+                        exceptions=1)
+            raise
+        except Exception:
+            profile.add(functionname, default_timer() - start, exceptions=1)
+            raise
+        profile.add(functionname, default_timer() - start,
+                    failures=int(not filterresult))
+        return filterresult
+
+    profiledfunction.quickpass = getattr(filterfunction, "quickpass", None)
+    return profiledfunction
+
+
 class UnitChecker(object):
     """Parent Checker class which does the checking based on functions available
     in derived classes.
@@ -296,6 +466,10 @@ class UnitChecker(object):
     #: Function names are used as keys, categories are the values
     categories = {}
 
+    _plan = None
+
+    #: The :class:`CheckProfile` that the checks are counted in, if any
+    profile = None
 
     def __init__(self, checkerconfig=None, excludefilters=None,
                  limitfilters=None, errorhandler=None):
@@ -361,6 +535,8 @@ class UnitChecker(object):
         self.removevarfilter = [prefilters.filtervariables(startmatch, endmatch,
                                                            prefilters.varnone)
                 for startmatch, endmatch in self.config.varmatches]
+        self._prefilterkey = (tuple(self.config.accelmarkers),
+                              tuple(self.config.varmatches))
 
 
     def setsuggestionstore(self, store):
@@ -399,13 +575,43 @@ class UnitChecker(object):
         equivalents.
         """
         return prefilters.filterwordswithpunctuation(str1)
-    filterwordswithpunctuation = cache_results(filterwordswithpunctuation)
+    filterwordswithpunctuation = cache_results(filterwordswithpunctuation, usesconfig=False)
 
 
     def filterxml(self, str1):
         """Filter out XML from the string so only text remains."""
         return tag_re.sub("", str1)
-    filterxml = cache_results(filterxml)
+    filterxml = cache_results(filterxml, usesconfig=False)
+
+
+    def gettags(self, str1):
+        """Returns the XML tags in ``str1``."""
+        return tag_re.findall(str1)
+    gettags = cache_results(gettags, usesconfig=False)
+
+
+    def getfunctions(self, str1):
+        """Returns the function names in ``str1``."""
+        return decoration.getfunctions(str1)
+    getfunctions = cache_results(getfunctions, usesconfig=False)
+
+
+    def getemails(self, str1):
+        """Returns the e-mail addresses in ``str1``."""
+        return decoration.getemails(str1)
+    getemails = cache_results(getemails, usesconfig=False)
+
+
+    def geturls(self, str1):
+        """Returns the URLs in ``str1``."""
+        return decoration.geturls(str1)
+    geturls = cache_results(geturls, usesconfig=False)
+
+
+    def getnumbers(self, str1):
+        """Returns the numbers in ``str1``."""
+        return decoration.getnumbers(str1)
+    getnumbers = cache_results(getnumbers, usesconfig=False)
 
 
     def run_test(self, test, unit):
@@ -415,23 +621,34 @@ class UnitChecker(object):
         """
         return test(unit)
 
-    def run_filters(self, unit, categorised=False):
-        """Run all the tests in this suite.
+    def _getplan(self):
+        """Returns the plan that :meth:`run_filters` follows for every unit.
 
-        :rtype: Dictionary
-        :return: Content of the dictionary is as follows::
-
-           {'testname': { 'message': message_or_exception, 'category': failure_category } }
+        The plan is a list of ``(functionname, filterfunction, message,
+        isdefault, bit, ignoremask)`` tuples, with the
+        preconditions first.  Every test has its own bit, and the
+        ignoremask of a precondition has the bits of the tests to ignore
+        when it fails.  The plan is compiled once, and again if the
+        filters, preconditions or language change.
         """
-        self.results_cache = {}
-        failures = {}
-        ignores = self.config.lang.ignoretests[:]
-        functionnames = self.defaultfilters.keys()
-        priorityfunctionnames = self.preconditions.keys()
-        otherfunctionnames = filter(lambda functionname: functionname not in self.preconditions, functionnames)
-
-        for functionname in priorityfunctionnames + otherfunctionnames:
-            if functionname in ignores:
+        lang = self.config.lang
+        if self._plan is not None:
+            (defaultfilters, filtercount, preconditions, planlang, ignorecount,
+             profile, plan) = self._plan
+            if (defaultfilters is self.defaultfilters and
+                filtercount == len(self.defaultfilters) and
+                preconditions is self.preconditions and planlang is lang and
+                ignorecount == len(lang.ignoretests) and
+                profile is self.profile):
+                return plan
+
+        functionnames = [functionname for functionname in self.preconditions] + \
+                [functionname for functionname in self.defaultfilters
+                 if functionname not in self.preconditions]
+        steps = []
+        bits = {}
+        for functionname in functionnames:
+            if functionname in lang.ignoretests:
                 continue
 
             filterfunction = getattr(self, functionname, None)
@@ -441,33 +658,83 @@ class UnitChecker(object):
             if filterfunction is None:
                 continue
 
+            bits[functionname] = 1 << len(steps)
+            steps.append((functionname, filterfunction))
+
+        plan = []
+        for functionname, filterfunction in steps:
+            ignoremask = 0
+            for ignoredfunctionname in self.preconditions.get(functionname, ()):
+                ignoremask |= bits.get(ignoredfunctionname, 0)
             filtermessage = filterfunction.__doc__
+            if self.profile is not None:
+                filterfunction = _profiled(functionname, filterfunction,
+                                           self.profile)
+            plan.append((functionname, filterfunction, filtermessage,
+                         functionname in self.defaultfilters,
+                         bits[functionname], ignoremask))
+
+        self._plan = (self.defaultfilters, len(self.defaultfilters),
+                      self.preconditions, lang, len(lang.ignoretests),
+                      self.profile, plan)
+        return plan
+
+    def setprofile(self, profile):
+        """Counts the calls, time, failures and exceptions of the checks in
+        the given :class:`CheckProfile`, or stops counting if it is None."""
+        self.profile = profile
+
+    def _runfilter(self, functionname, filterfunction, filtermessage, unit):
+        """Runs one test on ``unit``, and returns the result and the message
+        of the test."""
+        try:
+            return self.run_test(filterfunction, unit), filtermessage
+        except FilterFailure as e:
+            return False, unicode(e)
+        except Exception as e:
+            if self.errorhandler is None:
+                raise ValueError("error in filter %s: %r, %r, %s" %
+                                 (functionname, unit.source, unit.target, e))
+            else:
+                return self.errorhandler(functionname, unit.source,
+                                         unit.target, e), filtermessage
 
-            try:
-                filterresult = self.run_test(filterfunction, unit)
-            except FilterFailure as e:
-                filterresult = False
-                filtermessage = unicode(e)
-            except Exception as e:
-                if self.errorhandler is None:
-                    raise ValueError("error in filter %s: %r, %r, %s" %
-                                     (functionname, unit.source, unit.target, e))
-                else:
-                    filterresult = self.errorhandler(functionname, unit.source,
-                                                     unit.target, e)
+    def run_filters(self, unit, categorised=False, results_cache=None):
+        """Run all the tests in this suite.
+
+        :param results_cache: Cache of prefilter results for this unit,
+            shared with other checkers that run on the same unit.
+        :rtype: Dictionary
+        :return: Content of the dictionary is as follows::
+
+           {'testname': { 'message': message_or_exception, 'category': failure_category } }
+        """
+        if results_cache is None:
+            results_cache = {}
+        self.results_cache = results_cache
+        failures = {}
+        ignored = 0
+        runfilter = self._runfilter
+
+        for (functionname, filterfunction, filtermessage, isdefault, bit,
+             ignoremask) in self._getplan():
+            if ignored & bit:
+                continue
+
+            filterresult, filtermessage = runfilter(functionname, filterfunction,
+                                                    filtermessage, unit)
 
             if not filterresult:
                 # We test some preconditions that aren't actually a cause for
                 # failure
-                if functionname in self.defaultfilters:
+                if isdefault:
+                    # The category is only known once the test has run
                     failures[functionname] = {
                             'message': filtermessage,
                             'category': self.categories[functionname],
                             }
 
-                if functionname in self.preconditions:
-                    for ignoredfunctionname in self.preconditions[functionname]:
-                        ignores.append(ignoredfunctionname)
+                ignored |= ignoremask
 
         self.results_cache = {}
 
@@ -476,6 +743,19 @@ class UnitChecker(object):
                 failures[name] = info['message']
         return failures
 
+    def run_filters_bulk(self, units, categorised=False, results_caches=None):
+        """Run all the tests in this suite on many units.
+
+        :param results_caches: Caches of prefilter results, one for every
+            unit.
+        :return: A list with the failures of every unit, as returned by
+            :meth:`run_filters`
+        """
+        if results_caches is None:
+            results_caches = [{} for unit in units]
+        return [self.run_filters(unit, categorised, results_cache)
+                for unit, results_cache in zip(units, results_caches)]
+
 
 class TranslationChecker(UnitChecker):
     """A checker that passes source and target strings to the checks, not the
@@ -490,8 +770,8 @@ class TranslationChecker(UnitChecker):
                                                  limitfilters, errorhandler)
 
         # caches for spell checking results across units/runs
-        self.source_spell_cache = lru.LRUCachingDict(256, cullsize=5, aggressive_gc=False)
-        self.target_spell_cache = lru.LRUCachingDict(512, cullsize=5, aggressive_gc=False)
+        self.source_spell_cache = lru.LRUCache(256)
+        self.target_spell_cache = lru.LRUCache(512)
 
     def run_test(self, test, unit):
         """Runs the given test on the given unit.
@@ -519,16 +799,90 @@ class TranslationChecker(UnitChecker):
             return test(self.str1, self.str2)
 
 
-    def run_filters(self, unit, categorised=False):
+    def run_filters(self, unit, categorised=False, results_cache=None):
         """Do some optimisation by caching some data of the unit for the
         benefit of :meth:`~TranslationChecker.run_test`.
         """
-        self.str1 = data.normalized_unicode(unit.source) or u""
-        self.str2 = data.normalized_unicode(unit.target) or u""
+        if results_cache is None:
+            results_cache = {}
+
+        self.str1, self.str2 = _getstrings(unit, results_cache)
         self.hasplural = unit.hasplural()
         self.locations = unit.getlocations()
 
-        return super(TranslationChecker, self).run_filters(unit, categorised)
+        return super(TranslationChecker, self).run_filters(unit, categorised,
+                                                           results_cache)
+
+    def run_filters_bulk(self, units, categorised=False, results_caches=None):
+        """Run all the tests in this suite on many units at once.
+
+        Every test runs on all the units before the next test.  A test with
+        a ``quickpass`` function (see :func:`bulkcheck`) first runs that on
+        the strings of all the units, and then only on the units that might
+        fail it.  Units with plurals are checked one by one.
+
+        :param results_caches: Caches of prefilter results, one for every
+            unit.
+        :return: A list with the failures of every unit, as returned by
+            :meth:`run_filters`
+        """
+        if results_caches is None:
+            results_caches = [{} for unit in units]
+        allfailures = []
+        ignored = [0] * len(units)
+        bulkunits = []
+
+        for index, (unit, results_cache) in enumerate(zip(units, results_caches)):
+            if unit.hasplural():
+                allfailures.append(self.run_filters(unit, True, results_cache))
+            else:
+                allfailures.append({})
+                bulkunits.append((index, unit, results_cache,
+                                  _getstrings(unit, results_cache),
+                                  unit.getlocations()))
+
+        self.hasplural = False
+        runfilter = self._runfilter
+        for (functionname, filterfunction, filtermessage, isdefault, bit,
+             ignoremask) in self._getplan():
+            candidates = [bulkunit for bulkunit in bulkunits
+                          if not ignored[bulkunit[0]] & bit]
+            quickpass = getattr(filterfunction, "quickpass", None)
+            if quickpass is not None and candidates:
+                start = default_timer()
+                passes = quickpass([bulkunit[3][0] for bulkunit in candidates],
+                                   [bulkunit[3][1] for bulkunit in candidates])
+                numcandidates = len(candidates)
+                candidates = [bulkunit for bulkunit, passed in zip(candidates, passes)
+                              if not passed]
+                if self.profile is not None:
+                    # The units that pass quickly count as calls as well
+                    self.profile.add(functionname, default_timer() - start,
+                                     calls=numcandidates - len(candidates))
+
+            for index, unit, results_cache, strings, locations in candidates:
+                self.results_cache = results_cache
+                self.str1, self.str2 = strings
+                self.locations = locations
+                filterresult, message = runfilter(functionname, filterfunction,
+                                                  filtermessage, unit)
+
+                if not filterresult:
+                    if isdefault:
+                        allfailures[index][functionname] = {
+                                'message': message,
+                                'category': self.categories[functionname],
+                                }
+
+                    ignored[index] |= ignoremask
+
+        self.results_cache = {}
+
+        if not categorised:
+            for failures in allfailures:
+                for name, info in failures.iteritems():
+                    failures[name] = info['message']
+        return allfailures
 
 
 class TeeChecker:
@@ -594,13 +948,33 @@ class TeeChecker:
     def run_filters(self, unit, categorised=False):
         """Run all the tests in the checker's suites."""
         failures = {}
+        # The checkers share the normalised strings and prefilter results
+        results_cache = {}
 
         for checker in self.checkers:
-            failures.update(checker.run_filters(unit, categorised))
+            failures.update(checker.run_filters(unit, categorised,
+                                                results_cache))
 
         return failures
 
 
+    def run_filters_bulk(self, units, categorised=False):
+        """Run all the tests in the checker's suites on many units.
+
+        :return: A list with the failures of every unit
+        """
+        allfailures = [{} for unit in units]
+        results_caches = [{} for unit in units]
+
+        for checker in self.checkers:
+            checkerfailures = checker.run_filters_bulk(units, categorised,
+                                                       results_caches)
+            for failures, unitfailures in zip(allfailures, checkerfailures):
+                failures.update(unitfailures)
+
+        return allfailures
+
+
     def setsuggestionstore(self, store):
         """Sets the filename that a checker should use for evaluating
         suggestions.
@@ -609,10 +983,18 @@ class TeeChecker:
             checker.setsuggestionstore(store)
 
 
+    def setprofile(self, profile):
+        """Counts the checks of all the checkers in the given
+        :class:`CheckProfile`."""
+        for checker in self.checkers:
+            checker.setprofile(profile)
+
+
 class StandardChecker(TranslationChecker):
     """The basic test suite for source -> target translations."""
 
 
+    @bulkcheck(_passes_untranslated)
     @extraction
     def untranslated(self, str1, str2):
         """Checks whether a string has been translated at all."""
@@ -654,6 +1036,7 @@ class StandardChecker(TranslationChecker):
         return True
 
 
+    @bulkcheck(_passes_blank)
     @functional
     def blank(self, str1, str2):
         """Checks whether a translation only contains spaces."""
@@ -666,29 +1049,25 @@ class StandardChecker(TranslationChecker):
             return True
 
 
+    @bulkcheck(_passes_short)
     @functional
     def short(self, str1, str2):
         """Checks whether a translation is much shorter than the original
         string.
         """
-        len1 = len(str1.strip())
-        len2 = len(str2.strip())
-
-        if (len1 > 0) and (0 < len2 < (len1 * 0.1)) or ((len1 > 1) and (len2 == 1)):
+        if _isshort(str1, str2):
             raise FilterFailure(u"The translation is much shorter than the original")
         else:
             return True
 
 
+    @bulkcheck(_passes_long)
     @functional
     def long(self, str1, str2):
         """Checks whether a translation is much longer than the original
         string.
         """
-        len1 = len(str1.strip())
-        len2 = len(str2.strip())
-
-        if (len1 > 0) and (0 < len1 < (len2 * 0.1)) or ((len1 == 1) and (len2 > 1)):
+        if _islong(str1, str2):
             raise FilterFailure(u"The translation is much longer than the original")
         else:
             return True
@@ -708,6 +1087,7 @@ class StandardChecker(TranslationChecker):
             return True
 
 
+    @bulkcheck(_passes_without((u"\n", u"\r")))
     @critical
     def newlines(self, str1, str2):
         """Checks whether newlines are consistent between the two strings."""
@@ -723,6 +1103,7 @@ class StandardChecker(TranslationChecker):
         return True
 
 
+    @bulkcheck(_passes_without((u"\t",)))
     @critical
     def tabs(self, str1, str2):
         """Checks whether tabs are consistent between the two strings."""
@@ -765,6 +1146,7 @@ class StandardChecker(TranslationChecker):
             raise FilterFailure(u"Different quotation marks")
 
 
+    @bulkcheck(_passes_without((u"  ",)))
     @cosmetic
     def doublespacing(self, str1, str2):
         """Checks for bad double-spaces by comparing to original."""
@@ -1009,7 +1391,7 @@ class StandardChecker(TranslationChecker):
     def functions(self, str1, str2):
         """Checks that function names are not translated."""
         # We can't just use helpers.funcmatch() since it doesn't ignore order
-        if not set(decoration.getfunctions(str1)).symmetric_difference(set(decoration.getfunctions(str2))):
+        if not set(self.getfunctions(str1)).symmetric_difference(set(self.getfunctions(str2))):
             return True
         else:
             raise FilterFailure(u"Different functions")
@@ -1018,7 +1400,7 @@ class StandardChecker(TranslationChecker):
     @functional
     def emails(self, str1, str2):
         """Checks that emails are not translated."""
-        if helpers.funcmatch(str1, str2, decoration.getemails):
+        if helpers.funcmatch(str1, str2, self.getemails):
             return True
         else:
             raise FilterFailure(u"Different e-mails")
@@ -1027,7 +1409,7 @@ class StandardChecker(TranslationChecker):
     @functional
     def urls(self, str1, str2):
         """Checks that URLs are not translated."""
-        if helpers.funcmatch(str1, str2, decoration.geturls):
+        if helpers.funcmatch(str1, str2, self.geturls):
             return True
         else:
             raise FilterFailure(u"Different URLs")
@@ -1038,12 +1420,13 @@ class StandardChecker(TranslationChecker):
         """Checks whether numbers of various forms are consistent between the
         two strings.
         """
-        if helpers.countsmatch(str1, str2, decoration.getnumbers(str1)):
+        if helpers.countsmatch(str1, str2, self.getnumbers(str1)):
             return True
         else:
             raise FilterFailure(u"Different numbers")
 
 
+    @bulkcheck(_passes_startwhitespace)
     @cosmetic
     def startwhitespace(self, str1, str2):
         """Checks whether whitespace at the beginning of the strings
@@ -1371,13 +1754,13 @@ class StandardChecker(TranslationChecker):
     @critical
     def xmltags(self, str1, str2):
         """Checks that XML/HTML tags have not been translated."""
-        tags1 = tag_re.findall(str1)
+        tags1 = self.gettags(str1)
 
         if len(tags1) > 0:
             if (len(tags1[0]) == len(str1)) and not u"=" in tags1[0]:
                 return True
 
-            tags2 = tag_re.findall(str2)
+            tags2 = self.gettags(str2)
             properties1 = tagproperties(tags1, self.config.ignoretags)
             properties2 = tagproperties(tags2, self.config.ignoretags)
 
@@ -1397,7 +1780,7 @@ class StandardChecker(TranslationChecker):
         else:
             # No tags in str1, let's just check that none were added in str2.
             # This might be useful for fuzzy strings wrongly unfuzzied.
-            tags2 = tag_re.findall(str2)
+            tags2 = self.gettags(str2)
 
             if len(tags2) > 0:
                 raise FilterFailure(u"Added XML tags")
@@ -1474,12 +1857,22 @@ class StandardChecker(TranslationChecker):
         # way we can reuse most of the results while someone is typing a long
         # segment in Virtaal.
         sentences2 = self.config.lang.sentences(str2)
+        uncached = []
         for sentence in sentences2:
             sentence_errors = self.target_spell_cache.get(sentence, None)
             if sentence_errors is None:
-                sentence_errors = spelling.simple_check(sentence, lang=self.config.targetlanguage)
+                uncached.append(sentence)
+            else:
+                errors.update(sentence_errors)
+
+        # The other sentences are checked together, so that every word is
+        # only looked up once
+        if uncached:
+            batch_errors = spelling.check_batch(uncached, lang=self.config.targetlanguage)
+            for sentence, sentence_errors in zip(uncached, batch_errors):
+                sentence_errors = set(sentence_errors)
                 self.target_spell_cache[sentence] = sentence_errors
-            errors.update(sentence_errors)
+                errors.update(sentence_errors)
 
         errors.difference_update(ignore1, self.config.notranslatewords)
 
@@ -21,6 +21,7 @@
 """functions to get decorative/informative text out of strings..."""
 
 import re
+import sys
 import unicodedata
 
 from translate.lang import data
@@ -119,27 +120,59 @@ def isvalidaccelerator(accelerator, acceptlist=None):
         return decomposition.count(" ") == 0
 
 
+_marker_res = {}
+"""The compiled regular expressions of the accelerator and variable
+markers"""
+
+
+def _getaccelerator_re(accelmarker):
+    """returns the regular expression that finds the accelerators marked with
+    a given marker"""
+    accelerator_re = _marker_res.get(accelmarker)
+    if accelerator_re is None:
+        # we assume accelerators are single characters
+        accelerator_re = re.compile(re.escape(accelmarker) + u"(.)",
+                                    re.UNICODE | re.DOTALL)
+        _marker_res[accelmarker] = accelerator_re
+    return accelerator_re
+
+
+def _getvariable_re(startmarker, endmarker):
+    """returns the regular expression that finds the variables marked with a
+    given marker"""
+    key = (startmarker, endmarker)
+    variable_re = _marker_res.get(key)
+    if variable_re is None:
+        start = re.escape(startmarker)
+        if endmarker is None:
+            # without an end marker the variable ends at any non-alphanumeric
+            # character. If there is none right after the start marker, the
+            # rest of the string is taken
+            pattern = start + u"(?:(\w+)|(.*))"
+        elif type(endmarker) == int:
+            # setting endmarker to an int means it is a fixed-length
+            # variable string (usually endmarker==1)
+            pattern = start + u"(.{%d})" % endmarker
+        else:
+            # the variable starts after the last start marker before the end
+            # marker
+            pattern = start + u"((?:(?!%s).)*?)%s" % (start, re.escape(endmarker))
+        variable_re = re.compile(pattern, re.UNICODE | re.DOTALL)
+        _marker_res[key] = variable_re
+    return variable_re
+
+
 def findaccelerators(str1, accelmarker, acceptlist=None):
     """returns all the accelerators and locations in str1 marked with a
     given marker"""
     accelerators = []
     badaccelerators = []
-    currentpos = 0
-    while currentpos >= 0:
-        currentpos = str1.find(accelmarker, currentpos)
-        if currentpos >= 0:
-            accelstart = currentpos
-            currentpos += len(accelmarker)
-            # we assume accelerators are single characters
-            accelend = currentpos + 1
-            if accelend > len(str1):
-                break
-            accelerator = str1[currentpos:accelend]
-            currentpos = accelend
-            if isvalidaccelerator(accelerator, acceptlist):
-                accelerators.append((accelstart, accelerator))
-            else:
-                badaccelerators.append((accelstart, accelerator))
+    for match in _getaccelerator_re(accelmarker).finditer(str1):
+        accelerator = match.group(1)
+        if isvalidaccelerator(accelerator, acceptlist):
+            accelerators.append((match.start(), accelerator))
+        else:
+            badaccelerators.append((match.start(), accelerator))
     return accelerators, badaccelerators
 
 
@@ -147,53 +180,16 @@ def findmarkedvariables(str1, startmarker, endmarker, ignorelist=[]):
     """returns all the variables and locations in str1 marked with a given
     marker"""
     variables = []
-    currentpos = 0
-    while currentpos >= 0:
-        variable = None
-        currentpos = str1.find(startmarker, currentpos)
-        if currentpos >= 0:
-            startmatch = currentpos
-            currentpos += len(startmarker)
-            if endmarker is None:
-                # handle case without an end marker - use any non-alphanumeric
-                # character as the end marker, var must be len > 1
-                endmatch = currentpos
-                for n in range(currentpos, len(str1)):
-                    if not (str1[n].isalnum() or str1[n] == '_'):
-                        endmatch = n
-                        break
-                if currentpos == endmatch:
-                    endmatch = len(str1)
-                if currentpos < endmatch:
-                    variable = str1[currentpos:endmatch]
-                currentpos = endmatch
-            elif type(endmarker) == int:
-                # setting endmarker to an int means it is a fixed-length
-                # variable string (usually endmarker==1)
-                endmatch = currentpos + endmarker
-                if endmatch > len(str1):
-                    break
-                variable = str1[currentpos:endmatch]
-                currentpos = endmatch
-            else:
-                endmatch = str1.find(endmarker, currentpos)
-                if endmatch == -1:
-                    break
-                # search backwards in case there's an intervening startmarker
-                # (if not it's OK)...
-                start2 = str1.rfind(startmarker, currentpos, endmatch)
-                if start2 != -1:
-                    startmatch2 = start2
-                    start2 += len(startmarker)
-                    if start2 != currentpos:
-                        currentpos = start2
-                        startmatch = startmatch2
-                variable = str1[currentpos:endmatch]
-                currentpos = endmatch + len(endmarker)
-            if variable is not None and variable not in ignorelist:
-                if (not variable or
-                    variable.replace("_", "").replace(".", "").isalnum()):
-                    variables.append((startmatch, variable))
+    for match in _getvariable_re(startmarker, endmarker).finditer(str1):
+        variable = match.group(1)
+        if variable is None:
+            variable = match.group(2)
+            if not variable:
+                continue
+        if variable not in ignorelist:
+            if (not variable or
+                variable.replace("_", "").replace(".", "").isalnum()):
+                variables.append((match.start(), variable))
     return variables
 
 
@@ -222,37 +218,42 @@ def getvariables(startmarker, endmarker):
     return getmarkedvariables
 
 
+# The characters for which unicode.isdigit() is true, but that \d doesn't
+# match: superscripts, subscripts, circled digits and the like
+_otherdigits = (u"\u00b2\u00b3\u00b9\u1369-\u1371\u2070\u2074-\u2079"
+                u"\u2080-\u2089\u2460-\u2468\u2474-\u247c\u2488-\u2490"
+                u"\u24ea\u24f5-\u24fd\u24ff\u2776-\u277e\u2780-\u2788"
+                u"\u278a-\u2792")
+if sys.maxunicode > 0xffff:
+    _otherdigits += (u"\U00010a40-\U00010a43\U00010e60-\U00010e68"
+                     u"\U0001f100-\U0001f10a")
+# a number starts with a digit and continues with digits, periods and
+# degree signs
+_number_re = re.compile(u"[\\d%(digits)s][\\d%(digits)s.\u00b0]*" %
+                        {"digits": _otherdigits}, re.UNICODE)
+
+
 def getnumbers(str1):
     """returns any numbers that are in the string"""
     # TODO: handle locale-based periods e.g. 2,5 for Afrikaans
     assert isinstance(str1, unicode)
     numbers = []
-    innumber = False
     degreesign = u'\xb0'
-    lastnumber = ""
-    carryperiod = ""
-    for chr1 in str1:
-        if chr1.isdigit():
-            innumber = True
-        elif innumber:
-            if not (chr1 == '.' or chr1 == degreesign):
-                innumber = False
-                if lastnumber:
-                    numbers.append(lastnumber)
-                lastnumber = ""
-        if innumber:
-            if chr1 == degreesign:
-                lastnumber += chr1
-            elif chr1 == '.':
-                carryperiod += chr1
-            else:
-                lastnumber += carryperiod + chr1
-                carryperiod = ""
-        else:
-            carryperiod = ""
-    if innumber:
-        if lastnumber:
-            numbers.append(lastnumber)
+    for number in _number_re.findall(str1):
+        if u"." in number or degreesign in number:
+            # periods are only kept before another digit
+            lastnumber = u""
+            carryperiod = u""
+            for chr1 in number:
+                if chr1 == degreesign:
+                    lastnumber += chr1
+                elif chr1 == '.':
+                    carryperiod += chr1
+                else:
+                    lastnumber += carryperiod + chr1
+                    carryperiod = u""
+            number = lastnumber
+        numbers.append(number)
     return numbers
 
 
@@ -29,9 +29,11 @@ http://docs.translatehouse.org/projects/translate-toolkit/en/latest/commands/pof
 for full descriptions of all tests.
 """
 
+import multiprocessing
 import os
+import sys
 
-from translate.filters import autocorrect, checks
+from translate.filters import autocorrect, checkcache, checks, spelling
 from translate.misc import optrecurse
 from translate.storage import factory
 from translate.storage.poheader import poheader
@@ -91,6 +93,18 @@ class pocheckfilter:
                                          checkerclasses=checkerclasses,
                                          languagecode=checkerconfig.targetlanguage)
         self.options = options
+        self.failurecounts = {}
+
+        self.profile = None
+        if getattr(options, "profilechecks", None):
+            self.profile = checks.CheckProfile()
+            self.checker.setprofile(self.profile)
+
+        self.checkcache = None
+        if getattr(options, "checkcache", None):
+            self.checkcache = checkcache.CheckCache(self.checker,
+                                                    options.checkcache)
+            spelling.setcachefile(options.checkcache)
 
 
     def getfilterdocs(self):
@@ -101,20 +115,50 @@ class pocheckfilter:
 
         return "\n".join(filterdocs)
 
+    def formatfailurecounts(self):
+        """Returns the number of failures of every filter over all the
+        filtered files as a table, most frequent first."""
+        filternames = sorted(self.failurecounts, key=lambda filtername:
+                             (-self.failurecounts[filtername], filtername))
+        lines = ["%-24s %10s" % ("check", "failures")]
+        for filtername in filternames:
+            lines.append("%-24s %10d" % (filtername,
+                                         self.failurecounts[filtername]))
+        return "\n".join(lines)
 
-    def filterunit(self, unit):
-        """Runs filters on an element."""
+
+    def isfiltered(self, unit):
+        """Returns whether the filters should run on a unit."""
 
         if unit.isheader():
-            return []
+            return False
 
         if not self.options.includefuzzy and unit.isfuzzy():
-            return []
+            return False
 
         if not self.options.includereview and unit.isreview():
+            return False
+
+        return True
+
+
+    def filterunit(self, unit):
+        """Runs filters on an element."""
+
+        if not self.isfiltered(unit):
             return []
 
-        failures = self.checker.run_filters(unit, categorised=True)
+        if self.checkcache is not None:
+            failures = self.checkcache.run_filters(unit, categorised=True)
+        else:
+            failures = self.checker.run_filters(unit, categorised=True)
+
+        return self.correctunit(unit, failures)
+
+
+    def correctunit(self, unit, failures):
+        """Returns the failures of a unit, or corrects the unit instead in
+        autocorrect mode."""
 
         if failures and self.options.autocorrect:
             # we can't get away with bad unquoting / requoting if we're going to change the result...
@@ -141,13 +185,22 @@ class pocheckfilter:
         newtransfile.setsourcelanguage(transfile.getsourcelanguage())
         newtransfile.settargetlanguage(transfile.gettargetlanguage())
 
-        for unit in transfile.units:
-            filter_result = self.filterunit(unit)
+        # All the units are checked together, which is faster than checking
+        # them one by one
+        units = [unit for unit in transfile.units if self.isfiltered(unit)]
+        if self.checkcache is not None:
+            allfailures = self.checkcache.run_filters_bulk(units, categorised=True)
+        else:
+            allfailures = self.checker.run_filters_bulk(units, categorised=True)
+
+        for unit, failures in zip(units, allfailures):
+            filter_result = self.correctunit(unit, failures)
 
             if filter_result:
                 if filter_result != autocorrect:
                     for filter_name in filter_result.iterkeys():
                         filter_message = filter_result[filter_name]['message']
+                        self.failurecounts[filter_name] = self.failurecounts.get(filter_name, 0) + 1
 
                         if self.options.addnotes:
                             unit.adderror(filter_name, filter_message)
@@ -156,6 +209,10 @@ class pocheckfilter:
 
                 newtransfile.addunit(unit)
 
+        if self.checkcache is not None:
+            self.checkcache.commit()
+            spelling.save()
+
         if isinstance(newtransfile, poheader):
             newtransfile.updateheader(add=True, **transfile.parseheader())
 
@@ -206,6 +263,92 @@ class FilterOptionParser(optrecurse.RecursiveOptionParser):
         else:
             self.recursiveprocess(options)
 
+            if options.summary:
+                sys.stderr.write(options.checkfilter.formatfailurecounts() + "\n")
+            if options.checkfilter.profile is not None:
+                sys.stderr.write(options.checkfilter.profile.format(
+                    options.profilechecks) + "\n")
+
+    def recursiveprocess(self, options):
+        """Recurse through directories and filter the files, using a pool
+        of processes if more than one job was requested.
+
+        The worker processes are forked, so that they inherit the checker
+        and the options. Where processes can't be forked, the files are
+        filtered one by one.
+        """
+        if (getattr(options, "jobs", 1) <= 1 or not hasattr(os, "fork") or
+            not self.isrecursive(options.input, 'input')):
+            return super(FilterOptionParser, self).recursiveprocess(options)
+
+        global _jobcontext
+        inputfiles = self.getinputfiles(options)
+        self.initprogressbar(inputfiles, options)
+        jobs = []
+        for inputpath in inputfiles:
+            filepaths = self.getfilepaths(options, inputpath)
+            if filepaths is not None:
+                jobs.append((inputpath, filepaths))
+
+        # The workers are forked from this process, so every worker starts
+        # with its own copy of the checker
+        _jobcontext = (self, options)
+        pool = multiprocessing.Pool(options.jobs)
+        try:
+            failurecounts = options.checkfilter.failurecounts
+            results = pool.imap(_filterjob, [filepaths for inputpath, filepaths in jobs])
+            # Results come back in the order of the input files
+            for (inputpath, filepaths), result in zip(jobs, results):
+                success, counts, profilestats, warning = result
+                if warning:
+                    self.warning(warning)
+                for filter_name, count in counts.iteritems():
+                    failurecounts[filter_name] = failurecounts.get(filter_name, 0) + count
+                if profilestats:
+                    options.checkfilter.profile.update(profilestats)
+                self.reportprogress(inputpath, success)
+            pool.close()
+        finally:
+            pool.terminate()
+            pool.join()
+            _jobcontext = None
+        del self.progressbar
+
+
+_jobcontext = None
+"""The parser and options of the pofilter run, for the worker processes"""
+
+
+def _filterjob(filepaths):
+    """Filters one file in a worker process.
+
+    :return: whether the file had failures, the number of failures of every
+             filter in the file, the check profile of the file if checks are
+             profiled, and a warning message if the file could not be
+             processed
+    """
+    parser, options = _jobcontext
+    fileprocessor, fullinputpath, fulloutputpath, fulltemplatepath = filepaths
+    checkfilter = options.checkfilter
+    checkfilter.failurecounts = {}
+    if checkfilter.profile is not None:
+        checkfilter.profile = checks.CheckProfile()
+        checkfilter.checker.setprofile(checkfilter.profile)
+    warning = None
+    try:
+        success = parser.processfile(fileprocessor, options, fullinputpath,
+                                     fulloutputpath, fulltemplatepath)
+    except Exception:
+        warning = parser.formatwarning(
+            "Error processing: input %s, output %s, template %s" %
+            (fullinputpath, fulloutputpath, fulltemplatepath),
+            options, sys.exc_info())
+        success = False
+    profilestats = None
+    if checkfilter.profile is not None:
+        profilestats = checkfilter.profile.stats
+    return success, checkfilter.failurecounts, profilestats, warning
+
 
 def runfilter(inputfile, outputfile, templatefile, checkfilter=None):
     """Reads in inputfile, filters using checkfilter, writes to outputfile."""
@@ -269,6 +412,17 @@ def cmdlineparser():
     parser.add_option("", "--wx", dest="filterclass",
         action="store_const", default=None, const=checks.KdeChecker,
         help="use the standard checks for wxWidgets translations")
+    parser.add_option("", "--cache", dest="checkcache", default=None,
+        type="string", metavar="FILE",
+        help="keep the check results and spelling verdicts in FILE, and only check units that changed since earlier runs")
+    parser.add_option("", "--profile-checks", dest="profilechecks",
+        type="choice", choices=["table", "json"], default=None, metavar="FORMAT",
+        help="print the calls, time, failures and exceptions of every check at the end, as a table or as json")
+    parser.add_option("", "--summary", dest="summary",
+        action="store_true", default=False,
+        help="print the number of failures of every check at the end")
+    parser.add_option("-j", "--jobs", dest="jobs", type="int", default=1,
+        metavar="N", help="check N files in parallel, where processes can be forked (default: 1)")
     parser.add_option("", "--excludefilter", dest="excludefilters",
         action="append", default=[], type="string", metavar="FILTER",
         help="don't use FILTER when filtering")
@@ -72,13 +72,15 @@ def filteraccelerators(accelmarker):
         *accelmarker*, using a given *acceptlist* filter.
         """
         acclocs, badlocs = decoration.findaccelerators(str1, accelmarker, acceptlist)
-        fstr1, pos = "", 0
+        if not acclocs:
+            return str1
+        fstr1, pos = [], 0
         for accelstart, accelerator in acclocs:
-            fstr1 += str1[pos:accelstart]
-            fstr1 += accelerator
+            fstr1.append(str1[pos:accelstart])
+            fstr1.append(accelerator)
             pos = accelstart + accelmarkerlen + len(accelerator)
-        fstr1 += str1[pos:]
-        return fstr1
+        fstr1.append(str1[pos:])
+        return "".join(fstr1)
     return filtermarkedaccelerators
 
 
@@ -137,13 +139,15 @@ def filtervariables(startmarker, endmarker, varfilter):
         """Modifies the variables in *str1* marked with a given *\*marker*,
         using a given filter."""
         varlocs = decoration.findmarkedvariables(str1, startmarker, endmarker)
-        fstr1, pos = "", 0
+        if not varlocs:
+            return str1
+        fstr1, pos = [], 0
         for varstart, variable in varlocs:
-            fstr1 += str1[pos:varstart]
-            fstr1 += varfilter(variable, startmarker, endmarker)
+            fstr1.append(str1[pos:varstart])
+            fstr1.append(varfilter(variable, startmarker, endmarker))
             pos = varstart + startmarkerlen + len(variable) + endmarkerlen
-        fstr1 += str1[pos:]
-        return fstr1
+        fstr1.append(str1[pos:])
+        return "".join(fstr1)
     return filtermarkedvariables
 
 # a list of special words with punctuation
@@ -19,20 +19,146 @@
 # You should have received a copy of the GNU General Public License
 # along with this program; if not, see <http://www.gnu.org/licenses/>.
 
-"""An API to provide spell checking for use in checks or elsewhere."""
+"""An API to provide spell checking for use in checks or elsewhere.
+
+Every distinct word is only looked up in a dictionary once. The verdicts can
+also be kept in a database with :func:`setcachefile`, so that later runs don't
+need to look up the words again. The verdicts are kept per dictionary, so that
+they are looked up again when a different dictionary or version of enchant is
+used.
+"""
 
 import logging
+import os
+from sqlite3 import dbapi2
 
 
 logger = logging.getLogger(__name__)
 
 available = False
 
+enchantversion = u""
+"""The version of the enchant library, which is part of the dictionary names"""
+
+cachefile = None
+"""The database that keeps the verdicts between runs, if any"""
+
+verdicts = {}
+"""The verdicts of the words looked up so far: {dictionary: {word: correct}}"""
+
+_newverdicts = {}
+"""The verdicts that are not saved in the cache file yet"""
+
+
+def _connect():
+    con = dbapi2.connect(cachefile, timeout=60)
+    con.execute("""CREATE TABLE IF NOT EXISTS spellingverdicts(
+        dictionary  TEXT NOT NULL,
+        word        TEXT NOT NULL,
+        correct     INTEGER NOT NULL,
+        PRIMARY KEY (dictionary, word));""")
+    return con
+
+
+def setcachefile(filename):
+    """Keeps the verdicts in the database ``filename`` between runs."""
+    global cachefile
+    save()
+    filename = os.path.realpath(filename)
+    # sqlite needs to get the name in utf-8 on all platforms
+    if isinstance(filename, unicode):
+        filename = filename.encode('utf-8')
+    cachefile = filename
+    verdicts.clear()
+
+
+def _getdictionaryname(spellchecker):
+    """Returns a name for the dictionary of ``spellchecker`` that changes
+    with the language, the provider and the version of enchant."""
+    dictionary = spellchecker.dict
+    provider = dictionary.provider
+    return u"%s %s %s" % (dictionary.tag, provider.name, enchantversion)
+
+
+def _getverdicts(dictionary):
+    """Returns the verdicts for ``dictionary``, loading them from the cache
+    file the first time."""
+    if dictionary not in verdicts:
+        verdicts[dictionary] = {}
+        if cachefile:
+            con = _connect()
+            try:
+                for word, correct in con.execute("""SELECT word, correct
+                        FROM spellingverdicts WHERE dictionary=?;""",
+                        (dictionary,)):
+                    verdicts[dictionary][word] = bool(correct)
+            finally:
+                con.close()
+    return verdicts[dictionary]
+
+
+def save():
+    """Saves the new verdicts in the cache file, if there is one."""
+    if not _newverdicts:
+        return
+    con = _connect()
+    try:
+        for dictionary, words in _newverdicts.iteritems():
+            con.executemany("""INSERT OR REPLACE INTO spellingverdicts
+                VALUES (?, ?, ?);""",
+                [(dictionary, word, int(correct))
+                 for word, correct in words.iteritems()])
+        con.commit()
+    finally:
+        con.close()
+    _newverdicts.clear()
+
+
+def checkwords(words, lang):
+    """Returns the set of misspelt words in ``words``, looking up every
+    word that wasn't seen before once."""
+    spellchecker = _get_checker(lang)
+    if not spellchecker:
+        return set()
+    dictionary = _getdictionaryname(spellchecker)
+    dictverdicts = _getverdicts(dictionary)
+    for word in set(words).difference(dictverdicts):
+        correct = spellchecker.dict.check(word)
+        dictverdicts[word] = correct
+        if cachefile:
+            _newverdicts.setdefault(dictionary, {})[word] = correct
+    return set([word for word in words if not dictverdicts[word]])
+
+
+def check_batch(texts, lang):
+    """Returns a list with the misspelt words of each text in
+    ``texts``."""
+    if not _get_checker(lang):
+        return [[] for text in texts]
+    tokenize = _get_tokenizer(lang)
+    textwords = [[word for word, pos in tokenize(unicode(text))]
+                 for text in texts]
+    misspelt = checkwords([word for words in textwords for word in words],
+                          lang)
+    return [[word for word in words if word in misspelt]
+            for words in textwords]
+
+
+def simple_check(text, lang):
+    for word in check_batch([text], lang)[0]:
+        yield word
+
+
 try:
     # Enchant
+    import enchant
     from enchant import checker, Error as EnchantError
+    from enchant.tokenize import get_tokenizer, TokenizerNotFoundError
     available = True
     checkers = {}
+    tokenizers = {}
+    if hasattr(enchant, "get_enchant_version"):
+        enchantversion = unicode(enchant.get_enchant_version())
 
     def _get_checker(lang):
         if not lang in checkers:
@@ -47,6 +173,16 @@ try:
 
         return checkers[lang]
 
+    def _get_tokenizer(lang):
+        if not lang in tokenizers:
+            # Like the SpellChecker, fall back to the default tokenizer
+            try:
+                tokenizers[lang] = get_tokenizer(lang)
+            except TokenizerNotFoundError:
+                tokenizers[lang] = get_tokenizer()
+
+        return tokenizers[lang]
+
     def check(text, lang):
         spellchecker = _get_checker(lang)
         if not spellchecker:
@@ -55,19 +191,14 @@ try:
         for err in spellchecker:
             yield err.word, err.wordpos, err.suggest()
 
-    def simple_check(text, lang):
-        spellchecker = _get_checker(lang)
-        if not spellchecker:
-            return
-        spellchecker.set_text(unicode(text))
-        for err in spellchecker:
-            yield err.word
-
 
 except ImportError:
 
-    def check(text, lang):
-        return []
+    def _get_checker(lang):
+        return None
 
-    def simple_check(text, lang):
+    def _get_tokenizer(lang):
+        return None
+
+    def check(text, lang):
         return []
@@ -1,8 +1,11 @@
 # -*- coding: utf-8 -*-
 
+import json
+
 from pytest import mark
 
 from translate.filters import checks
+from translate.filters.decorators import Category
 from translate.lang import data
 from translate.storage import po, xliff
 
@@ -1197,3 +1200,129 @@ def test_dialogsizes():
     assert fails(mozillachecker.dialogsizes, 'height: 12em;', 'height: 24xx;')
     assert fails(mozillachecker.dialogsizes, 'height: 12.5em;', 'height: 12,5em;')
     assert fails(mozillachecker.dialogsizes, 'width: 36em; height: 18em;', 'width: 30em; min-height: 20em;')
+
+
+def test_run_filters_plan(monkeypatch):
+    """test that run_filters follows the precompiled plan"""
+    # The categories are only filled in when the tests run
+    monkeypatch.setattr(checks.UnitChecker, "categories", {})
+    stdchecker = checks.StandardChecker()
+    unit = po.pounit("Hello %s")
+    unit.target = ""
+    # untranslated is a precondition, so nothing else gets reported
+    assert stdchecker.run_filters(unit).keys() == ["untranslated"]
+    unit.target = "Hallo"
+    failures = stdchecker.run_filters(unit, categorised=True)
+    assert "printf" in failures
+    assert failures["printf"]["category"] == Category.CRITICAL
+    plan = stdchecker._plan
+    stdchecker.run_filters(unit)
+    assert stdchecker._plan is plan
+    # a language with ignored tests needs a new plan
+    stdchecker.config.updatetargetlanguage("ja")
+    assert "simplecaps" in stdchecker.config.lang.ignoretests
+    unit.source = "Hello"
+    unit.target = "HALLO"
+    assert "simplecaps" not in stdchecker.run_filters(unit)
+    assert stdchecker._plan is not plan
+
+
+def test_teechecker_shared_cache(monkeypatch):
+    """test that the checkers in a TeeChecker share prefilter results"""
+    calls = []
+
+    def geturls(str1):
+        calls.append(str1)
+        return []
+    monkeypatch.setattr(checks.decoration, "geturls", geturls)
+    teechecker = checks.TeeChecker(checkerclasses=[checks.StandardChecker,
+                                                   checks.MozillaChecker])
+    unit = po.pounit("See http://example.com/")
+    unit.target = "Sien http://example.com/"
+    assert teechecker.run_filters(unit) == {}
+    assert sorted(calls) == [u"See http://example.com/",
+                             u"Sien http://example.com/"]
+    # a checker with other variable markers keeps its own results
+    stdchecker = checks.StandardChecker()
+    mozchecker = checks.MozillaChecker()
+    results_cache = {}
+    stdchecker.results_cache = mozchecker.results_cache = results_cache
+    assert stdchecker.filtervariables(u"Show &brandName;") == u"Show &brandName;"
+    assert mozchecker.filtervariables(u"Show &brandName;") == u"Show brandName"
+
+
+def test_run_filters_bulk():
+    """test that checking many units at once gives the same results"""
+    pairs = [(u"Hello", u"Hallo"), (u"Hello", u""), (u"Hello", u"  "),
+             (u"Hello world", u"H"), (u"A", u"A very long translation"),
+             (u"\tOpen", u"Oop"), (u"Open\n", u"Oop"), (u"Open  now", u"Oop nou"),
+             (u" Open", u"Oop"), (u"Open %s", u"_: KDE comment\\n\n"),
+             (u"Save", u"Stoor\r\n")]
+    units = []
+    for source, target in pairs:
+        unit = po.pounit(source)
+        unit.target = target
+        units.append(unit)
+    plural = po.pounit([u"%d file", u"%d files"])
+    plural.target = [u"%d leer", u"lere"]
+    units.append(plural)
+    teechecker = checks.TeeChecker(checkerclasses=[checks.StandardChecker,
+                                                   checks.StandardUnitChecker])
+    failures = [teechecker.run_filters(unit, categorised=True) for unit in units]
+    assert teechecker.run_filters_bulk(units, categorised=True) == failures
+    assert failures[1].keys() == ["untranslated"]
+    assert "tabs" in failures[5]
+    assert "printf" in failures[-1]
+
+
+def test_profile():
+    """test that the checks are counted in a profile"""
+    stdchecker = checks.StandardChecker()
+    profile = checks.CheckProfile()
+    stdchecker.setprofile(profile)
+    stdchecker.run_filters(po.pounit(u"Hello %s"))
+    unit = po.pounit(u"Hello %s")
+    unit.target = u"Hallo"
+    stdchecker.run_filters(unit)
+    assert profile.stats["printf"][0] == 1
+    assert profile.stats["printf"][2] == 1
+    assert profile.stats["printf"][3] == 1
+    assert profile.stats["untranslated"][:1] == [2]
+    assert profile.stats["untranslated"][2:] == [1, 0]
+    assert profile.format().splitlines()[0].split() == [
+        "check", "calls", "time", "(s)", "failures", "exceptions"]
+    assert len(json.loads(profile.format("json"))) == len(profile.stats)
+
+    other = checks.CheckProfile()
+    other.update(profile.stats)
+    other.update(profile.stats)
+    assert other.stats["printf"][0] == 2
+
+    stdchecker.setprofile(None)
+    stdchecker.run_filters(unit)
+    assert profile.stats["printf"][0] == 1
+
+
+def test_profile_bulk():
+    """test that checking many units at once counts the same calls"""
+    units = []
+    for source, target in [(u"Hello", u"Hallo"), (u"Hello", u""),
+                           (u"Open\n", u"Oop"), (u"Hello %s", u"Hallo"),
+                           (u"\tOpen", u"\tOop")]:
+        unit = po.pounit(source)
+        unit.target = target
+        units.append(unit)
+    stdchecker = checks.StandardChecker()
+    serial = checks.CheckProfile()
+    stdchecker.setprofile(serial)
+    for unit in units:
+        stdchecker.run_filters(unit)
+    bulk = checks.CheckProfile()
+    stdchecker.setprofile(bulk)
+    stdchecker.run_filters_bulk(units)
+    assert bulk.stats["untranslated"][0] == 5
+    assert bulk.stats["tabs"][:1] + bulk.stats["tabs"][2:] == [4, 0, 0]
+    assert dict([(name, stats[:1] + stats[2:])
+                 for name, stats in bulk.stats.iteritems()]) == \
+            dict([(name, stats[:1] + stats[2:])
+                  for name, stats in serial.stats.iteritems()])
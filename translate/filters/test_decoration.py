@@ -44,6 +44,12 @@ def test_find_marked_variables():
     assert variables == [(4, "variable")]
     variables = decoration.findmarkedvariables("The &variable.variable; string", "&", ";")
     assert variables == [(4, "variable.variable")]
+    variables = decoration.findmarkedvariables(u"Tom &amp; &brand; &end", "&", ";")
+    assert variables == [(4, u"amp"), (10, u"brand")]
+    variables = decoration.findmarkedvariables(u"$(a $(b) $(c)", "$(", ")")
+    assert variables == [(4, u"b"), (9, u"c")]
+    variables = decoration.findmarkedvariables(u"%s, %1$s or 5%", "%", None)
+    assert variables == [(0, u"s"), (4, u"1")]
 
 
 def test_getnumbers():
@@ -57,6 +63,8 @@ def test_getnumbers():
     #assert decoration.getnumbers(u"R5,99") == ["5.99"]
     #assert decoration.getnumbers(u"1\u00a0000,99") == ["1000.99"]
     assert decoration.getnumbers(u"36°") == [u"36°"]
+    assert decoration.getnumbers(u"Version 1.2. and 3..4°C") == [u"1.2", u"3..4°"]
+    assert decoration.getnumbers(u"10 m\u00b2") == [u"10", u"\u00b2"]
     assert decoration.getnumbers(u"English 123, Bengali \u09e7\u09e8\u09e9") == [u"123", u"\u09e7\u09e8\u09e9"]
 
 
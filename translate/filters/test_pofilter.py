@@ -1,6 +1,8 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import json
+
 from translate.filters import checks, pofilter
 from translate.misc import wStringIO
 from translate.storage import factory, xliff
@@ -294,3 +296,110 @@ class TestTMXFilter(BaseTestFilter):
     def test_isreview(self):
         """TMX doesn't support review"""
         pass
+
+
+def test_jobs(tmpdir, monkeypatch):
+    """checks that filtering files in parallel gives the same results"""
+    inputdir = tmpdir.mkdir("input")
+    for i in range(5):
+        inputdir.join("file%d.po" % i).write('''msgid "Hello %%s"
+msgstr "Hallo %d"
+
+msgid "Open file"
+msgstr "Oop leer"
+''' % i)
+
+    def runfilter(outputname, *args):
+        monkeypatch.setattr("sys.argv", ["pofilter", "--progress=none"] +
+                            list(args) + [str(inputdir), str(tmpdir.join(outputname))])
+        pofilter.main()
+
+    runfilter("serial")
+    runfilter("parallel", "--jobs=3")
+    for i in range(5):
+        serial = tmpdir.join("serial", "file%d.po" % i).read()
+        assert "(pofilter) printf" in serial
+        assert tmpdir.join("parallel", "file%d.po" % i).read() == serial
+
+
+def test_failure_summary(tmpdir, monkeypatch, capsys):
+    """checks that the failures are summed up over all the files"""
+    inputdir = tmpdir.mkdir("input")
+    for i in range(3):
+        inputdir.join("file%d.po" % i).write('''msgid "Hello %s"
+msgstr "Hallo"
+
+msgid "Open file."
+msgstr "Oop leer"
+''')
+
+    def runfilter(outputname, *args):
+        monkeypatch.setattr("sys.argv", ["pofilter", "--progress=none"] +
+                            list(args) + [str(inputdir), str(tmpdir.join(outputname))])
+        pofilter.main()
+        return capsys.readouterr()[1].splitlines()
+
+    assert runfilter("plain") == []
+    for summary in (runfilter("serial", "--summary"),
+                    runfilter("parallel", "--summary", "--jobs=2")):
+        assert len(summary) == 3
+        assert summary[0].split() == ["check", "failures"]
+        assert summary[1].split() == ["endpunc", "3"]
+        assert summary[2].split() == ["printf", "3"]
+
+
+def test_cache(tmpdir, monkeypatch):
+    """checks that cached check results are reused for unchanged units"""
+    inputfile = tmpdir.join("input.po")
+    inputfile.write('''msgid "Hello %s"
+msgstr "Hallo"
+
+msgid "Open file"
+msgstr "Oop leer"
+''')
+    cachefile = str(tmpdir.join("checks.db"))
+    monkeypatch.setattr("translate.filters.spelling.cachefile", None)
+    calls = []
+    run_filters_bulk = checks.TeeChecker.run_filters_bulk
+
+    def counting_run_filters_bulk(self, units, categorised=False):
+        calls.extend([unit.source for unit in units])
+        return run_filters_bulk(self, units, categorised)
+    monkeypatch.setattr(checks.TeeChecker, "run_filters_bulk",
+                        counting_run_filters_bulk)
+
+    def runfilter(outputname):
+        monkeypatch.setattr("sys.argv", ["pofilter", "--progress=none",
+                                         "--cache=%s" % cachefile,
+                                         str(inputfile), str(tmpdir.join(outputname))])
+        pofilter.main()
+
+    runfilter("first.po")
+    assert calls == ["Hello %s", "Open file"]
+    inputfile.write(inputfile.read().replace("Oop leer", "Maak oop"))
+    runfilter("second.po")
+    assert calls == ["Hello %s", "Open file", "Open file"]
+    first = tmpdir.join("first.po").read()
+    assert "(pofilter) printf" in first
+    assert tmpdir.join("second.po").read() == first
+
+
+def test_profile_checks(tmpdir, monkeypatch, capsys):
+    """checks that the checks are profiled over all the files"""
+    inputdir = tmpdir.mkdir("input")
+    for i in range(3):
+        inputdir.join("file%d.po" % i).write('''msgid "Hello %s"
+msgstr "Hallo"
+''')
+
+    def runfilter(outputname, *args):
+        monkeypatch.setattr("sys.argv", ["pofilter", "--progress=none",
+                                         "--profile-checks=json"] + list(args) +
+                            [str(inputdir), str(tmpdir.join(outputname))])
+        pofilter.main()
+        return dict([(stats["check"], stats)
+                     for stats in json.loads(capsys.readouterr()[1])])
+
+    for profile in (runfilter("serial"), runfilter("parallel", "--jobs=2")):
+        assert profile["printf"]["calls"] == 3
+        assert profile["printf"]["failures"] == 3
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+
+from pytest import importorskip, skip
+
+from translate.filters import spelling
+
+
+class FakeProvider(object):
+    name = "fake"
+
+
+class FakeDict(object):
+    """A dictionary that knows a few words and counts the lookups."""
+
+    provider = FakeProvider()
+
+    def __init__(self, tag, words):
+        self.tag = tag
+        self.words = words
+        self.lookups = []
+
+    def check(self, word):
+        self.lookups.append(word)
+        return word in self.words
+
+
+class FakeChecker(object):
+
+    def __init__(self, tag, words):
+        self.dict = FakeDict(tag, words)
+
+
+def fake_tokenizer(text):
+    return [(word, text.index(word)) for word in text.split()]
+
+
+def test_check_batch_fake(tmpdir, monkeypatch):
+    """checks that every word is looked up once per dictionary"""
+    fakecheckers = {"en": FakeChecker("en", [u"The", u"the", u"cat", u"and"])}
+    monkeypatch.setattr(spelling, "_get_checker", fakecheckers.get)
+    monkeypatch.setattr(spelling, "_get_tokenizer", lambda lang: fake_tokenizer)
+    monkeypatch.setattr(spelling, "verdicts", {})
+    monkeypatch.setattr(spelling, "_newverdicts", {})
+    monkeypatch.setattr(spelling, "cachefile", None)
+    spelling.setcachefile(str(tmpdir.join("spelling.db")))
+    assert spelling.check_batch([u"The cat", u"The dgo and the cat"], "en") == \
+            [[], [u"dgo"]]
+    assert spelling.check_batch([u"the dgo"], "en") == [[u"dgo"]]
+    assert sorted(fakecheckers["en"].dict.lookups) == \
+            [u"The", u"and", u"cat", u"dgo", u"the"]
+    assert spelling.check_batch([u"The cat"], "xx") == [[]]
+    spelling.save()
+
+    # The verdicts are reused from the cache file
+    spelling.setcachefile(str(tmpdir.join("spelling.db")))
+    fakecheckers["en"] = FakeChecker("en", [])
+    assert spelling.check_batch([u"The dgo"], "en") == [[u"dgo"]]
+    assert fakecheckers["en"].dict.lookups == []
+
+    # but not for a different dictionary
+    fakecheckers["en"].dict.provider = FakeProvider()
+    fakecheckers["en"].dict.provider.name = "other"
+    assert spelling.check_batch([u"The dgo"], "en") == [[u"The", u"dgo"]]
+    assert sorted(fakecheckers["en"].dict.lookups) == [u"The", u"dgo"]
+
+
+def test_check_batch(tmpdir, monkeypatch):
+    """checks that verdicts are reused and kept in the cache file"""
+    importorskip("enchant")
+    if not spelling._get_checker("en"):
+        skip("no English dictionary")
+    monkeypatch.setattr(spelling, "verdicts", {})
+    monkeypatch.setattr(spelling, "_newverdicts", {})
+    monkeypatch.setattr(spelling, "cachefile", None)
+    spelling.setcachefile(str(tmpdir.join("spelling.db")))
+    assert spelling.check_batch([u"The cat", u"The dgo and the cat"], "en") == \
+            [[], [u"dgo"]]
+    dictionary = spelling._getdictionaryname(spelling._get_checker("en"))
+    assert spelling.verdicts[dictionary] == {u"The": True, u"cat": True,
+                                             u"dgo": False, u"and": True,
+                                             u"the": True}
+    spelling.save()
+    spelling.setcachefile(str(tmpdir.join("spelling.db")))
+    assert spelling._getverdicts(dictionary)[u"dgo"] is False
+    assert list(spelling.simple_check(u"A dgo", "en")) == [u"dgo"]
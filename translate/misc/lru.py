@@ -19,9 +19,119 @@
 # along with this program; if not, see <http://www.gnu.org/licenses/>.
 
 import gc
-from collections import deque
+import sys
+from collections import deque, OrderedDict
 from weakref import WeakValueDictionary
 
+from translate.misc.deprecation import deprecated
+
+
+def getsize(key, value):
+    """Returns the size in bytes of a cache entry, including the strings in
+    a container value."""
+    size = sys.getsizeof(key) + sys.getsizeof(value)
+    if isinstance(value, (list, tuple, set, frozenset)):
+        size += sum([sys.getsizeof(item) for item in value])
+    return size
+
+
+class LRUCache(object):
+    """Dictionary like cache that discards the least recently used items when
+    it holds more than ``maxsize`` items, or more than ``maxbytes`` bytes.
+
+    The values are normal references, so any value can be cached.  Looking
+    up, adding and discarding items take constant time.  The number of
+    lookups that found an item and that didn't are counted in ``hits`` and
+    ``misses``.
+
+    :param maxsize: The maximum number of items
+    :param maxbytes: The maximum total size of the items in bytes, or None
+    :param sizeof: Function that returns the size in bytes of a key and value
+    """
+
+    def __init__(self, maxsize, maxbytes=None, sizeof=getsize):
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.sizeof = sizeof
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.data = OrderedDict()
+        self.sizes = {}
+
+    def __len__(self):
+        return len(self.data)
+
+    def __contains__(self, key):
+        return key in self.data
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def __getitem__(self, key):
+        try:
+            value = self.data.pop(key)
+        except KeyError:
+            self.misses += 1
+            raise
+        self.hits += 1
+        # Move the item to the most recently used end
+        self.data[key] = value
+        return value
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __setitem__(self, key, value):
+        if key in self.data:
+            del self[key]
+        self.data[key] = value
+        if self.maxbytes is not None:
+            size = self.sizeof(key, value)
+            self.sizes[key] = size
+            self.size += size
+        self.cull()
+
+    def __delitem__(self, key):
+        del self.data[key]
+        self.size -= self.sizes.pop(key, 0)
+
+    def cull(self):
+        """Discards the least recently used items until the cache is within
+        its bounds again."""
+        while self.data and (len(self.data) > self.maxsize or
+                             (self.maxbytes is not None and
+                              self.size > self.maxbytes)):
+            key, value = self.data.popitem(last=False)
+            self.size -= self.sizes.pop(key, 0)
+
+    def clear(self):
+        self.data.clear()
+        self.sizes.clear()
+        self.size = 0
+
+    def setdefault(self, key, default):
+        if key not in self:
+            self[key] = default
+
+        return self[key]
+
+    def keys(self):
+        return self.data.keys()
+
+    def stats(self):
+        """Returns a dictionary with the number of items, their size in bytes
+        (if the size is bounded) and the numbers of hits and misses."""
+        return {
+            "items": len(self.data),
+            "bytes": self.size,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
 
 class LRUCachingDict(WeakValueDictionary):
     """Caching dictionary like object that discards the least recently
@@ -29,8 +139,12 @@ class LRUCachingDict(WeakValueDictionary):
 
     cullsize is the fraction of items that will be discarded when
     maxsize is reached.
+
+    .. deprecated:: 1.13
+       Use :class:`LRUCache` instead.
     """
 
+    @deprecated("Use lru.LRUCache instead")
     def __init__(self, maxsize, cullsize=2, peakmult=10, aggressive_gc=True,
                  *args, **kwargs):
         self.cullsize = max(2, cullsize)
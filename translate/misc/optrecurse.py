@@ -152,8 +152,9 @@ class RecursiveOptionParser(optparse.OptionParser, object):
         else:
             super(RecursiveOptionParser, self).set_usage(usage)
 
-    def warning(self, msg, options=None, exc_info=None):
-        """Print a warning message incorporating 'msg' to stderr and exit."""
+    def formatwarning(self, msg, options=None, exc_info=None):
+        """Returns the warning message incorporating 'msg' and the error
+        information required by the errorlevel option."""
         if options:
             if options.errorlevel == "traceback":
                 errorinfo = "\n".join(traceback.format_exception(exc_info[0],
@@ -166,6 +167,11 @@ class RecursiveOptionParser(optparse.OptionParser, object):
                 errorinfo = ""
             if errorinfo:
                 msg += ": " + errorinfo
+        return msg
+
+    def warning(self, msg, options=None, exc_info=None):
+        """Print a warning message incorporating 'msg' to stderr and exit."""
+        msg = self.formatwarning(msg, options, exc_info)
         logging.getLogger(self.get_prog_name()).warning(msg)
 
     def getusagestring(self, option):
@@ -457,8 +463,9 @@ class RecursiveOptionParser(optparse.OptionParser, object):
         options.outputoptions = self.outputoptions
         self.recursiveprocess(options)
 
-    def recursiveprocess(self, options):
-        """Recurse through directories and process files."""
+    def getinputfiles(self, options):
+        """Returns the input files to process, and sets up the options for
+        recursive output and templates."""
         if self.isrecursive(options.input, 'input') and getattr(options, "allowrecursiveinput", True):
             if not self.isrecursive(options.output, 'output'):
                 if not options.output:
@@ -483,31 +490,46 @@ class RecursiveOptionParser(optparse.OptionParser, object):
         options.recursivetemplate = (self.usetemplates and
                                      self.isrecursive(options.template, 'template') and
                                      getattr(options, "allowrecursivetemplate", True))
+        return inputfiles
+
+    def getfilepaths(self, options, inputpath):
+        """Returns the file processor and the full input, output and template
+        paths for processing the given input file, or None if it should be
+        skipped."""
+        try:
+            templatepath = self.gettemplatename(options, inputpath)
+            # If we have a recursive template, but the template doesn't
+            # have this input file, let's drop it.
+            if (options.recursivetemplate and templatepath is None and
+                not self.allowmissingtemplate):
+                self.warning("No template at %s. Skipping %s." %
+                             (templatepath, inputpath))
+                return None
+            outputformat, fileprocessor = self.getoutputoptions(options, inputpath, templatepath)
+            fullinputpath = self.getfullinputpath(options, inputpath)
+            fulltemplatepath = self.getfulltemplatepath(options,
+                                                        templatepath)
+            outputpath = self.getoutputname(options, inputpath, outputformat)
+            fulloutputpath = self.getfulloutputpath(options, outputpath)
+            if options.recursiveoutput and outputpath:
+                self.checkoutputsubdir(options, os.path.dirname(outputpath))
+        except Exception as error:
+            if isinstance(error, KeyboardInterrupt):
+                raise
+            self.warning("Couldn't handle input file %s" %
+                         inputpath, options, sys.exc_info())
+            return None
+        return fileprocessor, fullinputpath, fulloutputpath, fulltemplatepath
+
+    def recursiveprocess(self, options):
+        """Recurse through directories and process files."""
+        inputfiles = self.getinputfiles(options)
         self.initprogressbar(inputfiles, options)
         for inputpath in inputfiles:
-            try:
-                templatepath = self.gettemplatename(options, inputpath)
-                # If we have a recursive template, but the template doesn't
-                # have this input file, let's drop it.
-                if (options.recursivetemplate and templatepath is None and
-                    not self.allowmissingtemplate):
-                    self.warning("No template at %s. Skipping %s." %
-                                 (templatepath, inputpath))
-                    continue
-                outputformat, fileprocessor = self.getoutputoptions(options, inputpath, templatepath)
-                fullinputpath = self.getfullinputpath(options, inputpath)
-                fulltemplatepath = self.getfulltemplatepath(options,
-                                                            templatepath)
-                outputpath = self.getoutputname(options, inputpath, outputformat)
-                fulloutputpath = self.getfulloutputpath(options, outputpath)
-                if options.recursiveoutput and outputpath:
-                    self.checkoutputsubdir(options, os.path.dirname(outputpath))
-            except Exception as error:
-                if isinstance(error, KeyboardInterrupt):
-                    raise
-                self.warning("Couldn't handle input file %s" %
-                             inputpath, options, sys.exc_info())
+            filepaths = self.getfilepaths(options, inputpath)
+            if filepaths is None:
                 continue
+            fileprocessor, fullinputpath, fulloutputpath, fulltemplatepath = filepaths
             try:
                 success = self.processfile(fileprocessor, options,
                                            fullinputpath, fulloutputpath,
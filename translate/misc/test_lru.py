@@ -0,0 +1,42 @@
+#!/usr/bin/env python
+
+from translate.misc import lru
+
+
+def test_maxsize():
+    cache = lru.LRUCache(2)
+    cache["a"] = set(["x"])
+    cache["b"] = 2
+    assert cache["a"] == set(["x"])
+    cache["c"] = 3
+    # "b" was used least recently
+    assert "b" not in cache
+    assert cache.keys() == ["a", "c"]
+    assert len(cache) == 2
+
+
+def test_maxbytes():
+    cache = lru.LRUCache(100, maxbytes=10, sizeof=lambda key, value: value)
+    cache["a"] = 4
+    cache["b"] = 4
+    cache["a"] = 5
+    assert cache.size == 9
+    cache["c"] = 3
+    assert cache.keys() == ["a", "c"]
+    assert cache.size == 8
+    del cache["a"]
+    assert cache.size == 3
+    cache["d"] = 20
+    assert len(cache) == 0
+    assert cache.size == 0
+
+
+def test_stats():
+    cache = lru.LRUCache(10)
+    cache["a"] = 1
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.setdefault("b", 2) == 2
+    assert cache.stats() == {"items": 2, "bytes": 0, "hits": 2, "misses": 1}
+    cache.clear()
+    assert len(cache) == 0
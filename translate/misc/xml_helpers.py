@@ -60,21 +60,23 @@ def getText(node, xml_space="preserve"):
 
 
 XML_NS = 'http://www.w3.org/XML/1998/namespace'
+XML_LANG = "{%s}lang" % XML_NS
+XML_SPACE = "{%s}space" % XML_NS
 
 
 def getXMLlang(node):
     """Gets the xml:lang attribute on node"""
-    return node.get("{%s}lang" % XML_NS)
+    return node.get(XML_LANG)
 
 
 def setXMLlang(node, lang):
     """Sets the xml:lang attribute on node"""
-    node.set("{%s}lang" % XML_NS, lang)
+    node.set(XML_LANG, lang)
 
 
 def getXMLspace(node, default=None):
     """Gets the xml:space attribute on node"""
-    value = node.get("{%s}space" % XML_NS)
+    value = node.get(XML_SPACE)
     if value is None:
         value = default
     return value
@@ -82,7 +84,7 @@ def getXMLspace(node, default=None):
 
 def setXMLspace(node, value):
     """Sets the xml:space attribute on node"""
-    node.set("{%s}space" % XML_NS, value)
+    node.set(XML_SPACE, value)
 
 
 def namespaced(namespace, name):
@@ -74,7 +74,8 @@ class AndroidResourceUnit(base.TranslationUnit):
         return self.xmlelement.get("name")
 
     def setid(self, newid):
-        return self.xmlelement.set("name", newid)
+        self.xmlelement.set("name", newid)
+        self._update_store_index()
 
     def getcontext(self):
         return self.xmlelement.get("name")
@@ -334,6 +335,8 @@ class AndroidResourceUnit(base.TranslationUnit):
             self.set_xml_text_value(target, self.xmlelement)
 
         super(AndroidResourceUnit, self).settarget(target)
+        # Units without a source use their target as the source
+        self._update_store_index()
 
     def get_xml_text_value(self, xmltarget):
         # Grab inner text
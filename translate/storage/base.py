@@ -20,6 +20,7 @@
 
 """Base classes for storage interfaces."""
 
+import codecs
 import logging
 try:
     import cPickle as pickle
@@ -32,6 +33,11 @@ from translate.storage.placeables import (StringElem, general,
 from translate.storage.workflow import StateEnum as states
 
 
+ENCODING_SAMPLE_SIZE = 64 * 1024
+"""Number of bytes from the start of a file that are examined to detect its
+encoding."""
+
+
 def force_override(method, baseclass):
     """Forces derived classes to override method."""
 
@@ -178,8 +184,16 @@ class TranslationUnit(object):
         """Set the source string to the given value."""
         self._rich_source = None
         self._source = source
+        self._update_store_index()
     source = property(lambda self: self._source, setsource)
 
+    def _update_store_index(self):
+        """Updates the indexes of the store of this unit, after a change to
+        the source string or anything else that is indexed."""
+        store = self._store
+        if store is not None:
+            store.update_unit_index(self)
+
     def settarget(self, target):
         """Set the target string to the given value."""
         self._rich_target = None
@@ -504,6 +518,10 @@ class TranslationStore(object):
     sourcelanguage = None
     targetlanguage = None
 
+    _unindexed = None
+    """Units that still need to be added to the indexes, or None if the
+    indexes are not kept up to date by this class"""
+
     def __init__(self, unitclass=None):
         """Construct a blank TranslationStore."""
         self.units = []
@@ -554,6 +572,24 @@ class TranslationStore(object):
         """
         unit._store = self
         self.units.append(unit)
+        if self._unindexed is not None:
+            unit.index = len(self.units) - 1
+            self._unindexed.append(unit)
+
+    def removeunit(self, unit):
+        """Remove the given unit from the object's list of units.
+
+        :type unit: :class:`TranslationUnit`
+        :param unit: The unit that will be removed.
+        """
+        for index, storeunit in enumerate(self.units):
+            if storeunit is unit:
+                del self.units[index]
+                break
+        else:
+            raise ValueError("unit is not in this store")
+        if self._unindexed is not None:
+            self.remove_unit_from_index(unit)
 
     def addsourceunit(self, source):
         """Add and returns a new unit with the given source string.
@@ -612,64 +648,134 @@ class TranslationStore(object):
         else:
             return None
 
-    def remove_unit_from_index(self, unit):
-        """Remove a unit from source and locaton indexes"""
+    def _make_index_property(name):
+        """Returns a property for the index with the given name, which adds
+        the units that are still waiting to be indexed before it is used."""
 
-        def remove_unit(source):
-            if source in self.sourceindex:
-                try:
-                    self.sourceindex[source].remove(unit)
-                    if len(self.sourceindex[source]) == 0:
-                        del(self.sourceindex[source])
-                except ValueError:
-                    pass
+        def getindex(self):
+            try:
+                index = self.__dict__["_" + name]
+            except KeyError:
+                raise AttributeError(name)
+            if self._unindexed:
+                self._flush_index()
+            return index
+
+        def setindex(self, index):
+            self.__dict__["_" + name] = index
+
+        def delindex(self):
+            del self.__dict__["_" + name]
+
+        return property(getindex, setindex, delindex)
+
+    sourceindex = _make_index_property("sourceindex")
+    locationindex = _make_index_property("locationindex")
+    id_index = _make_index_property("id_index")
+    del _make_index_property
+
+    def _flush_index(self):
+        """Adds the units that are waiting to be indexed to the indexes."""
+        unindexed = self._unindexed
+        self._unindexed = []
+        for unit in unindexed:
+            if self._getindexedkeys(unit) is None:
+                self.add_unit_to_index(unit)
 
-        if unit.hasplural():
-            for source in unit.source.strings:
-                remove_unit(source)
-        else:
-            remove_unit(unit.source)
+    def _getindexedkeys(self, unit):
+        """Returns the id, sources and locations under which ``unit`` is
+        indexed, or None if it isn't indexed."""
+        # The unit is kept with its keys, since the id of a unit that is
+        # gone can be reused for a new one
+        entry = self._indexed_keys.get(id(unit))
+        if entry is None or entry[0] is not unit:
+            return None
+        return entry[1:]
 
-        for location in unit.getlocations():
-            if location in self.locationindex \
-                   and self.locationindex[location] is not None \
-                   and self.locationindex[location] == unit:
-                del(self.locationindex[location])
+    def remove_unit_from_index(self, unit):
+        """Remove a unit from source and locaton indexes"""
+        keys = self._getindexedkeys(unit)
+        if keys is None:
+            # The unit might still be waiting to be indexed
+            self._unindexed = [other for other in self._unindexed
+                               if other is not unit]
+            return
+        del self._indexed_keys[id(unit)]
+        uid, sources, locations = keys
+
+        if self._id_index.get(uid) is unit:
+            del self._id_index[uid]
+
+        for source in sources:
+            units = self._sourceindex.get(source, [])
+            for index, other in enumerate(units):
+                if other is unit:
+                    del units[index]
+                    if not units:
+                        del self._sourceindex[source]
+                    break
+
+        for location in locations:
+            if self._locationindex.get(location) is unit:
+                del self._locationindex[location]
 
     def add_unit_to_index(self, unit):
         """Add a unit to source and location idexes"""
-        self.id_index[unit.getid()] = unit
+        if unit.isheader() or unit.isblank():
+            # Still keep track of the unit, to index it once it changes
+            self._indexed_keys[id(unit)] = (unit, None, [], [])
+            return
 
-        def insert_unit(source):
-            if not source in self.sourceindex:
-                self.sourceindex[source] = [unit]
-            else:
-                self.sourceindex[source].append(unit)
+        uid = unit.getid()
+        self._id_index[uid] = unit
 
         if unit.hasplural():
-            for source in unit.source.strings:
-                insert_unit(source)
+            sources = unit.source.strings
         else:
-            insert_unit(unit.source)
+            sources = [unit.source]
+        for source in sources:
+            if not source in self._sourceindex:
+                self._sourceindex[source] = [unit]
+            else:
+                self._sourceindex[source].append(unit)
 
-        for location in unit.getlocations():
-            if location in self.locationindex:
+        locations = unit.getlocations()
+        for location in locations:
+            if location in self._locationindex:
                 # if sources aren't unique, don't use them
                 #FIXME: maybe better store a list of units like sourceindex
-                self.locationindex[location] = None
+                self._locationindex[location] = None
             else:
-                self.locationindex[location] = unit
+                self._locationindex[location] = unit
+
+        self._indexed_keys[id(unit)] = (unit, uid, sources, locations)
+
+    def update_unit_index(self, unit):
+        """Index the given unit again after it changed, if the indexes are
+        kept up to date."""
+        if self._unindexed is None:
+            return
+        if self._getindexedkeys(unit) is not None:
+            self.remove_unit_from_index(unit)
+            self._unindexed.append(unit)
 
     def makeindex(self):
         """Indexes the items in this store. At least .sourceindex should be
-        useful."""
+        useful.
+
+        The indexes are kept up to date as units are added with
+        :meth:`addunit`, removed with :meth:`removeunit` or change their
+        source string, id, locations or context, so this only needs to be
+        called once.
+        """
         self.locationindex = {}
         self.sourceindex = {}
         self.id_index = {}
+        self._indexed_keys = {}
+        self._unindexed = []
         for index, unit in enumerate(self.units):
             unit.index = index
-            if not (unit.isheader() or unit.isblank()):
-                self.add_unit_to_index(unit)
+            self.add_unit_to_index(unit)
 
     def require_index(self):
         """make sure source index exists"""
@@ -728,19 +834,58 @@ class TranslationStore(object):
             newstore.parse(storestring)
         return newstore
 
+    def _detect_bom(self, text):
+        """Returns the encoding indicated by a byte order mark at the start of
+        text, or None."""
+        # UTF-32 first, since its little endian BOM starts with the UTF-16 one
+        for bom, encoding in ((codecs.BOM_UTF32_LE, 'utf-32'),
+                              (codecs.BOM_UTF32_BE, 'utf-32'),
+                              (codecs.BOM_UTF8, 'utf-8-sig'),
+                              (codecs.BOM_UTF16_LE, 'utf-16'),
+                              (codecs.BOM_UTF16_BE, 'utf-16')):
+            if text.startswith(bom):
+                return encoding
+        return None
+
+    def _decodes_sample(self, sample, encoding):
+        """Checks that the sample decodes with the given encoding.
+
+        The sample is decoded incrementally so that a multibyte character that
+        is cut off at the end of the sample is not counted as an error."""
+        try:
+            decoder = codecs.getincrementaldecoder(encoding)()
+            decoder.decode(sample, final=False)
+            return True
+        except (LookupError, UnicodeError):
+            return False
+
     def detect_encoding(self, text, default_encodings=None):
+        """Try to work out the encoding of text and decode it.
+
+        Only a sample from the start of the text is examined (for a byte order
+        mark, by chardet and by the candidate encodings), so that the whole
+        text is normally decoded only once.
+
+        :return: The decoded text and the encoding used, or (None, None)
+        """
         if not default_encodings:
             default_encodings = ['utf-8']
-        try:
-            import chardet
-            # many false complaints with ellipse (see bug 1825)
-            detected_encoding = chardet.detect(text.replace("…", ""))
-            if detected_encoding['confidence'] < 0.48:
+        sample = text[:ENCODING_SAMPLE_SIZE]
+        detected_encoding = None
+        bom_encoding = self._detect_bom(sample)
+        if bom_encoding:
+            detected_encoding = {'encoding': bom_encoding, 'confidence': 1.0}
+        else:
+            try:
+                import chardet
+                # many false complaints with ellipse (see bug 1825)
+                detected_encoding = chardet.detect(sample.replace("…", ""))
+                if detected_encoding['confidence'] < 0.48:
+                    detected_encoding = None
+                elif detected_encoding['encoding'] == 'ascii':
+                    detected_encoding['encoding'] = 'utf-8'
+            except ImportError:
                 detected_encoding = None
-            elif detected_encoding['encoding'] == 'ascii':
-                detected_encoding['encoding'] = 'utf-8'
-        except ImportError:
-            detected_encoding = None
 
         encodings = []
         if self.encoding == 'auto':
@@ -759,8 +904,12 @@ class TranslationStore(object):
                              self.filename, self.encoding,
                              detected_encoding['encoding'],
                              detected_encoding['confidence'])
-            encodings.append(self.encoding)
 
+        # Try the encodings that can decode the sample first, the others are
+        # only tried in case the rest of the text doesn't decode
+        encodings.sort(key=lambda encoding: not self._decodes_sample(sample, encoding))
+        r_text = None
+        r_encoding = None
         for encoding in encodings:
             try:
                 r_text = unicode(text, encoding)
@@ -74,6 +74,22 @@ class TranslateBenchmarker:
                     sample_unit.target = " ".join(["drow%d" % (random.randint(0, strings_per_file) * i) for i in range(target_words_per_string)])
                 sample_file.savefile(os.path.join(dirname, "file_%d.%s" % (filenum, self.extension)))
 
+    def create_duplicate_sample_file(self, num_units, distinct_strings):
+        """creates a single sample file in which many units share the same
+        source string, as produced by csv2po or xml2po on big projects"""
+        if not os.path.exists(self.test_dir):
+            os.mkdir(self.test_dir)
+        if not os.path.exists(self.project_dir):
+            os.mkdir(self.project_dir)
+        if not os.path.exists(self.file_dir):
+            os.mkdir(self.file_dir)
+        sample_file = self.StoreClass()
+        for unitnum in range(num_units):
+            sample_unit = sample_file.addsourceunit("word%d" % (unitnum % distinct_strings))
+            sample_unit.target = "drow%d" % random.randint(0, distinct_strings)
+            sample_unit.addlocation("source%d.c:%d" % (unitnum % 10, unitnum))
+        sample_file.savefile(os.path.join(self.file_dir, "duplicates.%s" % self.extension))
+
     def parse_files(self, file_dir=None):
         """parses all the files in the test directory into memory"""
         count = 0
@@ -98,6 +114,14 @@ class TranslateBenchmarker:
             count += len(parsedfile.units)
         print("counted %d units" % count)
 
+    def remove_duplicates(self, duplicatestyle):
+        """removes duplicates from the parsed files"""
+        count = 0
+        for parsedfile in self.parsedfiles:
+            parsedfile.removeduplicates(duplicatestyle)
+            count += len(parsedfile.units)
+        print("counted %d units" % count)
+
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Process some integers.')
@@ -112,6 +136,9 @@ if __name__ == "__main__":
     parser.add_argument('--check-placeables', dest='check_placeables',
                         action='store_true',
                         help='benchmark placeables')
+    parser.add_argument('--check-duplicates', dest='check_duplicates',
+                        action='store_true',
+                        help='benchmark removing duplicates')
     args = parser.parse_args()
 
     storetype = args.storetype
@@ -162,3 +189,19 @@ if __name__ == "__main__":
             stats.sort_stats('time').print_stats(20)
             print("_______________________________________________________")
         benchmarker.clear_test_dir()
+
+    if args.check_duplicates:
+        # 100000 units, but only 1000 distinct source strings
+        duplicate_sizes = (100000, 1000)
+        for duplicatestyle in ("merge", "msgctxt"):
+            benchmarker = TranslateBenchmarker("BenchmarkDir", storeclass)
+            benchmarker.clear_test_dir()
+            benchmarker.create_duplicate_sample_file(*duplicate_sizes)
+            benchmarker.parse_files()
+            print("_______________________________________________________")
+            statsfile = "remove_duplicates_%s_%s" % (duplicatestyle, storetype) + '_%d_%d.stats' % duplicate_sizes
+            cProfile.run('benchmarker.remove_duplicates(%r)' % duplicatestyle, statsfile)
+            stats = pstats.Stats(statsfile)
+            stats.sort_stats('time').print_stats(20)
+            print("_______________________________________________________")
+            benchmarker.clear_test_dir()
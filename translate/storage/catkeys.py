@@ -166,7 +166,8 @@ class CatkeysUnit(base.TranslationUnit):
 
     def setsource(self, newsource):
         self._rich_source = None
-        return self._set_source_or_target('source', newsource)
+        self._set_source_or_target('source', newsource)
+        self._update_store_index()
     source = property(getsource, setsource)
 
     def gettarget(self):
@@ -179,11 +180,11 @@ class CatkeysUnit(base.TranslationUnit):
 
     def getnotes(self, origin=None):
         if not origin or origin in ["programmer", "developer", "source code"]:
-            return self._dict["comment"].decode('utf-8')
+            return self._dict.get("comment", "").decode('utf-8')
         return u""
 
     def getcontext(self):
-        return self._dict["context"].decode('utf-8')
+        return self._dict.get("context", "").decode('utf-8')
 
     def getid(self):
         context = self.getcontext()
@@ -35,6 +35,7 @@ import os
 import re
 import sys
 import tempfile
+import threading
 from ctypes import (CFUNCTYPE, POINTER, Structure, c_char_p, c_int, c_long,
                     c_size_t, c_uint, cdll)
 
@@ -185,6 +186,50 @@ def unquotefrompo(postr):
     return pypo.unquotefrompo(postr)
 
 
+def _write_pipe(fd, data):
+    """Writes all of data to the pipe fd and closes it."""
+    view = memoryview(data)
+    written = 0
+    try:
+        while written < len(view):
+            written += os.write(fd, view[written:])
+    except OSError:
+        # The reader gave up early, probably because of a parse error
+        pass
+    finally:
+        os.close(fd)
+
+
+def read_gpo_file(posrc):
+    """Reads the given PO source with libgettextpo and returns the gettext
+    file handle.
+
+    libgettextpo can only read named files, so where the platform allows it
+    we give it the read end of a pipe (as /dev/fd/N) that a thread fills
+    with the source. Elsewhere we fall back to a temporary file.
+    """
+    if not os.path.isdir("/dev/fd"):
+        fd, fname = tempfile.mkstemp(prefix='translate', suffix='.po')
+        try:
+            os.write(fd, posrc)
+        finally:
+            os.close(fd)
+        try:
+            return gpo.po_file_read_v3(fname, xerror_handler)
+        finally:
+            os.remove(fname)
+    readfd, writefd = os.pipe()
+    writer = threading.Thread(target=_write_pipe, args=(writefd, posrc))
+    writer.daemon = True
+    writer.start()
+    try:
+        return gpo.po_file_read_v3("/dev/fd/%d" % readfd, xerror_handler)
+    finally:
+        # Closing our end first makes sure that the writer finishes
+        os.close(readfd)
+        writer.join()
+
+
 def get_libgettextpo_version():
     """Returns the libgettextpo version
 
@@ -285,6 +330,7 @@ class pounit(pocommon.pounit):
         else:
             gpo.po_message_set_msgid(self._gpo_message, source)
             gpo.po_message_set_msgid_plural(self._gpo_message, None)
+        self._update_store_index()
     source = property(getsource, setsource)
 
     def gettarget(self):
@@ -552,6 +598,7 @@ class pounit(pocommon.pounit):
             file = location
             line = -1
         gpo.po_message_add_filepos(self._gpo_message, file, line)
+        self._update_store_index()
 
     def getcontext(self):
         msgctxt = gpo.po_message_msgctxt(self._gpo_message)
@@ -564,6 +611,7 @@ class pounit(pocommon.pounit):
     def setcontext(self, context):
         context = data.forceunicode(context)
         gpo.po_message_set_msgctxt(self._gpo_message, context.encode(self.CPO_ENC))
+        self._update_store_index()
 
     @classmethod
     def buildfromunit(cls, unit, encoding=None):
@@ -640,39 +688,39 @@ class pofile(pocommon.pofile):
         # about files already containing msgctxt? - test
         id_dict = {}
         uniqueunits = []
-        # TODO: this is using a list as the pos aren't hashable, but this is slow.
-        # probably not used frequently enough to worry about it, though.
-        markedpos = []
+        # The units aren't hashable by content, so we keep track of the ones
+        # we already marked by their identity.
+        markedpos = set()
 
         def addcomment(thepo):
             thepo.msgidcomment = " ".join(thepo.getlocations())
-            markedpos.append(thepo)
+            markedpos.add(id(thepo))
         for thepo in self.units:
-            id = thepo.getid()
+            unitid = thepo.getid()
             if thepo.isheader() and not thepo.getlocations():
                 # header msgids shouldn't be merged...
                 uniqueunits.append(thepo)
-            elif id in id_dict:
+            elif unitid in id_dict:
                 if duplicatestyle == "merge":
-                    if id:
-                        id_dict[id].merge(thepo)
+                    if unitid:
+                        id_dict[unitid].merge(thepo)
                     else:
                         addcomment(thepo)
                         uniqueunits.append(thepo)
                 elif duplicatestyle == "msgctxt":
-                    origpo = id_dict[id]
-                    if origpo not in markedpos:
+                    origpo = id_dict[unitid]
+                    if id(origpo) not in markedpos:
                         origpo.setcontext(" ".join(origpo.getlocations()))
-                        markedpos.append(thepo)
+                        markedpos.add(id(origpo))
                     thepo.setcontext(" ".join(thepo.getlocations()))
                     uniqueunits.append(thepo)
             else:
-                if not id:
+                if not unitid:
                     if duplicatestyle == "merge":
                         addcomment(thepo)
                     else:
                         thepo.setcontext(" ".join(thepo.getlocations()))
-                id_dict[id] = thepo
+                id_dict[unitid] = thepo
                 uniqueunits.append(thepo)
         new_gpo_memory_file = gpo.po_file_create()
         new_gpo_message_iterator = gpo.po_message_iterator(new_gpo_memory_file, None)
@@ -682,6 +730,9 @@ class pofile(pocommon.pofile):
         self._gpo_message_iterator = new_gpo_message_iterator
         self._gpo_memory_file = new_gpo_memory_file
         self.units = uniqueunits
+        if self._unindexed is not None:
+            # The ids of the units changed, and merged units are gone
+            self.makeindex()
 
     def __str__(self):
 
@@ -745,20 +796,14 @@ class pofile(pocommon.pofile):
             input.close()
             input = posrc
 
-        needtmpfile = not os.path.isfile(input)
-        if needtmpfile:
-            # This is not a file - we write the string to a temporary file
-            fd, fname = tempfile.mkstemp(prefix='translate', suffix='.po')
-            os.write(fd, input)
-            input = fname
-            os.close(fd)
-
-        self._gpo_memory_file = gpo.po_file_read_v3(input, xerror_handler)
-        if self._gpo_memory_file is None:
-            logger.error("Error:")
-
-        if needtmpfile:
-            os.remove(input)
+        if os.path.isfile(input):
+            gpo_file = gpo.po_file_read_v3(input, xerror_handler)
+        else:
+            gpo_file = read_gpo_file(input)
+        if not gpo_file:
+            raise base.ParseError(ValueError("libgettextpo could not read %r" %
+                                             (self.filename or "the PO source")))
+        self._gpo_memory_file = gpo_file
 
         self.units = []
         # Handle xerrors here
@@ -143,6 +143,7 @@ class csvunit(base.TranslationUnit):
 
     def setid(self, value):
         self.id = value
+        self._update_store_index()
 
     def getlocations(self):
         #FIXME: do we need to support more than one location
@@ -150,12 +151,14 @@ class csvunit(base.TranslationUnit):
 
     def addlocation(self, location):
         self.location = location
+        self._update_store_index()
 
     def getcontext(self):
         return self.context
 
     def setcontext(self, value):
         self.context = value
+        self._update_store_index()
 
     def getnotes(self, origin=None):
         if origin is None:
@@ -247,6 +247,7 @@ class dtdunit(base.TranslationUnit):
         else:
             self.definition = quotefordtd(source)
         self._rich_source = None
+        self._update_store_index()
 
     def getsource(self):
         """gets the unquoted source string"""
@@ -279,6 +280,7 @@ class dtdunit(base.TranslationUnit):
 
     def setid(self, new_id):
         self.entity = new_id
+        self._update_store_index()
 
     def getlocations(self):
         """Return the entity as location (identifier)."""
@@ -288,6 +290,7 @@ class dtdunit(base.TranslationUnit):
     def addlocation(self, location):
         """Set the entity to the given "location"."""
         self.entity = location
+        self._update_store_index()
 
     def isnull(self):
         """returns whether this dtdunit doesn't actually have an entity definition"""
@@ -20,7 +20,14 @@
 
 """factory methods to build real storage objects that conform to base.py"""
 
+import hashlib
+import json
 import os
+import stat
+import tempfile
+import zlib
+
+from translate import __version__
 
 
 #TODO: Monolingual formats (with template?)
@@ -162,11 +169,108 @@ def getclass(storefile, ignore=None, classes=None, classes_str=classes_str, hidd
     return storeclass
 
 
-def getobject(storefile, ignore=None, classes=None, classes_str=classes_str, hiddenclasses=hiddenclasses):
+CACHEDIR_ENVIRONMENT = "TRANSLATE_STORE_CACHE"
+"""Name of the environment variable that enables the parsed store cache for
+all callers of :func:`getobject`.
+
+Only the stores that can be turned into plain data (with ``tocache()`` and
+``fromcache()``, like :class:`translate.storage.pypo.pofile`) are cached."""
+
+
+def _getcachekey(storefilename, storeclass):
+    """Returns the key that a cached copy of the file must match to be
+    valid: path, size, modification time, class and toolkit version."""
+    file_stat = os.stat(storefilename)
+    return [os.path.realpath(storefilename), file_stat.st_size,
+            file_stat.st_mtime, storeclass.__module__, storeclass.__name__,
+            __version__.sver, __version__.build]
+
+
+def _getcachefilename(cachedir, cachekey):
+    """Returns the file in cachedir that holds the parsed copy of a file."""
+    realpath = cachekey[0]
+    if isinstance(realpath, unicode):
+        realpath = realpath.encode('utf-8')
+    return os.path.join(cachedir, hashlib.sha1(realpath).hexdigest() + ".json.gz")
+
+
+def _istrusted(path):
+    """Checks that only the current user could have written path."""
+    if not hasattr(os, "getuid"):
+        return True
+    path_stat = os.stat(path)
+    return (path_stat.st_uid == os.getuid() and
+            not path_stat.st_mode & (stat.S_IWGRP | stat.S_IWOTH))
+
+
+def _loadcachedstore(cachefilename, cachekey, storeclass):
+    """Returns the store cached in cachefilename if it is still valid for
+    cachekey, otherwise None."""
+    try:
+        if not (_istrusted(os.path.dirname(cachefilename)) and
+                _istrusted(cachefilename)):
+            return None
+        cachefile = open(cachefilename, 'rb')
+    except (IOError, OSError):
+        return None
+    try:
+        # The key is stored on the first line so that we don't have to load
+        # a stale store
+        if json.loads(cachefile.readline()) != cachekey:
+            return None
+        return storeclass.fromcache(json.loads(zlib.decompress(cachefile.read())))
+    except Exception:
+        # Corrupt or incompatible cache files are simply reparsed
+        return None
+    finally:
+        cachefile.close()
+
+
+def _savecachedstore(cachefilename, cachekey, store):
+    """Writes the parsed store to cachefilename, if it can be serialised."""
+    try:
+        data = json.dumps(cachekey) + "\n" + \
+               zlib.compress(json.dumps(store.tocache(), separators=(',', ':')), 1)
+    except (TypeError, ValueError, UnicodeError):
+        # Units with undecodable strings can't be cached
+        return
+    cachedir = os.path.dirname(cachefilename)
+    if not os.path.isdir(cachedir):
+        os.makedirs(cachedir, 0o700)
+    # Write to a temporary file first so that concurrent readers never see a
+    # partially written cache file
+    fd, tempfilename = tempfile.mkstemp(dir=cachedir)
+    try:
+        os.write(fd, data)
+    finally:
+        os.close(fd)
+    os.rename(tempfilename, cachefilename)
+
+
+def _parsecached(storefilename, storeclass, cachedir):
+    """Returns the parsed store for storefilename, using the parsed copy in
+    cachedir if the file didn't change since it was cached."""
+    cachekey = _getcachekey(storefilename, storeclass)
+    cachefilename = _getcachefilename(cachedir, cachekey)
+    store = _loadcachedstore(cachefilename, cachekey, storeclass)
+    if store is None:
+        store = storeclass.parsefile(storefilename)
+        _savecachedstore(cachefilename, cachekey, store)
+    store.filename = storefilename
+    return store
+
+
+def getobject(storefile, ignore=None, classes=None, classes_str=classes_str, hiddenclasses=hiddenclasses, cachedir=None):
     """Factory that returns a usable object for the type of file presented.
 
     :type storefile: file or str
     :param storefile: File object or file name.
+    :type cachedir: str
+    :param cachedir: Directory in which parsed copies of files are kept, so
+                     that loading an unchanged file doesn't need to parse it
+                     again. Defaults to the directory given by the
+                     ``TRANSLATE_STORE_CACHE`` environment variable, the
+                     cache is not used if neither is given.
 
     Specify ignore to ignore some part at the back of the name (like .gz).
     """
@@ -175,6 +279,8 @@ def getobject(storefile, ignore=None, classes=None, classes_str=classes_str, hid
         if os.path.isdir(storefile) or storefile.endswith(os.path.sep):
             from translate.storage import directory
             return directory.Directory(storefile)
+    if cachedir is None:
+        cachedir = os.environ.get(CACHEDIR_ENVIRONMENT)
     storefilename = _getname(storefile)
     storeclass = getclass(storefile, ignore, classes=classes, classes_str=classes_str, hiddenclasses=hiddenclasses)
     if os.path.exists(storefilename) or not getattr(storefile, "closed", True):
@@ -185,6 +291,9 @@ def getobject(storefile, ignore=None, classes=None, classes_str=classes_str, hid
             module = __import__(_module, globals(), {}, [])
             _file = getattr(module, _class)
             storefile = _file(storefilename)
+        elif (cachedir and hasattr(storeclass, "fromcache") and
+              isinstance(storefile, basestring)):
+            return _parsecached(storefilename, storeclass, cachedir)
         store = storeclass.parsefile(storefile)
     else:
         store = storeclass()
@@ -192,6 +301,32 @@ def getobject(storefile, ignore=None, classes=None, classes_str=classes_str, hid
     return store
 
 
+def iterunits(storefile, ignore=None, classes=None, classes_str=classes_str, hiddenclasses=hiddenclasses):
+    """Iterates over all the units of the given file (like ``store.units``),
+    for read-only processing.
+
+    Stores that can stream their units (see
+    :meth:`translate.storage.lisa.LISAfile.iterparse`) are never loaded into
+    memory as a whole, other stores are loaded with :func:`getobject`.
+
+    :type storefile: file or str
+    :param storefile: File object or file name.
+    """
+    storeclass = getclass(storefile, ignore, classes=classes, classes_str=classes_str, hiddenclasses=hiddenclasses)
+    iterparse = getattr(storeclass, "iterparse", None)
+    storefilename = _getname(storefile)
+    if iterparse is None or not os.path.exists(storefilename):
+        return iter(getobject(storefile, ignore, classes=classes, classes_str=classes_str, hiddenclasses=hiddenclasses).units)
+    name, ext = os.path.splitext(storefilename)
+    ext = ext[len(os.path.extsep):].lower()
+    if ext in decompressclass:
+        _module, _class = decompressclass[ext]
+        module = __import__(_module, globals(), {}, [])
+        _file = getattr(module, _class)
+        storefile = _file(storefilename)
+    return iterparse(storefile)
+
+
 supported = [
         ('Gettext PO file', ['po', 'pot'], ["text/x-gettext-catalog", "text/x-gettext-translation", "text/x-po", "text/x-pot"]),
         ('XLIFF Translation File', ['xlf', 'xliff', 'sdlxliff'], ["application/x-xliff", "application/x-xliff+xml"]),
@@ -97,6 +97,7 @@ class pounit(pocommon.pounit):
         else:
             #unicode, list, dict
             self._source = multistring(source)
+        self._update_store_index()
     source = property(getsource, setsource)
 
     def gettarget(self):
@@ -354,6 +355,7 @@ class pounit(pocommon.pounit):
         :type location: String
         """
         self.sourcecomments.append(location)
+        self._update_store_index()
 
     def _extract_msgidcomments(self, text=None):
         """Extract KDE style msgid comments from the unit.
@@ -373,6 +375,7 @@ class pounit(pocommon.pounit):
     def setcontext(self, context):
         context = data.forceunicode(context or u"")
         self._msgctxt = context
+        self._update_store_index()
 
     def getid(self):
         """Returns a unique identifier for this unit."""
@@ -549,6 +552,9 @@ class pofile(pocommon.pofile):
                 id_dict[id] = thepo
                 uniqueunits.append(thepo)
         self.units = uniqueunits
+        if self._unindexed is not None:
+            # The ids of the units changed, and merged units are gone
+            self.makeindex()
 
     def __str__(self):
         """Convert to a string. double check that unicode is handled somehow here"""
@@ -109,10 +109,12 @@ class htmlunit(base.TranslationUnit):
     def setsource(self, source):
         self._rich_source = None
         self._text = safe_escape(source)
+        self._update_store_index()
     source = property(getsource, setsource)
 
     def addlocation(self, location):
         self.locations.append(location)
+        self._update_store_index()
 
     def getlocations(self):
         return self.locations
@@ -71,6 +71,7 @@ class icalunit(base.TranslationUnit):
 
     def addlocation(self, location):
         self.location = location
+        self._update_store_index()
 
     def getlocations(self):
         return [self.location]
@@ -85,6 +85,7 @@ class iniunit(base.TranslationUnit):
 
     def addlocation(self, location):
         self.location = location
+        self._update_store_index()
 
     def getlocations(self):
         return [self.location]
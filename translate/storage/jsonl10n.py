@@ -98,6 +98,7 @@ class JsonUnit(base.TranslationUnit):
 
     def setsource(self, source):
         self.settarget(source)
+        self._update_store_index()
     source = property(getsource, setsource)
 
     def gettarget(self):
@@ -132,6 +133,7 @@ class JsonUnit(base.TranslationUnit):
 
     def setid(self, value):
         self._id = value
+        self._update_store_index()
 
     def getid(self):
         return self._id
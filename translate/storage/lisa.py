@@ -27,6 +27,11 @@ try:
 except ImportError as e:
     raise ImportError("lxml is not installed. It might be possible to continue without support for XML formats.")
 
+import bisect
+import collections
+import os
+import re
+
 from translate.lang import data
 from translate.storage import base
 
@@ -46,12 +51,19 @@ class LISAunit(base.TranslationUnit):
     textNode = ""
 
     namespace = None
+    _namespaced = {}
+    """Names in Clark notation, by namespace and name"""
     _default_xml_space = "preserve"
     """The default handling of spacing in the absense of an xml:space
     attribute.
 
     This is mostly for correcting XLIFF behaviour."""
 
+    _tracksdirty = False
+    """Whether every method that changes the unit calls :meth:`_markdirty`,
+    which incremental saves rely on. Stores of other units always write the
+    whole file."""
+
     def __init__(self, source, empty=False, **kwargs):
         """Constructs a unit containing the given source string"""
         self._rich_source = None
@@ -93,7 +105,19 @@ class LISAunit(base.TranslationUnit):
 
         This is needed throughout lxml.
         """
-        return namespaced(self.namespace, name)
+        try:
+            return self._namespaced[self.namespace, name]
+        except KeyError:
+            tag = namespaced(self.namespace, name)
+            self._namespaced[self.namespace, name] = tag
+            return tag
+
+    def _markdirty(self):
+        """Notes a change to this unit, so that an incremental save of its
+        store writes it out."""
+        store = self._store
+        if store is not None and getattr(store, "_original", None) is not None:
+            store._dirtyelements.add(self.xmlelement)
 
     def set_source_dom(self, dom_node):
         languageNodes = self.getlanguageNodes()
@@ -101,6 +125,7 @@ class LISAunit(base.TranslationUnit):
             self.xmlelement.replace(languageNodes[0], dom_node)
         else:
             self.xmlelement.append(dom_node)
+        self._markdirty()
 
     def get_source_dom(self):
         return self.getlanguageNode(lang=None, index=0)
@@ -111,6 +136,7 @@ class LISAunit(base.TranslationUnit):
             self._rich_source = None
         text = data.forceunicode(text)
         self.source_dom = self.createlanguageNode(sourcelang, text, "source")
+        self._update_store_index()
 
     def getsource(self):
         return self.getNodeText(self.source_dom,
@@ -128,6 +154,7 @@ class LISAunit(base.TranslationUnit):
                 self.xmlelement.insert(1, dom_node)
         if not append and len(languageNodes) > 1:
             self.xmlelement.remove(languageNodes[1])
+        self._markdirty()
 
     def get_target_dom(self, lang=None):
         if lang:
@@ -148,6 +175,7 @@ class LISAunit(base.TranslationUnit):
         # string
         if self.gettarget() == text:
             return
+        self._markdirty()
         languageNode = self.get_target_dom(None)
         if not text is None:
             if languageNode is None:
@@ -247,8 +275,14 @@ class LISAunit(base.TranslationUnit):
         return etree.tostring(self.xmlelement, pretty_print=True,
                               encoding='utf-8')
 
+    _getelementid = None
+    """A function returning the id of a unit given its XML element and
+    namespace, for unit types where the id can be worked out without creating
+    the unit. This allows finding units by id in lazily parsed files."""
+
     def _set_property(self, name, value):
         self.xmlelement.attrib[name] = value
+        self._markdirty()
 
     xid = property(lambda self: self.xmlelement.attrib[self.namespaced('xid')],
                    lambda self, value: self._set_property(self.namespaced('xid'), value))
@@ -263,6 +297,142 @@ class LISAunit(base.TranslationUnit):
         return term
 
 
+class LazyUnitList(collections.MutableSequence):
+    """A list of units that creates each unit from its XML element only when
+    the unit is first accessed.
+
+    The list initially holds the XML elements of the units, and every item
+    is replaced by its unit as soon as it is retrieved from the list. The
+    elements are never handed out, so this behaves like a list of units.
+    """
+
+    __hash__ = None
+
+    def __init__(self, elements, createunit):
+        self._items = list(elements)
+        self._createunit = createunit
+
+    def _getunit(self, index):
+        item = self._items[index]
+        if etree.iselement(item):
+            item = self._createunit(item)
+            self._items[index] = item
+        return item
+
+    def getelement(self, index):
+        """Returns the XML element of the unit at index, without creating the
+        unit."""
+        item = self._items[index]
+        if etree.iselement(item):
+            return item
+        return item.xmlelement
+
+    def __len__(self):
+        return len(self._items)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._getunit(i) for i in xrange(*index.indices(len(self)))]
+        return self._getunit(index)
+
+    def __setitem__(self, index, value):
+        self._items[index] = value
+
+    def __delitem__(self, index):
+        del self._items[index]
+
+    def insert(self, index, value):
+        self._items.insert(index, value)
+
+    def __iter__(self):
+        for i in xrange(len(self)):
+            yield self._getunit(i)
+
+    def __reversed__(self):
+        for i in xrange(len(self) - 1, -1, -1):
+            yield self._getunit(i)
+
+    def __add__(self, other):
+        return list(self) + list(other)
+
+    def __radd__(self, other):
+        return list(other) + list(self)
+
+    def __iadd__(self, other):
+        self._items.extend(other)
+        return self
+
+    def __mul__(self, count):
+        return list(self) * count
+
+    __rmul__ = __mul__
+
+    def extend(self, values):
+        self._items.extend(values)
+
+    def pop(self, index=-1):
+        unit = self._getunit(index)
+        del self._items[index]
+        return unit
+
+    def sort(self, *args, **kwargs):
+        units = list(self)
+        units.sort(*args, **kwargs)
+        self._items = units
+
+    def reverse(self):
+        self._items.reverse()
+
+    # The methods that compare items have to compare units, not elements
+
+    def __contains__(self, value):
+        for item in self:
+            if item is value or item == value:
+                return True
+        return False
+
+    def index(self, value, start=0, stop=None):
+        start, stop, step = slice(start, stop).indices(len(self))
+        for index in xrange(start, stop):
+            item = self._getunit(index)
+            if item is value or item == value:
+                return index
+        raise ValueError("%r is not in list" % (value,))
+
+    def count(self, value):
+        return len([item for item in self if item is value or item == value])
+
+    def remove(self, value):
+        del self[self.index(value)]
+
+    def __eq__(self, other):
+        if not isinstance(other, (list, LazyUnitList)):
+            return NotImplemented
+        if len(self) != len(other):
+            return False
+        for item, otheritem in zip(self, other):
+            if not (item is otheritem or item == otheritem):
+                return False
+        return True
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        if equal is NotImplemented:
+            return equal
+        return not equal
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def identityindex(self, unit):
+        """Returns the index of the given unit object, without creating any
+        of the other units."""
+        for index, item in enumerate(self._items):
+            if item is unit:
+                return index
+        raise ValueError("%r is not in list" % (unit,))
+
+
 class LISAfile(base.TranslationStore):
     """A class representing a file store for one of the LISA file formats."""
     UnitClass = LISAunit
@@ -275,6 +445,10 @@ class LISAfile(base.TranslationStore):
 
     namespace = None
 
+    _original = None
+    """The file as it was parsed or last saved, as long as nothing but the
+    units in :attr:`_dirtyelements` changed since then"""
+
     def __init__(self, inputfile=None, sourcelanguage='en',
                  targetlanguage=None, unitclass=None):
         super(LISAfile, self).__init__(unitclass=unitclass)
@@ -288,6 +462,7 @@ class LISAfile(base.TranslationStore):
             self.setsourcelanguage(sourcelanguage)
             self.settargetlanguage(targetlanguage)
             self.addheader()
+            self._markchanged()
         self._encoding = "UTF-8"
 
     def addheader(self):
@@ -323,12 +498,223 @@ class LISAfile(base.TranslationStore):
         super(LISAfile, self).addunit(unit)
         if new:
             self.body.append(unit.xmlelement)
+            self._markchanged()
+
+    def removeunit(self, unit):
+        if isinstance(self.units, LazyUnitList):
+            # Only the units that were accessed can be removed, so there is no
+            # need to create the others while looking for it
+            try:
+                del self.units[self.units.identityindex(unit)]
+            except ValueError:
+                raise ValueError("unit is not in this store")
+            if self._unindexed is not None:
+                self.remove_unit_from_index(unit)
+        else:
+            super(LISAfile, self).removeunit(unit)
+        parent = unit.xmlelement.getparent()
+        if parent is not None:
+            parent.remove(unit.xmlelement)
+            self._markchanged()
+
+    def _createunit(self, element):
+        """Creates the unit of this store for the given XML element."""
+        unit = self.UnitClass.createfromxmlElement(element)
+        unit.namespace = self.namespace
+        unit._store = self
+        return unit
+
+    def findid(self, id):
+        """Finds the unit with the given id.
+
+        If the units of this file were not all created yet, the ids are
+        looked up from the XML elements, and only the matching unit is
+        created.
+        """
+        units = self.units
+        getelementid = getattr(self.UnitClass, "_getelementid", None)
+        if (hasattr(self, "id_index") or getelementid is None or
+            not isinstance(units, LazyUnitList)):
+            return super(LISAfile, self).findid(id)
+        cache = getattr(self, "_elementids", None)
+        if cache is None or cache[0] is not units or cache[1] != len(units):
+            index = {}
+            for position in xrange(len(units)):
+                element = units.getelement(position)
+                index[getelementid(element, self.namespace)] = position
+            cache = self._elementids = (units, len(units), index)
+        position = cache[2].get(id)
+        if position is None:
+            return None
+        return units[position]
 
     def __str__(self):
         """Converts to a string containing the file's XML"""
         return etree.tostring(self.document, pretty_print=True,
                               xml_declaration=True, encoding='utf-8')
 
+    def _setoriginal(self, xml):
+        """Remembers the given serialised file, to only patch the units that
+        change in it when saving incrementally."""
+        if isinstance(xml, str):
+            self._original = xml
+        else:
+            self._original = None
+        self._unitranges = None
+        self._dirtyelements = set()
+
+    def _markchanged(self):
+        """Notes a change to the file outside of its units, which means that
+        the whole file needs to be written when saving."""
+        self._original = None
+
+    def _getunitranges(self):
+        """Returns a dictionary of unit elements to their (start, end) byte
+        offsets in the original file, or None if they can't be located
+        reliably."""
+        if self._unitranges is not None:
+            return self._unitranges
+        original = self._original
+        try:
+            if u"<>".encode(self._encoding) != "<>":
+                return None
+        except (LookupError, TypeError):
+            return None
+        tag = re.escape(self.UnitClass.rootNode)
+        starttag = re.compile(r"""<(?:[\w.-]+:)?%s(?:\s+[^\s=/>]+\s*=\s*(?:"[^"]*"|'[^']*'))*\s*(/?)>""" % tag)
+        endtag = re.compile(r"</(?:[\w.-]+:)?%s\s*>" % tag)
+        elements = list(self.document.getroot().iter(self.namespaced(self.UnitClass.rootNode)))
+        starts = list(starttag.finditer(original))
+        # Tags in comments or CDATA sections would upset the counts
+        if len(starts) != len(elements):
+            return None
+        if len(endtag.findall(original)) != len([m for m in starts if not m.group(1)]):
+            return None
+        ranges = {}
+        for element, start in zip(elements, starts):
+            if start.group(1):
+                end = start.end()
+            else:
+                end = endtag.search(original, start.end()).end()
+            ranges[element] = (start.start(), end)
+        self._unitranges = ranges
+        return ranges
+
+    def _serializeunit(self, element):
+        """Returns the XML of the given unit element, as written in the file
+        by an incremental save."""
+        xml = etree.tostring(element, encoding=self._encoding,
+                             xml_declaration=False, with_tail=False)
+        parent = element.getparent()
+        if parent is None:
+            return xml
+        # lxml repeats the namespace declarations of the ancestors
+        nsmap = element.nsmap
+        headend = xml.index(">")
+        head = xml[:headend]
+        for prefix, uri in parent.nsmap.items():
+            if nsmap.get(prefix) != uri:
+                continue
+            uri = uri.replace("&", "&amp;").replace("<", "&lt;").replace('"', "&quot;")
+            if prefix:
+                declaration = u' xmlns:%s="%s"' % (prefix, uri)
+            else:
+                declaration = u' xmlns="%s"' % uri
+            head = head.replace(declaration.encode(self._encoding), "", 1)
+        return head + xml[headend:]
+
+    def _saveincremental(self, filename):
+        """Patches the units that changed into the given file, which should
+        still be the file that was parsed or last saved. Returns whether this
+        was possible."""
+        original = self._original
+        if (original is None or not self.UnitClass._tracksdirty or
+            not isinstance(filename, basestring) or
+            not os.path.isfile(filename) or
+            os.path.getsize(filename) != len(original)):
+            return False
+        ranges = self._getunitranges()
+        if ranges is None:
+            return False
+        unittag = self.namespaced(self.UnitClass.rootNode)
+        if len(ranges) != sum(1 for element in self.document.getroot().iter(unittag)):
+            return False
+        patches = []
+        for element in self._dirtyelements:
+            if element not in ranges:
+                return False
+            start, end = ranges[element]
+            patches.append((start, end, element))
+        if not patches:
+            return True
+        patches.sort()
+
+        first = patches[0][0]
+        pieces = []
+        position = first
+        ends = []
+        shifts = []
+        shift = 0
+        newranges = {}
+        for start, end, element in patches:
+            xml = self._serializeunit(element)
+            pieces.append(original[position:start])
+            pieces.append(xml)
+            position = end
+            newranges[element] = (start + shift, start + shift + len(xml))
+            shift += len(xml) - (end - start)
+            ends.append(end)
+            shifts.append(shift)
+        pieces.append(original[position:])
+        tail = "".join(pieces)
+
+        storefile = open(filename, "r+b")
+        try:
+            storefile.seek(first)
+            storefile.write(tail)
+            storefile.truncate()
+        finally:
+            storefile.close()
+
+        for element, (start, end) in ranges.iteritems():
+            if element not in newranges:
+                i = bisect.bisect_right(ends, start)
+                if i:
+                    start += shifts[i - 1]
+                    end += shifts[i - 1]
+                newranges[element] = (start, end)
+        self._original = original[:first] + tail
+        self._unitranges = newranges
+        self._dirtyelements = set()
+        return True
+
+    def save(self, incremental=False):
+        """Saves to the file that data was originally read from.
+
+        With *incremental*, only the units that changed since the file was
+        parsed or last saved are written into the existing file. The whole
+        file is still written if anything else changed, if the units can't be
+        located in the file, or if the units don't track their changes (see
+        :attr:`LISAunit._tracksdirty`). Changes made directly to the
+        ``xmlelement`` of a unit are only saved if the unit is marked with
+        :meth:`LISAunit._markdirty`.
+        """
+        filename = getattr(self, "filename", None)
+        if incremental:
+            if self._saveincremental(filename):
+                return
+            if isinstance(filename, basestring) and filename:
+                storestring = str(self)
+                storefile = open(filename, "wb")
+                try:
+                    storefile.write(storestring)
+                finally:
+                    storefile.close()
+                self._setoriginal(storestring)
+                return
+        super(LISAfile, self).save()
+        self._markchanged()
+
     def parse(self, xml):
         """Populates this object from the given xml string"""
         if not hasattr(self, 'filename'):
@@ -342,6 +728,42 @@ class LISAfile(base.TranslationStore):
         self._encoding = self.document.docinfo.encoding
         self.initbody()
         assert self.document.getroot().tag == self.namespaced(self.rootNode)
-        for entry in self.document.getroot().iterdescendants(self.namespaced(self.UnitClass.rootNode)):
-            term = self.UnitClass.createfromxmlElement(entry)
-            self.addunit(term, new=False)
+        self._setoriginal(xml)
+        # Units are only created once they are used
+        elements = self.document.getroot().iterdescendants(self.namespaced(self.UnitClass.rootNode))
+        self.units = LazyUnitList(elements, self._createunit)
+
+    @classmethod
+    def iterparse(cls, storefile):
+        """Yields the units of the given file (or filename) while it is being
+        parsed.
+
+        This is meant for read-only processing of big files: a unit's element
+        is cleared and removed from the document as soon as the next unit is
+        requested, so only the current unit is kept in memory. Units
+        therefore need to be used before moving on to the next one.
+        """
+        store = cls()
+        unittag = None
+        for event, element in etree.iterparse(storefile, events=("start", "end"),
+                                              strip_cdata=False):
+            if unittag is None:
+                # The first event is the start of the root element
+                store.document = element.getroottree()
+                store.initbody()
+                if element.tag != store.namespaced(store.rootNode):
+                    raise base.ParseError(ValueError(
+                        "Expected a %s root element, found %s" %
+                        (store.rootNode, element.tag)))
+                unittag = store.namespaced(store.UnitClass.rootNode)
+            if event != "end" or element.tag != unittag:
+                continue
+            yield store._createunit(element)
+            element.clear()
+            # Only drop the units before this one, other siblings (like the
+            # context name in .ts files) might still be needed
+            parent = element.getparent()
+            previous = element.getprevious()
+            while previous is not None and previous.tag == unittag:
+                parent.remove(previous)
+                previous = element.getprevious()
@@ -41,8 +41,10 @@ in very small files.
 """
 
 import array
+import mmap
 import re
 import struct
+from cStringIO import StringIO
 
 from translate.misc.multistring import multistring
 from translate.storage import base, po, poheader
@@ -71,11 +73,8 @@ def my_swap4(result):
 def hashpjw(str_param):
     HASHWORDBITS = 32
     hval = 0
-    g = None
-    s = str_param
-    for s in str_param:
-        hval = hval << 4
-        hval += ord(s)
+    for c in bytearray(str_param):
+        hval = (hval << 4) + c
         g = hval & 0xf << (HASHWORDBITS - 4)
         if (g != 0):
             hval = hval ^ g >> (HASHWORDBITS - 8)
@@ -83,6 +82,28 @@ def hashpjw(str_param):
     return hval
 
 
+def readheader(input):
+    """Reads the header of the MO data in input.
+
+    :return: The struct byte order, the number of strings, the offsets of the
+             key and value tables, the hash table size and its offset.
+    """
+    little, = struct.unpack("<L", input[:4])
+    big, = struct.unpack(">L", input[:4])
+    if little == MO_MAGIC_NUMBER:
+        endian = "<"
+    elif big == MO_MAGIC_NUMBER:
+        endian = ">"
+    else:
+        raise ValueError("This is not an MO file")
+    magic, version_maj, version_min, lenkeys, startkey, \
+    startvalue, sizehash, offsethash = struct.unpack("%sLHHiiiii" % endian,
+                                                     input[:(7 * 4)])
+    if version_maj >= 1:
+        raise base.ParseError("""Unable to process version %d.%d MO files""" % (version_maj, version_min))
+    return endian, lenkeys, startkey, startvalue, sizehash, offsethash
+
+
 def get_next_prime_number(start):
     # find the smallest prime number that is greater or equal "start"
 
@@ -93,9 +114,11 @@ def get_next_prime_number(start):
         if (num == 2) or (num == 3):
             return True
         # check for numbers > 4
-        for divider in range(2, num / 2):
+        divider = 2
+        while divider * divider <= num:
             if num % divider == 0:
                 return False
+            divider += 1
         return True
 
     candidate = start
@@ -147,6 +170,47 @@ class mofile(poheader.poheader, base.TranslationStore):
 
     def __str__(self):
         """Output a string representation of the MO data file"""
+        output = StringIO()
+        self.serialize(output)
+        return output.getvalue()
+
+    def savefile(self, storefile):
+        """Write the MO data to the given file (or filename)."""
+        if isinstance(storefile, basestring):
+            storefile = open(storefile, 'wb')
+        self.fileobj = storefile
+        self._assignname()
+        self.serialize(storefile)
+        storefile.close()
+
+    def _getmessages(self):
+        """Return a dictionary of the encoded sources and targets of all
+        translated units"""
+        messages = {}
+        for unit in self.units:
+            # If the unit is not translated, we should rather omit it entirely
+            if not unit.istranslated():
+                continue
+            if isinstance(unit.source, multistring):
+                source = "".join(unit.msgidcomments) + \
+                         "\0".join(unit.source.strings)
+            else:
+                source = "".join(unit.msgidcomments) + unit.source
+            if unit.msgctxt:
+                source = "".join(unit.msgctxt) + "\x04" + source
+            if isinstance(unit.target, multistring):
+                target = "\0".join(unit.target.strings)
+            else:
+                target = unit.target
+            if unit.target:
+                # TODO: We don't do any encoding detection from the PO Header
+                if isinstance(target, unicode):
+                    target = target.encode('utf-8')
+                messages[source.encode("utf-8")] = target
+        return messages
+
+    def serialize(self, out):
+        """Write the MO data to the file-like object out"""
         # check the header of this file for the copyright note of this function
 
         def add_to_hash_table(string, i):
@@ -171,70 +235,75 @@ class mofile(poheader.poheader, base.TranslationStore):
         hash_size = get_next_prime_number(int((len(self.units) * 4) / 3))
         if hash_size <= 2:
             hash_size = 3
-        MESSAGES = {}
-        for unit in self.units:
-            # If the unit is not translated, we should rather omit it entirely
-            if not unit.istranslated():
-                continue
-            if isinstance(unit.source, multistring):
-                source = "".join(unit.msgidcomments) + \
-                         "\0".join(unit.source.strings)
-            else:
-                source = "".join(unit.msgidcomments) + unit.source
-            if unit.msgctxt:
-                source = "".join(unit.msgctxt) + "\x04" + source
-            if isinstance(unit.target, multistring):
-                target = "\0".join(unit.target.strings)
-            else:
-                target = unit.target
-            if unit.target:
-                MESSAGES[source.encode("utf-8")] = target
-        # using "I" works for 32- and 64-bit systems, but not for 16-bit!
-        hash_table = array.array("I", [0] * hash_size)
-        keys = MESSAGES.keys()
+        messages = self._getmessages()
         # the keys are sorted in the .mo file
-        keys.sort()
-        offsets = []
-        ids = strs = ''
-        for i, id in enumerate(keys):
-            # For each string, we need size and file offset.  Each string is
-            # NUL terminated; the NUL does not count into the size.
-            # TODO: We don't do any encoding detection from the PO Header
-            add_to_hash_table(id, i)
-            string = MESSAGES[id]  # id already encoded for use as dictionary key
-            if isinstance(string, unicode):
-                string = string.encode('utf-8')
-            offsets.append((len(ids), len(id), len(strs), len(string)))
-            ids = ids + id + '\0'
-            strs = strs + string + '\0'
-        output = ''
-        # The header is 7 32-bit unsigned integers
-        keystart = 7 * 4 + 16 * len(keys) + hash_size * 4
-        # and the values start after the keys
-        valuestart = keystart + len(ids)
-        koffsets = []
-        voffsets = []
+        keys = sorted(messages)
+        values = [messages[key] for key in keys]
+        # using "I" works for 32- and 64-bit systems, but not for 16-bit!
+        hash_table = array.array("I", [0]) * hash_size
         # The string table first has the list of keys, then the list of values.
         # Each entry has first the size of the string, then the file offset.
-        for o1, l1, o2, l2 in offsets:
-            koffsets = koffsets + [l1, o1 + keystart]
-            voffsets = voffsets + [l2, o2 + valuestart]
-        offsets = koffsets + voffsets
-        output = struct.pack("Iiiiiii",
-                             MO_MAGIC_NUMBER,   # Magic
-                             0,                 # Version
-                             len(keys),         # # of entries
-                             7 * 4,             # start of key index
-                             7 * 4 + len(keys) * 8,  # start of value index
-                             hash_size,         # size of hash table
-                             7 * 4 + 2 * (len(keys) * 8))  # offset of hash table
+        # Each string is NUL terminated; the NUL does not count into the size.
+        offsets = array.array("i", [0]) * (4 * len(keys))
+        # The header is 7 32-bit unsigned integers, and the strings start
+        # after the string table and the hash table
+        offset = 7 * 4 + 16 * len(keys) + hash_size * 4
+        for i, key in enumerate(keys):
+            add_to_hash_table(key, i)
+            offsets[2 * i] = len(key)
+            offsets[2 * i + 1] = offset
+            offset += len(key) + 1
+        # and the values start after the keys
+        voffset = 2 * len(keys)
+        for i, value in enumerate(values):
+            offsets[voffset + 2 * i] = len(value)
+            offsets[voffset + 2 * i + 1] = offset
+            offset += len(value) + 1
+        out.write(struct.pack("Iiiiiii",
+                              MO_MAGIC_NUMBER,   # Magic
+                              0,                 # Version
+                              len(keys),         # # of entries
+                              7 * 4,             # start of key index
+                              7 * 4 + len(keys) * 8,  # start of value index
+                              hash_size,         # size of hash table
+                              7 * 4 + 2 * (len(keys) * 8)))  # offset of hash table
         # additional data is not necessary for empty mo files
         if (len(keys) > 0):
-            output = output + array.array("i", offsets).tostring()
-            output = output + hash_table.tostring()
-            output = output + ids
-            output = output + strs
-        return output
+            out.write(offsets.tostring())
+            out.write(hash_table.tostring())
+            for key in keys:
+                out.write(key)
+                out.write('\0')
+            for value in values:
+                out.write(value)
+                out.write('\0')
+
+    def _readunit(self, input, endian, startkey, startvalue, i):
+        """Returns the i-th unit of the MO data in input"""
+        nextkey = startkey + (i * 2 * 4)
+        nextvalue = startvalue + (i * 2 * 4)
+        klength, koffset = struct.unpack("%sii" % endian,
+                                         input[nextkey:nextkey + (2 * 4)])
+        vlength, voffset = struct.unpack("%sii" % endian,
+                                         input[nextvalue:nextvalue + (2 * 4)])
+        source = input[koffset:koffset + klength]
+        context = None
+        if "\x04" in source:
+            context, source = source.split("\x04")
+        # Still need to handle KDE comments
+        source = multistring(source.split("\0"), encoding=self._encoding)
+        if source == "":
+            charset = re.search("charset=([^\\s]+)",
+                                input[voffset:voffset + vlength])
+            if charset:
+                self._encoding = po.encodingToUse(charset.group(1))
+        target = multistring(input[voffset:voffset + vlength].split("\0"),
+                             encoding=self._encoding)
+        newunit = mounit(source)
+        newunit.settarget(target)
+        if context is not None:
+            newunit.msgctxt.append(context)
+        return newunit
 
     def parse(self, input):
         """parses the given file or file source string"""
@@ -246,41 +315,126 @@ class mofile(poheader.poheader, base.TranslationStore):
             mosrc = input.read()
             input.close()
             input = mosrc
-        little, = struct.unpack("<L", input[:4])
-        big, = struct.unpack(">L", input[:4])
-        if little == MO_MAGIC_NUMBER:
-            endian = "<"
-        elif big == MO_MAGIC_NUMBER:
-            endian = ">"
-        else:
-            raise ValueError("This is not an MO file")
-        magic, version_maj, version_min, lenkeys, startkey, \
-        startvalue, sizehash, offsethash = struct.unpack("%sLHHiiiii" % endian,
-                                                         input[:(7 * 4)])
-        if version_maj >= 1:
-            raise base.ParseError("""Unable to process version %d.%d MO files""" % (version_maj, version_min))
+        endian, lenkeys, startkey, startvalue, sizehash, offsethash = \
+                readheader(input)
         for i in range(lenkeys):
-            nextkey = startkey + (i * 2 * 4)
-            nextvalue = startvalue + (i * 2 * 4)
-            klength, koffset = struct.unpack("%sii" % endian,
-                                             input[nextkey:nextkey + (2 * 4)])
-            vlength, voffset = struct.unpack("%sii" % endian,
-                                             input[nextvalue:nextvalue + (2 * 4)])
-            source = input[koffset:koffset + klength]
-            context = None
-            if "\x04" in source:
-                context, source = source.split("\x04")
-            # Still need to handle KDE comments
-            source = multistring(source.split("\0"), encoding=self._encoding)
-            if source == "":
-                charset = re.search("charset=([^\\s]+)",
-                                    input[voffset:voffset + vlength])
-                if charset:
-                    self._encoding = po.encodingToUse(charset.group(1))
-            target = multistring(input[voffset:voffset + vlength].split("\0"),
-                                 encoding=self._encoding)
-            newunit = mounit(source)
-            newunit.settarget(target)
-            if context is not None:
-                newunit.msgctxt.append(context)
-            self.addunit(newunit)
+            self.addunit(self._readunit(input, endian, startkey, startvalue, i))
+
+
+class lazymofile(mofile):
+    """A read-only .mo file that is only decoded as needed.
+
+    The file is memory mapped, and :meth:`findunit` and :meth:`translate`
+    use the hash table of the file (or the sorted keys) to decode only the
+    message that is asked for. :attr:`units` is only built when it is
+    accessed. Like with gettext, messages with a context are not found by
+    their source text alone.
+    """
+
+    def __init__(self, inputfile=None, unitclass=mounit):
+        self._data = None
+        mofile.__init__(self, unitclass=unitclass)
+        self._units = None
+        if inputfile is not None:
+            self.openfile(inputfile)
+
+    def _getunits(self):
+        if self._units is None:
+            self._units = []
+            if self._data is not None:
+                for i in xrange(self._lenkeys):
+                    self.addunit(self._getunit(i))
+        return self._units
+
+    def _setunits(self, units):
+        self._units = units
+
+    units = property(_getunits, _setunits)
+
+    def openfile(self, storefile):
+        """Memory maps the given file (or filename)."""
+        if isinstance(storefile, basestring):
+            storefile = open(storefile, 'rb')
+        self.filename = getattr(storefile, 'name', '')
+        try:
+            self._data = mmap.mmap(storefile.fileno(), 0,
+                                   access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files can't be mapped
+            raise ValueError("This is not an MO file")
+        finally:
+            storefile.close()
+        self._units = None
+        self._endian, self._lenkeys, self._startkey, self._startvalue, \
+                self._sizehash, self._offsethash = readheader(self._data)
+        # The header is the first key, since the empty key sorts first
+        if self._lenkeys and self._getmsgid(0) == "":
+            self._getunit(0)
+
+    def close(self):
+        """Releases the memory map of the file."""
+        if self._data is not None:
+            # Keep the store usable after the file is gone
+            self._getunits()
+            self._data.close()
+            self._data = None
+
+    def _getunit(self, i):
+        return self._readunit(self._data, self._endian, self._startkey,
+                              self._startvalue, i)
+
+    def _getmsgid(self, i):
+        """Returns the key of message i, without any plural"""
+        klength, koffset = struct.unpack_from("%sii" % self._endian,
+                                              self._data,
+                                              self._startkey + i * 2 * 4)
+        return self._data[koffset:koffset + klength].split("\0", 1)[0]
+
+    def _findindex(self, msgid):
+        """Returns the index of the message with the given (encoded) msgid,
+        or None"""
+        data = self._data
+        size = self._sizehash
+        if size > 2:
+            # Like gettext, we only hash the msgid, not the plural
+            hval = hashpjw(msgid)
+            cursor = hval % size
+            increment = 1 + (hval % (size - 2))
+            for probe in xrange(size):
+                index, = struct.unpack_from("%sI" % self._endian, data,
+                                            self._offsethash + cursor * 4)
+                if index == 0:
+                    break
+                if self._getmsgid(index - 1) == msgid:
+                    return index - 1
+                cursor = (cursor + increment) % size
+        # Not all writers hash plural keys the same way, so we fall back to a
+        # binary search of the sorted keys
+        low, high = 0, self._lenkeys
+        while low < high:
+            middle = (low + high) // 2
+            if self._getmsgid(middle) < msgid:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self._lenkeys and self._getmsgid(low) == msgid:
+            return low
+        return None
+
+    def unit_iter(self):
+        if self._units is not None or self._data is None:
+            for unit in self.units:
+                yield unit
+            return
+        for i in xrange(self._lenkeys):
+            yield self._getunit(i)
+
+    def findunit(self, source):
+        if self._units is not None or self._data is None:
+            return super(lazymofile, self).findunit(source)
+        if isinstance(source, unicode):
+            source = source.encode(self._encoding)
+        index = self._findindex(source)
+        if index is None:
+            return None
+        return self._getunit(index)
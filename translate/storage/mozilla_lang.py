@@ -52,6 +52,7 @@ class LangUnit(base.TranslationUnit):
 
     def addlocation(self, location):
         self.locations.append(location)
+        self._update_store_index()
 
 
 class LangStore(txt.TxtFile):
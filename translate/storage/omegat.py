@@ -115,7 +115,8 @@ class OmegaTUnit(base.TranslationUnit):
 
     def setsource(self, newsource):
         self._rich_source = None
-        return self._set_field('source', newsource)
+        self._set_field('source', newsource)
+        self._update_store_index()
     source = property(getsource, setsource)
 
     def gettarget(self):
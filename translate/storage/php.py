@@ -138,6 +138,7 @@ class phpunit(base.TranslationUnit):
         """Set the source AND the target to be equal."""
         self._rich_source = None
         self.value = phpencode(source, self.escape_type)
+        self._update_store_index()
 
     def getsource(self):
         return phpdecode(self.value, self.escape_type)
@@ -164,6 +165,7 @@ class phpunit(base.TranslationUnit):
 
     def addlocation(self, location):
         self.name = location
+        self._update_store_index()
 
     def getlocations(self):
         return [self.name]
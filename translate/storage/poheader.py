@@ -58,6 +58,41 @@ def parseheaderstring(input):
     return headervalues
 
 
+def parsefileheader(storefile):
+    """Reads only the header of the given PO file (or file name) and returns
+    the interpreted values as a dictionary.
+
+    Nothing after the header is read or parsed, which makes this much faster
+    than loading the whole file if only the header values are needed."""
+    from translate.storage import pypo
+    if isinstance(storefile, basestring):
+        storefile = open(storefile, 'rb')
+    try:
+        store = pypo.pofile()
+        store.parse(storefile, headeronly=True)
+    finally:
+        storefile.close()
+    return store.parseheader()
+
+
+def parsefileheaders(storefiles, threads=8):
+    """Reads the headers of many PO files concurrently, using a pool of
+    threads.
+
+    :return: Dictionary mapping each of the given file names to the values
+             of its header, as returned by :func:`parsefileheader`.
+    """
+    from multiprocessing.pool import ThreadPool
+    storefiles = list(storefiles)
+    pool = ThreadPool(threads)
+    try:
+        headers = pool.map(parsefileheader, storefiles)
+    finally:
+        pool.close()
+        pool.join()
+    return dict(zip(storefiles, headers))
+
+
 def tzstring():
     """Returns the timezone as a string in the format [+-]0000, eg +0200.
 
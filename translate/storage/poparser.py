@@ -44,11 +44,15 @@ decode = str.decode
 
 class ParseState(object):
 
-    def __init__(self, input_iterator, UnitClass, encoding=None):
+    def __init__(self, input_iterator, UnitClass, encoding=None,
+                 interned=None):
         self._input_iterator = input_iterator
         self.next_line = ''
         self.eof = False
         self.encoding = encoding
+        if interned is None:
+            interned = {}
+        self._interned = interned
         self.read_line()
         self.UnitClass = UnitClass
 
@@ -58,6 +62,14 @@ class ParseState(object):
         else:
             return string
 
+    def intern(self, string):
+        """Returns a shared copy of string for comments that are repeated
+        across many units (locations and flags).
+
+        The builtin intern() doesn't handle unicode, so we keep our own table
+        for the lifetime of this parse."""
+        return self._interned.setdefault(string, string)
+
     def read_line(self):
         current = self.next_line
         if self.eof:
@@ -72,7 +84,8 @@ class ParseState(object):
         return current
 
     def new_input(self, _input):
-        return ParseState(_input, self.UnitClass, self.encoding)
+        return ParseState(_input, self.UnitClass, self.encoding,
+                          self._interned)
 
 
 def read_prevmsgid_lines(parse_state):
@@ -124,9 +137,11 @@ def parse_comment(parse_state, unit):
             parse_prev_msgid_plural(ps, unit)
             return parse_state.next_line
         elif next_char == ':':
-            append(unit.sourcecomments, parse_state.decode(next_line))
+            append(unit.sourcecomments,
+                   parse_state.intern(parse_state.decode(next_line)))
         elif next_char == ',':
-            append(unit.typecomments, parse_state.decode(next_line))
+            append(unit.typecomments,
+                   parse_state.intern(parse_state.decode(next_line)))
         elif next_char == '~':
             # Special case: we refuse to parse obsoletes: they are done
             # elsewhere to ensure we reuse the normal unit parsing code
@@ -217,13 +232,20 @@ def parse_message(parse_state, start_of_string, start_of_string_len, msg_list, m
 
 
 def parse_msgctxt(parse_state, unit):
+    # Only touch unit.msgctxt if there is one, since units might allocate
+    # their rarely used lists lazily
+    if not startswith(parse_state.next_line, 'msgctxt'):
+        return False
     parse_message(parse_state, 'msgctxt', 7, unit.msgctxt)
     return len(unit.msgctxt) > 0
 
 
 def parse_msgid(parse_state, unit):
-    parse_message(parse_state, 'msgid', 5, unit.msgid, unit.msgidcomments)
-    return len(unit.msgid) > 0 or len(unit.msgidcomments) > 0
+    msgidcomments = []
+    parse_message(parse_state, 'msgid', 5, unit.msgid, msgidcomments)
+    if msgidcomments:
+        unit.msgidcomments.extend(msgidcomments)
+    return len(unit.msgid) > 0 or len(msgidcomments) > 0
 
 
 def parse_msgstr(parse_state, unit):
@@ -346,6 +368,16 @@ def parse_header(parse_state, store):
     return first_unit
 
 
+def parse_header_only(parse_state, store):
+    """Parses only the first unit (the header, if the file has one) into
+    store, without reading any further than the start of the second unit."""
+    unit = parse_header(parse_state, store)
+    if unit is not None:
+        unit.infer_state()
+        store.addunit(unit)
+    return parse_state.eof
+
+
 def parse_units(parse_state, store):
     unit = parse_header(parse_state, store)
     while unit:
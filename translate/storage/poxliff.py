@@ -104,6 +104,7 @@ class PoXliffUnit(xliff.xliffunit):
                 self.units.append(newunit)
                 self.xmlelement.append(newunit.xmlelement)
             self.target = target
+            self._update_store_index()
 
     # We don't support any rich strings yet
     multistring_to_rich = base.TranslationUnit.multistring_to_rich
@@ -209,6 +210,7 @@ class PoXliffUnit(xliff.xliffunit):
         if len(self.units) > 1:
             for i in range(len(self.units)):
                 self.units[i].setid("%s[%d]" % (id, i))
+        self._update_store_index()
 
     def getlocations(self):
         """Returns all the references (source locations)"""
@@ -344,6 +346,7 @@ class PoXliffFile(xliff.xlifffile, poheader.poheader):
                 pluralnum += 1
                 group.append(unit.xmlelement)
                 self.units.append(unit)
+        self._countunits(group)
 
         return self.units[-pluralnum]
 
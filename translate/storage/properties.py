@@ -453,6 +453,7 @@ class propunit(base.TranslationUnit):
         self._rich_source = None
         source = data.forceunicode(source)
         self.value = self.personality.encode(source or u"", self.encoding)
+        self._update_store_index()
 
     source = property(getsource, setsource)
 
@@ -552,6 +553,7 @@ class propunit(base.TranslationUnit):
 
     def setid(self, value):
         self.name = value
+        self._update_store_index()
 
 
 class propfile(base.TranslationStore):
@@ -169,6 +169,23 @@ def extractstr(string):
         return string[left:] + '"'
 
 
+def _lazylist(name):
+    """Builds a property for a rarely used list attribute that is only
+    allocated when it is first accessed."""
+
+    def getter(self):
+        value = getattr(self, name)
+        if value is None:
+            value = []
+            setattr(self, name, value)
+        return value
+
+    def setter(self, value):
+        setattr(self, name, value)
+
+    return property(getter, setter)
+
+
 class pounit(pocommon.pounit):
     # othercomments = []      #   # this is another comment
     # automaticcomments = []  #   #. comment extracted from the source code
@@ -182,21 +199,37 @@ class pounit(pocommon.pounit):
     # msgid = []
     # msgstr = []
 
+    # A PO compendium can easily contain hundreds of thousands of units, so
+    # we keep the unit attributes in slots instead of a per-instance dict.
+    # The lists that are empty for most units are only allocated when they
+    # are accessed (see _lazylist), internally we check the slot directly.
+    __slots__ = ('_encoding', 'obsolete',
+                 'othercomments', 'automaticcomments', 'sourcecomments',
+                 'typecomments', '_msgidcomments',
+                 '_prev_msgctxt', '_prev_msgid', '_prev_msgid_plural',
+                 '_msgctxt', 'msgid', '_msgid_pluralcomments',
+                 '_msgid_plural', 'msgstr',
+                 '_store', '_state_n', '_rich_source', '_rich_target')
+
     # Our homegrown way to indicate what must be copied in a shallow
     # fashion
     __shallow__ = ['_store']
 
     def __init__(self, source=None, encoding="UTF-8"):
+        self._store = None
+        self._state_n = 0
+        self._rich_source = None
+        self._rich_target = None
         self._encoding = encodingToUse(encoding)
         self.obsolete = False
         self._initallcomments(blankall=True)
-        self.prev_msgctxt = []
-        self.prev_msgid = []
-        self.prev_msgid_plural = []
-        self.msgctxt = []
+        self._prev_msgctxt = None
+        self._prev_msgid = None
+        self._prev_msgid_plural = None
+        self._msgctxt = None
         self.msgid = []
-        self.msgid_pluralcomments = []
-        self.msgid_plural = []
+        self._msgid_pluralcomments = None
+        self._msgid_plural = None
         self.msgstr = []
         pocommon.pounit.__init__(self, source)
 
@@ -207,7 +240,26 @@ class pounit(pocommon.pounit):
             self.automaticcomments = []
             self.sourcecomments = []
             self.typecomments = []
-            self.msgidcomments = []
+            self._msgidcomments = None
+
+    msgidcomments = _lazylist('_msgidcomments')
+    prev_msgctxt = _lazylist('_prev_msgctxt')
+    prev_msgid = _lazylist('_prev_msgid')
+    prev_msgid_plural = _lazylist('_prev_msgid_plural')
+    msgctxt = _lazylist('_msgctxt')
+    msgid_pluralcomments = _lazylist('_msgid_pluralcomments')
+    msgid_plural = _lazylist('_msgid_plural')
+
+    def __getstate__(self):
+        state = getattr(self, '__dict__', {}).copy()
+        for key in self.__slots__:
+            if hasattr(self, key):
+                state[key] = getattr(self, key)
+        return state
+
+    def __setstate__(self, state):
+        for key, value in state.iteritems():
+            setattr(self, key, value)
 
     def _get_all_comments(self):
         return [self.othercomments,
@@ -246,7 +298,7 @@ class pounit(pocommon.pounit):
 
     def getsource(self):
         """Returns the unescaped msgid"""
-        return self._get_source_vars(self.msgid, self.msgid_plural)
+        return self._get_source_vars(self.msgid, self._msgid_plural or [])
 
     def setsource(self, source):
         """Sets the msgid to the given (unescaped) value.
@@ -255,11 +307,13 @@ class pounit(pocommon.pounit):
         """
         self._rich_source = None
         self.msgid, self.msgid_plural = self._set_source_vars(source)
+        self._update_store_index()
     source = property(getsource, setsource)
 
     def _get_prev_source(self):
         """Returns the unescaped msgid"""
-        return self._get_source_vars(self.prev_msgid, self.prev_msgid_plural)
+        return self._get_source_vars(self._prev_msgid or [],
+                                     self._prev_msgid_plural or [])
 
     def _set_prev_source(self, source):
         """Sets the msgid to the given (unescaped) value.
@@ -374,7 +428,7 @@ class pounit(pocommon.pounit):
         # self.__shallow__
         shallow = set(self.__shallow__)
         # Make deep copies of all members which are not in shallow
-        for key, value in self.__dict__.iteritems():
+        for key, value in self.__getstate__().iteritems():
             if key not in shallow:
                 setattr(new_unit, key, copy.deepcopy(value))
         # Make shallow copies of all members which are in shallow
@@ -391,7 +445,7 @@ class pounit(pocommon.pounit):
 
     def _msgidlen(self):
         if self.hasplural():
-            return len(unquotefrompo(self.msgid)) + len(unquotefrompo(self.msgid_plural))
+            return len(unquotefrompo(self.msgid)) + len(unquotefrompo(self._msgid_plural))
         else:
             return len(unquotefrompo(self.msgid))
 
@@ -441,6 +495,7 @@ class pounit(pocommon.pounit):
                 for item in list2:
                     splitlist2.extend(item.split()[1:])
                     prefix = item.split()[0]
+                splitlist1 = set(splitlist1)
                 list1.extend(["%s %s%s" % (prefix, item, lineend) for item in splitlist2 if not item in splitlist1])
             else:
                 #Normal merge, but conform to list1 newline style
@@ -485,13 +540,13 @@ class pounit(pocommon.pounit):
         #rewritten here for performance:
         return (is_null(self.msgid)
                         and not is_null(self.msgstr)
-                        and self.msgidcomments == []
-                        and is_null(self.msgctxt))
+                        and not self._msgidcomments
+                        and is_null(self._msgctxt or []))
 
     def isblank(self):
-        if self.isheader() or len(self.msgidcomments):
+        if self.isheader() or self._msgidcomments:
             return False
-        if (self._msgidlen() == 0) and (self._msgstrlen() == 0) and (is_null(self.msgctxt)):
+        if (self._msgidlen() == 0) and (self._msgstrlen() == 0) and (is_null(self._msgctxt or [])):
             return True
         return False
         # TODO: remove:
@@ -573,7 +628,7 @@ class pounit(pocommon.pounit):
 
     def hasplural(self):
         """returns whether this pounit contains plural strings..."""
-        return len(self.msgid_plural) > 0
+        return bool(self._msgid_plural)
 
     def parse(self, src):
         return poparser.parse_unit(poparser.ParseState(StringIO(src), pounit), self)
@@ -638,14 +693,14 @@ class pounit(pocommon.pounit):
         """return this po element as a string"""
 
         def add_prev_msgid_lines(lines, prefix, header, var):
-            if len(var) > 0:
+            if var:
                 lines.append("%s %s %s\n" % (prefix, header, var[0]))
                 lines.extend("%s %s\n" % (prefix, line) for line in var[1:])
 
         def add_prev_msgid_info(lines, prefix):
-            add_prev_msgid_lines(lines, prefix, 'msgctxt', self.prev_msgctxt)
-            add_prev_msgid_lines(lines, prefix, 'msgid', self.prev_msgid)
-            add_prev_msgid_lines(lines, prefix, 'msgid_plural', self.prev_msgid_plural)
+            add_prev_msgid_lines(lines, prefix, 'msgctxt', self._prev_msgctxt)
+            add_prev_msgid_lines(lines, prefix, 'msgid', self._prev_msgid)
+            add_prev_msgid_lines(lines, prefix, 'msgid_plural', self._prev_msgid_plural)
 
         lines = []
         lines.extend(self.othercomments)
@@ -653,10 +708,10 @@ class pounit(pocommon.pounit):
             lines.extend(self.typecomments)
             obsoletelines = []
             add_prev_msgid_info(obsoletelines, prefix="#~|")
-            if self.msgctxt:
-                obsoletelines.append(self._getmsgpartstr("#~ msgctxt", self.msgctxt))
-            obsoletelines.append(self._getmsgpartstr("#~ msgid", self.msgid, self.msgidcomments))
-            if self.msgid_plural or self.msgid_pluralcomments:
+            if self._msgctxt:
+                obsoletelines.append(self._getmsgpartstr("#~ msgctxt", self._msgctxt))
+            obsoletelines.append(self._getmsgpartstr("#~ msgid", self.msgid, self._msgidcomments or ""))
+            if self._msgid_plural or self._msgid_pluralcomments:
                 obsoletelines.append(self._getmsgpartstr("#~ msgid_plural", self.msgid_plural, self.msgid_pluralcomments))
             obsoletelines.append(self._getmsgpartstr("#~ msgstr", self.msgstr))
             for index, obsoleteline in enumerate(obsoletelines):
@@ -674,10 +729,10 @@ class pounit(pocommon.pounit):
         lines.extend(self.sourcecomments)
         lines.extend(self.typecomments)
         add_prev_msgid_info(lines, prefix="#|")
-        if self.msgctxt:
-            lines.append(self._getmsgpartstr(u"msgctxt", self.msgctxt))
-        lines.append(self._getmsgpartstr(u"msgid", self.msgid, self.msgidcomments))
-        if self.msgid_plural or self.msgid_pluralcomments:
+        if self._msgctxt:
+            lines.append(self._getmsgpartstr(u"msgctxt", self._msgctxt))
+        lines.append(self._getmsgpartstr(u"msgid", self.msgid, self._msgidcomments or ""))
+        if self._msgid_plural or self._msgid_pluralcomments:
             lines.append(self._getmsgpartstr(u"msgid_plural", self.msgid_plural, self.msgid_pluralcomments))
         lines.append(self._getmsgpartstr(u"msgstr", self.msgstr))
         postr = u"".join(lines)
@@ -708,6 +763,7 @@ class pounit(pocommon.pounit):
         if location.find(" ") != -1:
             location = pocommon.quote_plus(location)
         self.sourcecomments.append("#: %s\n" % location)
+        self._update_store_index()
 
     def _extract_msgidcomments(self, text=None):
         """Extract KDE style msgid comments from the unit.
@@ -718,24 +774,25 @@ class pounit(pocommon.pounit):
         """
 
         if not text:
-            text = unquotefrompo(self.msgidcomments)
+            text = unquotefrompo(self._msgidcomments or [])
         return text.split('\n')[0].replace('_: ', '', 1)
 
     def setmsgidcomment(self, msgidcomment):
         if msgidcomment:
             self.msgidcomments = ['"_: %s\\n"' % msgidcomment]
         else:
-            self.msgidcomments = []
+            self._msgidcomments = None
 
     msgidcomment = property(_extract_msgidcomments, setmsgidcomment)
 
     def getcontext(self):
         """Get the message context."""
-        return unquotefrompo(self.msgctxt) + self._extract_msgidcomments()
+        return unquotefrompo(self._msgctxt or []) + self._extract_msgidcomments()
 
     def setcontext(self, context):
         context = data.forceunicode(context)
         self.msgctxt = quoteforpo(context)
+        self._update_store_index()
 
     def getid(self):
         """Returns a unique identifier for this unit."""
@@ -746,7 +803,7 @@ class pounit(pocommon.pounit):
         # commented out for conformance to gettext.
 #        id = '\0'.join(self.source.strings)
         id = self.source
-        if self.msgidcomments:
+        if self._msgidcomments:
             id = u"_: %s\n%s" % (context, id)
         elif context:
             id = u"%s\04%s" % (context, id)
@@ -757,8 +814,12 @@ class pofile(pocommon.pofile):
     """A .po file containing various units"""
     UnitClass = pounit
 
-    def parse(self, input):
-        """Parses the given file or file source string."""
+    def parse(self, input, headeronly=False):
+        """Parses the given file or file source string.
+
+        :param headeronly: Only parse the header, ignoring the rest of the
+                           file.
+        """
         if True:
             if hasattr(input, 'name'):
                 self.filename = input.name
@@ -768,7 +829,69 @@ class pofile(pocommon.pofile):
                 input = StringIO(input)
             # clear units to get rid of automatically generated headers before parsing
             self.units = []
-            poparser.parse_units(poparser.ParseState(input, pounit), self)
+            if headeronly:
+                poparser.parse_header_only(poparser.ParseState(input, pounit), self)
+            else:
+                poparser.parse_units(poparser.ParseState(input, pounit), self)
+
+    # The attributes of every unit that are kept by tocache(), in order
+    _cachefields = ('_encoding', 'obsolete', '_state_n',
+                    'othercomments', 'automaticcomments', 'sourcecomments',
+                    'typecomments', '_msgidcomments',
+                    '_prev_msgctxt', '_prev_msgid', '_prev_msgid_plural',
+                    '_msgctxt', 'msgid', '_msgid_pluralcomments',
+                    '_msgid_plural', 'msgstr')
+
+    def tocache(self):
+        """Returns the parsed contents of the store as plain lists and
+        strings, that can be serialised as JSON and turned into a store again
+        with :meth:`fromcache` without parsing the file."""
+        fields = self._cachefields
+        return [self._encoding,
+                [[getattr(unit, field) for field in fields] for unit in self.units]]
+
+    @classmethod
+    def fromcache(cls, cachedata):
+        """Returns the store for data returned by :meth:`tocache`."""
+        encoding, unitsdata = cachedata
+        store = cls()
+        store._encoding = encoding
+        units = []
+        for (unitencoding, obsolete, state_n,
+             othercomments, automaticcomments, sourcecomments,
+             typecomments, msgidcomments,
+             prev_msgctxt, prev_msgid, prev_msgid_plural,
+             msgctxt, msgid, msgid_pluralcomments,
+             msgid_plural, msgstr) in unitsdata:
+            # Creating the units without __init__ is what makes this faster
+            # than parsing, so every slot has to be set here
+            unit = object.__new__(cls.UnitClass)
+            unit._store = store
+            unit._rich_source = None
+            unit._rich_target = None
+            unit._encoding = unitencoding
+            unit.obsolete = obsolete
+            unit._state_n = state_n
+            unit.othercomments = othercomments
+            unit.automaticcomments = automaticcomments
+            unit.sourcecomments = sourcecomments
+            unit.typecomments = typecomments
+            unit._msgidcomments = msgidcomments
+            unit._prev_msgctxt = prev_msgctxt
+            unit._prev_msgid = prev_msgid
+            unit._prev_msgid_plural = prev_msgid_plural
+            unit._msgctxt = msgctxt
+            unit.msgid = msgid
+            unit._msgid_pluralcomments = msgid_pluralcomments
+            unit._msgid_plural = msgid_plural
+            if isinstance(msgstr, dict):
+                # JSON turns the plural indexes into strings
+                msgstr = dict([(int(index), lines)
+                               for index, lines in msgstr.iteritems()])
+            unit.msgstr = msgstr
+            units.append(unit)
+        store.units = units
+        return store
 
     def removeduplicates(self, duplicatestyle="merge"):
         """Make sure each msgid is unique ; merge comments etc from
@@ -777,42 +900,45 @@ class pofile(pocommon.pofile):
         # about files already containing msgctxt? - test
         id_dict = {}
         uniqueunits = []
-        # TODO: this is using a list as the pos aren't hashable, but this is slow.
-        # probably not used frequently enough to worry about it, though.
-        markedpos = []
+        # The units aren't hashable by content, so we keep track of the ones
+        # we already marked by their identity.
+        markedpos = set()
 
         def addcomment(thepo):
             thepo.msgidcomments.append('"_: %s\\n"' % " ".join(thepo.getlocations()))
-            markedpos.append(thepo)
+            markedpos.add(id(thepo))
         for thepo in self.units:
-            id = thepo.getid()
+            unitid = thepo.getid()
             if thepo.isheader() and not thepo.getlocations():
                 # header msgids shouldn't be merged...
                 uniqueunits.append(thepo)
-            elif id in id_dict:
+            elif unitid in id_dict:
                 if duplicatestyle == "merge":
-                    if id:
-                        id_dict[id].merge(thepo)
+                    if unitid:
+                        id_dict[unitid].merge(thepo)
                     else:
                         addcomment(thepo)
                         uniqueunits.append(thepo)
                 elif duplicatestyle == "msgctxt":
-                    origpo = id_dict[id]
-                    if origpo not in markedpos and id:
+                    origpo = id_dict[unitid]
+                    if id(origpo) not in markedpos and unitid:
                         # if it doesn't have an id, we already added msgctxt
                         origpo.msgctxt.append('"%s"' % escapeforpo(" ".join(origpo.getlocations())))
-                        markedpos.append(thepo)
+                        markedpos.add(id(origpo))
                     thepo.msgctxt.append('"%s"' % escapeforpo(" ".join(thepo.getlocations())))
                     uniqueunits.append(thepo)
             else:
-                if not id:
+                if not unitid:
                     if duplicatestyle == "merge":
                         addcomment(thepo)
                     else:
                         thepo.msgctxt.append('"%s"' % escapeforpo(" ".join(thepo.getlocations())))
-                id_dict[id] = thepo
+                id_dict[unitid] = thepo
                 uniqueunits.append(thepo)
         self.units = uniqueunits
+        if self._unindexed is not None:
+            # The ids of the units changed, and merged units are gone
+            self.makeindex()
 
     def __str__(self):
         """Convert to a string. Double check that unicode is handled somehow
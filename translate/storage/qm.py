@@ -60,6 +60,7 @@ http://qt.gitorious.org/+kde-developers/qt/kde-qt/blobs/master/tools/linguist/sh
 
 import codecs
 import logging
+import mmap
 import struct
 
 from translate.misc.multistring import multistring
@@ -70,6 +71,11 @@ logger = logging.getLogger(__name__)
 
 QM_MAGIC_NUMBER = (0x3CB86418, 0xCAEF9C95, 0xCD211CBF, 0x60A1BDDD)
 
+QM_HASHES = 0x42
+QM_MESSAGES = 0x69
+QM_CONTEXTS = 0x2f
+QM_NUMERUSRULES = 0x88
+
 
 def qmunpack(file_='messages.qm'):
     """Helper to unpack Qt .qm files into a Python string"""
@@ -79,6 +85,111 @@ def qmunpack(file_='messages.qm'):
     f.close()
 
 
+def elfhash(str_param):
+    """The ELF hash that Qt uses to look up messages in .qm files"""
+    hval = 0
+    for c in bytearray(str_param):
+        hval = ((hval << 4) + c) & 0xffffffff
+        g = hval & 0xf0000000
+        if g != 0:
+            hval = hval ^ g >> 24
+        hval = hval & ~g
+    return hval or 1
+
+
+def readsections(input):
+    """Finds the sections of the .qm data in input.
+
+    :return: A dictionary of section types to the start and end offsets of
+             their data.
+    """
+    if len(input) < 16:
+        raise ValueError("This is not a .qm file: file empty or too small")
+    magic = struct.unpack(">4L", input[:16])
+    if magic != QM_MAGIC_NUMBER:
+        raise ValueError("This is not a .qm file: invalid magic number")
+    startsection = 16
+    sectionheader = 5
+
+    def section_debug(name, section_type, startsection, length):
+        print "Section: %s (type: %#x, offset: %#x, length: %d)" % (name, section_type, startsection, length)
+        return
+
+    sections = {}
+    while startsection < len(input):
+        section_type, length = struct.unpack(">BL", input[startsection:startsection + sectionheader])
+        start = startsection + sectionheader
+        if section_type in (QM_HASHES, QM_MESSAGES, QM_CONTEXTS,
+                            QM_NUMERUSRULES):
+            sections[section_type] = (start, start + length)
+        else:
+            section_debug("Unkown", section_type, startsection, length)
+        startsection = start + length
+    return sections
+
+
+def readmessage(input, pos, end):
+    """Reads the message at offset pos of the .qm data in input.
+
+    :return: The source and target of the message and the offset after it, or
+             None if the message is incomplete or uses an unimplemented
+             subsection.
+    """
+    source = target = None
+    while pos < end:
+        subsection, = struct.unpack(">B", input[pos:pos + 1])
+        if subsection == 0x01:  # End
+            #print "End"
+            pos = pos + 1
+            if source is None or target is None:
+                raise ValueError("Old .qm format with no source defined")
+            return source, target, pos
+        #print pos, subsection
+        pos = pos + 1
+        length, = struct.unpack(">l", input[pos:pos + 4])
+        if subsection == 0x03:  # Translation
+            if length != -1:
+                raw, = struct.unpack(">%ds" % length,
+                                     input[pos + 4:pos + 4 + length])
+                string, templen = codecs.utf_16_be_decode(raw)
+                if target:
+                    target.strings.append(string)
+                else:
+                    target = multistring(string)
+                pos = pos + 4 + length
+            else:
+                target = u""
+                pos = pos + 4
+            #print "Translation: %s" % target.encode('utf-8')
+        elif subsection == 0x06:  # SourceText
+            source = input[pos + 4:pos + 4 + length].decode('iso-8859-1')
+            #print "SourceText: %s" % source
+            pos = pos + 4 + length
+        elif subsection == 0x07:  # Context
+            context = input[pos + 4:pos + 4 + length].decode('iso-8859-1')
+            #print "Context: %s" % context
+            pos = pos + 4 + length
+        elif subsection == 0x08:  # Disambiguating-comment
+            comment = input[pos + 4:pos + 4 + length]
+            #print "Disambiguating-comment: %s" % comment
+            pos = pos + 4 + length
+        elif subsection == 0x05:  # hash
+            hash = input[pos:pos + 4]
+            #print "Hash: %s" % hash
+            pos = pos + 4
+        else:
+            if subsection == 0x02:  # SourceText16
+                subsection_name = "SourceText16"
+            elif subsection == 0x04:  # Context16
+                subsection_name = "Context16"
+            else:
+                subsection_name = "Unknown"
+            logger.warning("Unimplemented: 0x%x %s",
+                           subsection, subsection_name)
+            return None
+    return None
+
+
 class qmunit(base.TranslationUnit):
     """A class representing a .qm translation message."""
 
@@ -116,100 +227,129 @@ class qmfile(base.TranslationStore):
             qmsrc = input.read()
             input.close()
             input = qmsrc
-        if len(input) < 16:
-            raise ValueError("This is not a .qm file: file empty or too small")
-        magic = struct.unpack(">4L", input[:16])
-        if magic != QM_MAGIC_NUMBER:
-            raise ValueError("This is not a .qm file: invalid magic number")
-        startsection = 16
-        sectionheader = 5
-
-        def section_debug(name, section_type, startsection, length):
-            print "Section: %s (type: %#x, offset: %#x, length: %d)" % (name, section_type, startsection, length)
-            return
-
-        while startsection < len(input):
-            section_type, length = struct.unpack(">BL", input[startsection:startsection + sectionheader])
-            if section_type == 0x42:
-                #section_debug("Hash", section_type, startsection, length)
-                hashash = True
-                hash_start = startsection + sectionheader
-                hash_data = struct.unpack(">%db" % length, input[startsection + sectionheader:startsection + sectionheader + length])
-            elif section_type == 0x69:
-                #section_debug("Messages", section_type, startsection, length)
-                hasmessages = True
-                messages_start = startsection + sectionheader
-                messages_data = struct.unpack(">%db" % length, input[startsection + sectionheader:startsection + sectionheader + length])
-            elif section_type == 0x2f:
-                #section_debug("Contexts", section_type, startsection, length)
-                hascontexts = True
-                contexts_start = startsection + sectionheader
-                contexts_data = struct.unpack(">%db" % length, input[startsection + sectionheader:startsection + sectionheader + length])
-            elif section_type == 0x88:
-                #section_debug("NumerusRules", section_type, startsection, length)
-                hasnumerusrules = True
-                numerusrules_start = startsection + sectionheader
-                numerusrules_data = struct.unpack(">%db" % length, input[startsection + sectionheader:startsection + sectionheader + length])
-            else:
-                section_debug("Unkown", section_type, startsection, length)
-            startsection = startsection + sectionheader + length
-        pos = messages_start
-        source = target = None
-        while pos < messages_start + len(messages_data):
-            subsection, = struct.unpack(">B", input[pos:pos + 1])
-            if subsection == 0x01:  # End
-                #print "End"
-                pos = pos + 1
-                if not source is None and not target is None:
-                    newunit = self.addsourceunit(source)
-                    newunit.target = target
-                    source = target = None
-                else:
-                    raise ValueError("Old .qm format with no source defined")
-                continue
-            #print pos, subsection
-            pos = pos + 1
-            length, = struct.unpack(">l", input[pos:pos + 4])
-            if subsection == 0x03:  # Translation
-                if length != -1:
-                    raw, = struct.unpack(">%ds" % length,
-                                         input[pos + 4:pos + 4 + length])
-                    string, templen = codecs.utf_16_be_decode(raw)
-                    if target:
-                        target.strings.append(string)
-                    else:
-                        target = multistring(string)
-                    pos = pos + 4 + length
-                else:
-                    target = u""
-                    pos = pos + 4
-                #print "Translation: %s" % target.encode('utf-8')
-            elif subsection == 0x06:  # SourceText
-                source = input[pos + 4:pos + 4 + length].decode('iso-8859-1')
-                #print "SourceText: %s" % source
-                pos = pos + 4 + length
-            elif subsection == 0x07:  # Context
-                context = input[pos + 4:pos + 4 + length].decode('iso-8859-1')
-                #print "Context: %s" % context
-                pos = pos + 4 + length
-            elif subsection == 0x08:  # Disambiguating-comment
-                comment = input[pos + 4:pos + 4 + length]
-                #print "Disambiguating-comment: %s" % comment
-                pos = pos + 4 + length
-            elif subsection == 0x05:  # hash
-                hash = input[pos:pos + 4]
-                #print "Hash: %s" % hash
-                pos = pos + 4
-            else:
-                if subsection == 0x02:  # SourceText16
-                    subsection_name = "SourceText16"
-                elif subsection == 0x04:  # Context16
-                    subsection_name = "Context16"
-                else:
-                    subsection_name = "Unknown"
-                logger.warning("Unimplemented: 0x%x %s",
-                               subsection, subsection_name)
+        sections = readsections(input)
+        pos, end = sections.get(QM_MESSAGES, (0, 0))
+        while pos < end:
+            message = readmessage(input, pos, end)
+            if message is None:
                 return
+            source, target, pos = message
+            newunit = self.addsourceunit(source)
+            newunit.target = target
 
     def savefile(self, storefile):
         raise Exception("Writing of .qm files is not supported yet")
+
+
+class lazyqmfile(qmfile):
+    """A read-only .qm file that is only decoded as needed.
+
+    The file is memory mapped, and :meth:`findunit` and :meth:`translate`
+    use the hash section of the file to decode only the messages with the
+    requested source text. :attr:`units` is only built when it is accessed.
+    Messages with a disambiguating comment can only be found through
+    :attr:`units`, since Qt hashes the comment with the source text.
+    """
+
+    def __init__(self, inputfile=None, unitclass=qmunit):
+        self._data = None
+        qmfile.__init__(self, unitclass=unitclass)
+        self._units = None
+        if inputfile is not None:
+            self.openfile(inputfile)
+
+    def _getunits(self):
+        if self._units is None:
+            self._units = []
+            if self._data is not None:
+                for unit in self._iter_messages():
+                    self.addunit(unit)
+        return self._units
+
+    def _setunits(self, units):
+        self._units = units
+
+    units = property(_getunits, _setunits)
+
+    def openfile(self, storefile):
+        """Memory maps the given file (or filename)."""
+        if isinstance(storefile, basestring):
+            storefile = open(storefile, 'rb')
+        self.filename = getattr(storefile, 'name', '')
+        try:
+            self._data = mmap.mmap(storefile.fileno(), 0,
+                                   access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files can't be mapped
+            raise ValueError("This is not a .qm file: file empty or too small")
+        finally:
+            storefile.close()
+        self._units = None
+        self._sections = readsections(self._data)
+
+    def close(self):
+        """Releases the memory map of the file."""
+        if self._data is not None:
+            # Keep the store usable after the file is gone
+            self._getunits()
+            self._data.close()
+            self._data = None
+
+    def _newunit(self, source, target):
+        newunit = self.UnitClass(source)
+        newunit.target = target
+        return newunit
+
+    def _iter_messages(self):
+        pos, end = self._sections.get(QM_MESSAGES, (0, 0))
+        while pos < end:
+            message = readmessage(self._data, pos, end)
+            if message is None:
+                return
+            source, target, pos = message
+            yield self._newunit(source, target)
+
+    def unit_iter(self):
+        if self._units is not None or self._data is None:
+            for unit in self.units:
+                yield unit
+            return
+        for unit in self._iter_messages():
+            yield unit
+
+    def findunit(self, source):
+        if self._units is not None or self._data is None:
+            return super(lazyqmfile, self).findunit(source)
+        if QM_HASHES not in self._sections:
+            for unit in self._iter_messages():
+                if unit.source == source:
+                    return unit
+            return None
+        try:
+            hval = elfhash(source.encode('iso-8859-1'))
+        except UnicodeEncodeError:
+            # We decode source texts as Latin-1, so this can't be in the file
+            return None
+        data = self._data
+        hashstart, hashend = self._sections[QM_HASHES]
+        messagestart, messageend = self._sections[QM_MESSAGES]
+        # The hash section is sorted by hash, with 8 bytes per message: the
+        # hash and the offset of the message in the messages section
+        low, high = 0, (hashend - hashstart) // 8
+        while low < high:
+            middle = (low + high) // 2
+            entryhash, = struct.unpack_from(">L", data, hashstart + middle * 8)
+            if entryhash < hval:
+                low = middle + 1
+            else:
+                high = middle
+        entry = hashstart + low * 8
+        while entry < hashend:
+            entryhash, offset = struct.unpack_from(">LL", data, entry)
+            if entryhash != hval:
+                break
+            message = readmessage(data, messagestart + offset, messageend)
+            if message is not None and message[0] == source:
+                return self._newunit(message[0], message[1])
+            entry += 8
+        return None
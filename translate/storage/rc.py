@@ -67,6 +67,7 @@ class rcunit(base.TranslationUnit):
         """Sets the source AND the target to be equal"""
         self._rich_source = None
         self._value = source or ""
+        self._update_store_index()
 
     def getsource(self):
         return self._value
@@ -108,6 +108,7 @@ class RESXUnit(lisa.LISAunit):
             return False
         else:
             self.xmlelement.set("name", value)
+            self._update_store_index()
 
     def getid(self):
         return self.xmlelement.get("name")
@@ -23,6 +23,7 @@
 
 """
 
+import hashlib
 import logging
 import os.path
 import re
@@ -33,6 +34,7 @@ from sqlite3 import dbapi2
 from UserDict import UserDict
 
 from translate import __version__ as toolkitversion
+from translate.filters import checkcache
 from translate.lang.common import Common
 from translate.misc.multistring import multistring
 from translate.storage import factory
@@ -160,6 +162,11 @@ def transaction(f):
     return decorated_f
 
 
+def unithash(unit):
+    """Returns a hash of everything about the unit that the checks look at."""
+    return hashlib.sha1(repr(checkcache.unitdata(unit))).hexdigest()
+
+
 def statefordb(unit):
     """Returns the numeric database state for the unit."""
     if unit.istranslated():
@@ -368,7 +375,8 @@ class StatsCache(object):
             state INTEGER,
             e_state INTEGER,
             sourcewords INTEGER,
-            targetwords INTEGER);""")
+            targetwords INTEGER,
+            unithash VARCHAR);""")
 
         self.cur.execute("""CREATE INDEX IF NOT EXISTS fileidindex
             ON units(fileid);""")
@@ -424,10 +432,13 @@ class StatsCache(object):
         # file wasn't in db at all, lets recache it
         if callable(store):
             store = store()
+        if store is not None:
+            units = store.units
         else:
-            store = store or factory.getobject(realpath)
+            # Only the statistics are needed, so big files can be streamed
+            units = factory.iterunits(realpath)
 
-        return self._cachestore(store, realpath, mod_info)
+        return self._cachestore(units, realpath, mod_info)
 
     def _getstoredcheckerconfig(self, checker):
         """See if this checker configuration has been used before."""
@@ -447,7 +458,7 @@ class StatsCache(object):
         for index, unit in enumerate(units):
             if unit.istranslatable():
                 sourcewords, targetwords = wordsinunit(unit)
-                if unitindex:
+                if unitindex is not None:
                     index = unitindex
                 # what about plurals in .source and .target?
                 unit_state_for_db = statefordb(unit)
@@ -455,34 +466,98 @@ class StatsCache(object):
                                    unit.source, unit.target,
                                    sourcewords, targetwords,
                                    unit_state_for_db,
-                                   unit.get_state_id()))
+                                   unit.get_state_id(), unithash(unit)))
                 file_totals_record = file_totals_record + FileTotals.new_record(unit_state_for_db, sourcewords, targetwords)
         # XXX: executemany is non-standard
         self.cur.executemany("""INSERT INTO units
-            (unitid, fileid, unitindex, source, target, sourcewords, targetwords, state, e_state)
-            values (?, ?, ?, ?, ?, ?, ?, ?, ?);""",
+            (unitid, fileid, unitindex, source, target, sourcewords, targetwords, state, e_state, unithash)
+            values (?, ?, ?, ?, ?, ?, ?, ?, ?, ?);""",
             unitvalues)
         self.file_totals[fileid] = file_totals_record
-        if unitindex:
+        if unitindex is not None:
             return state_strings[statefordb(units[0])]
         return ""
 
     @transaction
-    def _cachestore(self, store, realpath, mod_info):
-        """Calculates and caches the statistics of the given store
-        unconditionally."""
-        self.cur.execute("""DELETE FROM files WHERE
+    def _cachestore(self, units, realpath, mod_info):
+        """Calculates and caches the statistics of the given units
+        unconditionally.
+
+        If the file was cached before, the check results of the units that
+        did not change are kept, unless the file has suggestions."""
+        self.cur.execute("""SELECT fileid FROM files WHERE
             path=?;""", (realpath,))
-        self.cur.execute("""iNSERT INTO files
-            (fileid, path, st_mtime, st_size, toolkitbuild) values (NULL, ?, ?, ?, ?);""",
-            (realpath, mod_info[0], mod_info[1], toolkitversion.build))
-        # Unusual capitalisation intended. See bug 2073.
-        fileid = self.cur.lastrowid
+        filerow = self.cur.fetchone()
+        if filerow is None:
+            self.cur.execute("""iNSERT INTO files
+                (fileid, path, st_mtime, st_size, toolkitbuild) values (NULL, ?, ?, ?, ?);""",
+                (realpath, mod_info[0], mod_info[1], toolkitversion.build))
+            # Unusual capitalisation intended. See bug 2073.
+            fileid = self.cur.lastrowid
+            oldunits = []
+        else:
+            fileid = filerow[0]
+            self.cur.execute("""UPDATE files
+                SET st_mtime=?, st_size=?, toolkitbuild=?
+                WHERE fileid=?;""",
+                (mod_info[0], mod_info[1], toolkitversion.build, fileid))
+            self.cur.execute("""SELECT unitindex, unithash FROM units WHERE
+                fileid=?;""", (fileid,))
+            oldunits = self.cur.fetchall()
         self.cur.execute("""DELETE FROM units WHERE
             fileid=?""", (fileid,))
-        self._cacheunitstats(store.units, fileid)
+        self._cacheunitstats(units, fileid)
+        if os.path.exists(suggestion_filename(realpath)):
+            # The suggestions are not part of the hash of a unit, so the units
+            # are checked again in case they changed as well
+            oldunits = []
+        self._remapunitschecks(fileid, oldunits)
         return fileid
 
+    def _remapunitschecks(self, fileid, oldunits):
+        """Moves the errors of the units that did not change to the new index
+        of the unit, and marks the other units as unchecked in every checker
+        configuration that the file was checked with.
+
+        :param oldunits: The ``(unitindex, unithash)`` of every unit before
+                         the file changed.
+        """
+        self.cur.execute("""SELECT unitindex, configid, name, message
+            FROM uniterrors WHERE fileid=?;""", (fileid,))
+        errors = self.cur.fetchall()
+        if not errors:
+            return
+
+        oldindices = {}
+        for unitindex, oldhash in oldunits:
+            oldindices.setdefault(oldhash, []).append(unitindex)
+        # The dummy errors of the checked configurations stay
+        newindices = {-1: -1}
+        unchecked = []
+        self.cur.execute("""SELECT unitindex, unithash FROM units WHERE
+            fileid=? ORDER BY unitindex;""", (fileid,))
+        for unitindex, newhash in self.cur.fetchall():
+            if oldindices.get(newhash):
+                newindices[oldindices[newhash].pop(0)] = unitindex
+            else:
+                unchecked.append(unitindex)
+
+        unitvalues = [(newindices[unitindex], fileid, configid, name, message)
+                      for unitindex, configid, name, message in errors
+                      if unitindex in newindices]
+        configids = set([configid for unitindex, configid, name, message in errors
+                         if unitindex == -1])
+        for configid in configids:
+            for unitindex in unchecked:
+                unitvalues.append((unitindex, fileid, configid, "unchecked", ""))
+        self.cur.execute("""DELETE FROM uniterrors WHERE
+            fileid=?;""", (fileid,))
+        # XXX: executemany is non-standard
+        self.cur.executemany("""INSERT INTO uniterrors
+            (unitindex, fileid, configid, name, message)
+            values (?, ?, ?, ?, ?);""",
+            unitvalues)
+
     def file_extended_totals(self, filename, store=None):
         stats = {}
         fileid = self._getfileid(filename, store=store)
@@ -519,7 +594,7 @@ class StatsCache(object):
         for index, unit in enumerate(units):
             if unit.istranslatable():
                 # Correctly assign the unitindex
-                if unitindex:
+                if unitindex is not None:
                     index = unitindex
                 failures = checker.run_filters(unit)
                 for checkname, checkmessage in failures.iteritems():
@@ -527,7 +602,7 @@ class StatsCache(object):
                     errornames.append("check-" + checkname)
         checker.setsuggestionstore(None)
 
-        if unitindex:
+        if unitindex is not None:
             # We are only updating a single unit, so we don't want to add an
             # extra noerror-entry
             unitvalues.remove(dummy)
@@ -551,6 +626,27 @@ class StatsCache(object):
         self._cacheunitschecks(store.units, fileid, configid, checker)
         return fileid
 
+    @transaction
+    def _recacheunitschecks(self, fileid, store, checker, configid, unitindices):
+        """Calculates and caches the error statistics of the units at
+        ``unitindices`` in the given store, which changed since the store was
+        checked."""
+        unitvalues = []
+        for unitindex in unitindices:
+            failures = checker.run_filters(store.units[unitindex])
+            for checkname, checkmessage in failures.iteritems():
+                unitvalues.append((unitindex, fileid, configid, checkname, checkmessage))
+        checker.setsuggestionstore(None)
+
+        self.cur.execute("""DELETE FROM uniterrors WHERE
+            fileid=? AND configid=? AND name='unchecked';""", (fileid, configid))
+        # XXX: executemany is non-standard
+        self.cur.executemany("""INSERT INTO uniterrors
+            (unitindex, fileid, configid, name, message)
+            values (?, ?, ?, ?, ?);""",
+            unitvalues)
+        return fileid
+
     def get_unit_stats(self, fileid, unitid):
         values = self.cur.execute("""
             SELECT   state, sourcewords, targetwords
@@ -607,12 +703,18 @@ class StatsCache(object):
                 ORDER BY unitindex;""", (fileid, configid))
             return self.cur.fetchone(), self.cur
 
-        first, cur = geterrors()
-        if first is not None:
-            return first, cur
-
-        # This could happen if we haven't done the checks before, or the
-        # file changed, or we are using a different configuration
+        # Units that changed since the file was checked are marked as unchecked
+        self.cur.execute("""SELECT unitindex FROM uniterrors
+            WHERE fileid=? AND configid=? AND name='unchecked';""",
+            (fileid, configid))
+        unchecked = [row[0] for row in self.cur.fetchall()]
+        if not unchecked:
+            first, cur = geterrors()
+            if first is not None:
+                return first, cur
+
+        # This could happen if we haven't done the checks before, or units
+        # changed, or we are using a different configuration
         if callable(store):
             store = store()
         else:
@@ -620,7 +722,10 @@ class StatsCache(object):
 
         if os.path.exists(suggestion_filename(filename)):
             checker.setsuggestionstore(factory.getobject(suggestion_filename(filename), ignore=suggestion_extension()))
-        self._cachestorechecks(fileid, store, checker, configid)
+        if unchecked:
+            self._recacheunitschecks(fileid, store, checker, configid, unchecked)
+        else:
+            self._cachestorechecks(fileid, store, checker, configid)
         return geterrors()
 
     def _geterrors(self, filename, fileid, configid, checker, store):
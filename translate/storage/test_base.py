@@ -20,6 +20,8 @@
 
 """tests for storage base classes"""
 
+import codecs
+import gc
 import os
 import warnings
 
@@ -68,6 +70,30 @@ def test_force_override():
     assert pytest.raises(NotImplementedError, derivedobject.classtest)
 
 
+def test_detect_encoding():
+    """Tests encoding detection from the start of the text"""
+    store = base.TranslationStore()
+    store.encoding = 'auto'
+    text = u"kéy = välue\n"
+    # A byte order mark decides
+    assert store.detect_encoding(text.encode('utf-16')) == (text, 'utf-16')
+    assert store.detect_encoding(codecs.BOM_UTF8 + text.encode('utf-8')) == \
+           (text, 'utf-8-sig')
+    # Encodings that fail on the sample are tried last
+    assert store.detect_encoding(text.encode('utf-16-le'),
+                                 default_encodings=['utf-8', 'utf-16-le']) == \
+           (text, 'utf-16-le')
+    # If the text only fails to decode after the sample, we still fall back
+    # to the next candidate
+    text = u"a" * base.ENCODING_SAMPLE_SIZE + u"é"
+    assert store.detect_encoding(text.encode('iso-8859-1'),
+                                 default_encodings=['utf-8', 'iso-8859-1']) == \
+           (text, 'iso-8859-1')
+    # Undecodable text gives nothing
+    store.encoding = 'utf-8'
+    assert store.detect_encoding(u"é".encode('iso-8859-1')) == (None, None)
+
+
 class TestTranslationUnit:
     """Tests a TranslationUnit.
     Derived classes can reuse these tests by pointing UnitClass to a derived Unit"""
@@ -248,6 +274,54 @@ class TestTranslationStore(object):
         assert store.findunit("Blessed String") == unit2
         assert store.findunit("Nest String") is None
 
+    def test_index(self):
+        """Tests that the indexes are kept up to date as units change"""
+        store = self.StoreClass()
+        unit1 = store.addsourceunit("Test String")
+        store.makeindex()
+        assert store.findunit("Test String") is unit1
+        unit2 = store.addsourceunit("Blessed String")
+        assert store.findunit("Blessed String") is unit2
+        unit2.source = "Nest String"
+        assert store.findunit("Blessed String") is None
+        assert store.findunit("Nest String") is unit2
+        store.removeunit(unit1)
+        assert store.findunit("Test String") is None
+        assert id(unit1) not in [id(unit) for unit in store.units]
+        assert store.findunits("Nest String") == [unit2]
+
+    def test_index_ids(self):
+        """Tests that the indexes are kept up to date as the ids and
+        locations of units change"""
+        store = self.StoreClass()
+        unit = store.addsourceunit("Test String")
+        store.makeindex()
+        if store._unindexed is None:
+            # This store doesn't keep its indexes up to date
+            return
+        unit.addlocation("test.c:12")
+        if "test.c:12" in unit.getlocations():
+            assert store.locationindex.get("test.c:12") is unit
+        unit.setid("testid")
+        if unit.getid() == "testid":
+            assert store.findid("testid") is unit
+        unit.setcontext("testcontext")
+        assert store.findid(unit.getid()) is unit
+        for location in unit.getlocations():
+            assert store.locationindex.get(location) is unit
+
+    def test_index_replaced_units(self):
+        """Tests that units are indexed after the units they replace are
+        gone"""
+        store = self.StoreClass()
+        for i in range(100):
+            store.addsourceunit("")
+        store.makeindex()
+        store.units = []
+        gc.collect()
+        units = [store.addsourceunit("Test %d" % i) for i in range(200)]
+        assert [store.findunit("Test %d" % i) for i in range(200)] == units
+
     def test_translate(self):
         """Tests the translate method and non-ascii characters."""
         store = self.StoreClass()
@@ -1,4 +1,7 @@
 #!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import codecs
 
 from translate.storage import csvl10n, test_base
 
@@ -21,3 +24,13 @@ class TestCSV(test_base.TestTranslationStore):
         self.check_equality(store, newstore)
         assert store.units[2] == newstore.units[2]
         assert str(store) == str(newstore)
+
+    def test_utf8_bom(self):
+        """Tests that a UTF-8 byte order mark is not part of the first
+        field"""
+        store = self.StoreClass.parsestring(codecs.BOM_UTF8 +
+                                            u"a,bé,c\n".encode('utf-8'))
+        assert len(store.units) == 1
+        assert store.units[0].location == u"a"
+        assert store.units[0].source == u"bé"
+        assert store.units[0].target == u"c"
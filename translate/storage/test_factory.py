@@ -118,6 +118,14 @@ class BaseTestFactory:
         store = factory.getobject(filename)
         assert isinstance(store, self.expected_instance)
 
+    def test_iterunits(self):
+        """Test that iterating over units gives the units of the store."""
+        filename = os.path.join(self.testdir, self.filename)
+        open(filename, "w").write(self.file_content)
+        units = [(unit.source, unit.target) for unit in factory.iterunits(filename)]
+        store = factory.getobject(filename)
+        assert units == [(unit.source, unit.target) for unit in store.units]
+
     def test_directory(self):
         """Test that a directory is correctly detected."""
         object = factory.getobject(self.testdir)
@@ -130,6 +138,50 @@ class TestPOFactory(BaseTestFactory):
     filename = 'dummy.po'
     file_content = '''#: test.c\nmsgid "test"\nmsgstr "rest"\n'''
 
+    def test_cachedir(self):
+        """Test that unchanged files are loaded from the parsed store cache."""
+        filename = os.path.join(self.testdir, self.filename)
+        cachedir = os.path.join(self.testdir, "cache")
+        open(filename, "w").write(self.file_content)
+        os.utime(filename, (1000, 1000))
+        store = factory.getobject(filename, cachedir=cachedir)
+        assert isinstance(store, self.expected_instance)
+        assert len(os.listdir(cachedir)) == 1
+
+        # Loading it again should not parse the file, so a change that keeps
+        # the size and modification time is not noticed
+        open(filename, "w").write(self.file_content.replace("rest", "best"))
+        os.utime(filename, (1000, 1000))
+        cachedstore = factory.getobject(filename, cachedir=cachedir)
+        assert isinstance(cachedstore, self.expected_instance)
+        assert str(cachedstore) == str(store)
+        assert cachedstore.units[0].target == "rest"
+        assert cachedstore.filename == filename
+
+        # A changed file invalidates the cached copy
+        open(filename, "w").write(self.file_content.replace("rest", "toets"))
+        os.utime(filename, (0, 0))
+        changedstore = factory.getobject(filename, cachedir=cachedir)
+        assert changedstore.units[0].target == "toets"
+        assert len(os.listdir(cachedir)) == 1
+
+    def test_cachedir_untrusted(self):
+        """Test that cached copies that others could write are not used."""
+        if not hasattr(os, "getuid"):
+            return
+        filename = os.path.join(self.testdir, self.filename)
+        cachedir = os.path.join(self.testdir, "cache")
+        open(filename, "w").write(self.file_content)
+        os.utime(filename, (1000, 1000))
+        factory.getobject(filename, cachedir=cachedir)
+        assert os.stat(cachedir).st_mode & 0o777 == 0o700
+
+        open(filename, "w").write(self.file_content.replace("rest", "best"))
+        os.utime(filename, (1000, 1000))
+        os.chmod(cachedir, 0o777)
+        store = factory.getobject(filename, cachedir=cachedir)
+        assert store.units[0].target == "best"
+
 
 class TestXliffFactory(BaseTestFactory):
     from translate.storage import xliff
@@ -5,6 +5,7 @@ import subprocess
 import sys
 from cStringIO import StringIO
 
+from translate.misc.multistring import multistring
 from translate.storage import factory, mo, test_base
 
 
@@ -170,3 +171,52 @@ class TestMOFile(test_base.TestTranslationStore):
             finally:
                 mo_msgfmt_f.close()
                 mo_pocompile_f.close()
+
+    def test_serialize(self):
+        """checks that the streamed output matches the string output"""
+        store = self.StoreClass()
+        for i in range(100):
+            unit = store.addsourceunit(u"source %d" % i)
+            unit.target = u"target \xe9 %d" % i
+        output = StringIO()
+        store.serialize(output)
+        assert output.getvalue() == str(store)
+        newstore = self.StoreClass.parsestring(output.getvalue())
+        assert len(newstore.units) == 100
+        assert newstore.findunit(u"source 42").target == u"target \xe9 42"
+
+
+def test_lazymofile(tmpdir):
+    store = mo.mofile()
+    header = store.addsourceunit(u"")
+    header.target = u"Content-Type: text/plain; charset=UTF-8\n"
+    for i in range(100):
+        unit = store.addsourceunit(u"source \xe9 %d" % i)
+        unit.target = u"target %d" % i
+    unit = store.addsourceunit(multistring([u"tree", u"trees"]))
+    unit.target = multistring([u"boom", u"bome"])
+    unit = store.addsourceunit(u"convert")
+    unit.msgctxt = [u"verb"]
+    unit.target = u"omskakel"
+    mofile = tmpdir.join("test.mo")
+    store.savefile(str(mofile))
+
+    lazystore = mo.lazymofile(str(mofile))
+    assert lazystore.translate(u"source \xe9 42") == u"target 42"
+    assert lazystore.findunit(u"tree").target.strings == [u"boom", u"bome"]
+    assert lazystore.findunit(u"convert") is None
+    assert lazystore.findunit(u"missing") is None
+    assert lazystore._units is None
+    assert len(list(lazystore.unit_iter())) == 103
+    assert lazystore._units is None
+    eager = mo.mofile.parsefile(str(mofile))
+    assert [(unit.source, unit.target) for unit in lazystore.units] == \
+           [(unit.source, unit.target) for unit in eager.units]
+    lazystore.close()
+    assert lazystore.translate(u"source \xe9 43") == u"target 43"
+
+
+def test_hashpjw():
+    assert mo.hashpjw("") == 0
+    assert mo.hashpjw("a") == 97
+    assert mo.hashpjw("abcdefghij") == 0xabaa66a
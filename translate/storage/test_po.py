@@ -595,6 +595,17 @@ msgstr[1] "Koeie"
         assert pofile.units[0].getlocations() == ["source1", "source2"]
         print(pofile)
 
+    def test_duplicates_index(self):
+        """checks that the indexes follow the changes of removeduplicates"""
+        posource = '#: source1\nmsgid "test me"\nmsgstr ""\n\n#: source2\nmsgid "test me"\nmsgstr ""\n'
+        pofile = self.poparse(posource)
+        pofile.makeindex()
+        first, second = pofile.units
+        pofile.removeduplicates("msgctxt")
+        assert pofile.findid(first.getid()) is first
+        assert pofile.findid(second.getid()) is second
+        assert pofile.findid(u"test me") is None
+
     def test_merge_mixed_sources(self):
         """checks that merging works with different source location styles"""
         posource = '''
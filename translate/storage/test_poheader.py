@@ -325,3 +325,44 @@ msgstr ""
 
     pofile.setprojectstyle('complete-rubbish')
     assert pofile.getprojectstyle() == 'kde'
+
+
+def test_parsefileheader():
+    """Test that we can read only the header of a file."""
+    posource = r'''msgid ""
+msgstr ""
+"Content-Type: text/plain; charset=UTF-8\n"
+"Plural-Forms: nplurals=2; plural=(n != 1);\n"
+
+msgid "One"
+msgstr "Een"
+''' + 'msgid "More"\nmsgstr "Meer"\n\n' * 1000
+    dummyfile = wStringIO.StringIO(posource)
+    header = poheader.parsefileheader(dummyfile)
+    assert header["Plural-Forms"] == "nplurals=2; plural=(n != 1);"
+    assert header["Content-Type"] == "text/plain; charset=UTF-8"
+
+    # Files without a header give an empty dictionary
+    dummyfile = wStringIO.StringIO('msgid "One"\nmsgstr "Een"\n')
+    assert poheader.parsefileheader(dummyfile) == {}
+
+
+def test_parsefileheaders(tmpdir):
+    """Test that we can read the headers of many files at once."""
+    posource = r'''msgid ""
+msgstr ""
+"Language: %s\n"
+
+msgid "One"
+msgstr "Een"
+'''
+    filenames = []
+    for lang in ("af", "nl", "zu"):
+        pofile = tmpdir.join("%s.po" % lang)
+        pofile.write(posource % lang)
+        filenames.append(str(pofile))
+    headers = poheader.parsefileheaders(filenames, threads=2)
+    assert len(headers) == 3
+    for filename in filenames:
+        lang = os.path.basename(filename)[:2]
+        assert headers[filename]["Language"] == lang
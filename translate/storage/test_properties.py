@@ -1,6 +1,8 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import codecs
+
 from pytest import deprecated_call, raises
 
 from translate.misc import wStringIO
@@ -368,6 +370,16 @@ key=value
         assert result.startswith(bom)
         assert bom not in result[2:]
 
+    def test_utf8_byte_order_mark(self):
+        """test that a UTF-8 BOM is not part of the first key"""
+        propsource = codecs.BOM_UTF8 + u"key1 = välue1\n".encode('utf-8')
+        propfile = self.propparse(propsource, encoding='auto')
+        assert propfile.units[0].name == u"key1"
+        assert propfile.units[0].source == u"välue1"
+        result = str(propfile)
+        assert result.startswith(codecs.BOM_UTF8)
+        assert codecs.BOM_UTF8 not in result[3:]
+
     def test_raise_ioerror_if_cannot_detect_encoding(self):
         """Test that IOError is thrown if file encoding cannot be detected."""
         propsource = u"key = ąćęłńóśźż".encode("cp1250")
@@ -1,6 +1,8 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import json
+
 from pytest import raises
 
 from translate.misc import wStringIO
@@ -121,6 +123,31 @@ class TestPYPOUnit(test_po.TestPOUnit):
         assert unit.getnotes() == "Which meaning of file?\nThank you\nVerb"
         assert raises(ValueError, unit.getnotes, "devteam")
 
+    def test_lazy_lists(self):
+        """tests that rarely used lists are only allocated on access"""
+        unit = self.UnitClass("File")
+        assert not hasattr(unit, "__dict__") or not unit.__dict__
+        assert unit._msgctxt is None
+        assert unit._prev_msgid is None
+        assert str(unit) == 'msgid "File"\nmsgstr ""\n'
+        assert unit._msgctxt is None
+        assert unit.msgctxt == []
+        unit.msgctxt.append('"verb"')
+        assert unit.getcontext() == "verb"
+        assert str(unit) == 'msgctxt "verb"\nmsgid "File"\nmsgstr ""\n'
+
+    def test_copy_and_pickle(self):
+        """tests that slotted units can still be copied and pickled"""
+        import pickle
+        unit = self.UnitClass("File")
+        unit.target = "Lêer"
+        unit.addlocation("file.c:12")
+        unit.markfuzzy()
+        for newunit in (unit.copy(), pickle.loads(pickle.dumps(unit))):
+            assert newunit is not unit
+            assert str(newunit) == str(unit)
+            assert newunit.sourcecomments is not unit.sourcecomments
+
     def test_notes_withcomments(self):
         """tests that when we add notes that look like comments that we treat them properly"""
         unit = self.UnitClass("File")
@@ -220,6 +247,27 @@ class TestPYPOFile(test_po.TestPOFile):
         assert str(pofile.units[0]).count("source1") == 2
         assert str(pofile.units[1]).count("source2") == 2
 
+    def test_merge_duplicates_msgctxt_many(self):
+        """checks that the original unit gets only one msgctxt, however
+        many duplicates follow"""
+        posource = '''#: source1
+msgid "test me"
+msgstr "toets my"
+
+#: source2
+msgid "test me"
+msgstr "beproef my"
+
+#: source3
+msgid "test me"
+msgstr "probeer my"
+'''
+        pofile = self.poparse(posource)
+        pofile.removeduplicates("msgctxt")
+        assert len(pofile.units) == 3
+        assert [unit.getcontext() for unit in pofile.units] == \
+               ["source1", "source2", "source3"]
+
     def test_merge_blanks(self):
         """checks that merging adds msgid_comments to blanks"""
         posource = '#: source1\nmsgid ""\nmsgstr ""\n\n#: source2\nmsgid ""\nmsgstr ""\n'
@@ -263,6 +311,29 @@ class TestPYPOFile(test_po.TestPOFile):
         assert pofile.units[0].sourcecomments == ["#: source comment\n"]
         assert pofile.units[0].typecomments == ["#, fuzzy\n"]
 
+    def test_interned_comments(self):
+        """tests that repeated flags and locations share one string"""
+        posource = 'msgid ""\nmsgstr ""\n"Content-Type: text/plain; charset=UTF-8\\n"\n\n#: a.c:1\n#, fuzzy\nmsgid "one"\nmsgstr "een"\n\n#: a.c:1\n#, fuzzy\nmsgid "two"\nmsgstr "twee"\n'
+        pofile = self.poparse(posource)
+        header, first, second = pofile.units
+        assert first.typecomments[0] is second.typecomments[0]
+        assert first.sourcecomments[0] is second.sourcecomments[0]
+        assert str(pofile) == posource
+
+    def test_cache(self):
+        """checks that a store turned into cache data and back is the same"""
+        posource = '# other comment\n#. automatic comment\n#: source.c:1\n#, fuzzy\n#| msgid "Oen"\nmsgctxt "context"\nmsgid "One"\nmsgstr "Een"\n\nmsgid "%d file"\nmsgid_plural "%d files"\nmsgstr[0] "%d l\xc3\xaaer"\nmsgstr[1] "%d l\xc3\xaaers"\n\n#~ msgid "Old"\n#~ msgstr "Oud"\n'
+        pofile = self.poparse(posource)
+        cachedata = json.loads(json.dumps(pofile.tocache()))
+        cachedpofile = pypo.pofile.fromcache(cachedata)
+        assert str(cachedpofile) == posource
+        assert cachedpofile.units[0].isfuzzy()
+        assert cachedpofile.units[1].target.strings == [u"%d l\xeaer", u"%d l\xeaers"]
+        assert cachedpofile.units[2].isobsolete()
+        assert cachedpofile.units[0]._store is cachedpofile
+        cachedpofile.units[0].target = u"Eén"
+        assert 'msgstr "E\xc3\xa9n"' in str(cachedpofile)
+
     def test_unassociated_comments(self):
         """tests behaviour of unassociated comments."""
         oldsource = '# old lonesome comment\n\nmsgid "one"\nmsgstr "een"\n'
@@ -1,11 +1,31 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import struct
+
 import pytest
 
 from translate.storage import qm, test_base
 
 
+def make_qm(messages):
+    """Builds .qm data with a hash section for the (source, target) pairs in
+    messages"""
+    body = ""
+    hashes = []
+    for source, target in messages:
+        source = source.encode('iso-8859-1')
+        target = target.encode('utf-16-be')
+        hashes.append((qm.elfhash(source), len(body)))
+        body += struct.pack(">Bl", 0x03, len(target)) + target
+        body += struct.pack(">Bl", 0x06, len(source)) + source + "\x01"
+    hashes.sort()
+    hashdata = "".join([struct.pack(">LL", h, offset) for h, offset in hashes])
+    return (struct.pack(">4L", *qm.QM_MAGIC_NUMBER) +
+            struct.pack(">BL", qm.QM_HASHES, len(hashdata)) + hashdata +
+            struct.pack(">BL", qm.QM_MESSAGES, len(body)) + body)
+
+
 class TestQtUnit(test_base.TestTranslationUnit):
     UnitClass = qm.qmunit
 
@@ -37,3 +57,27 @@ class TestQtFile(test_base.TestTranslationStore):
         # QM does not implement serialising
         assert pytest.raises(Exception, self.StoreClass.__str__,
                            self.StoreClass())
+
+
+def test_elfhash():
+    assert qm.elfhash("") == 1
+    assert qm.elfhash("jdfgsdhfsdfsd 6445dsfsd7fg/*/+bfjsdgf%$^") == 248446350
+
+
+def test_lazyqmfile(tmpdir):
+    messages = [(u"source %d" % i, u"target %d" % i) for i in range(50)]
+    messages.append((u"caf\xe9", u"kafee"))
+    qmfile = tmpdir.join("test.qm")
+    qmfile.write(make_qm(messages), mode="wb")
+    eager = qm.qmfile.parsefile(str(qmfile))
+    assert [(unit.source, unit.target) for unit in eager.units] == messages
+
+    store = qm.lazyqmfile(str(qmfile))
+    assert store.translate(u"source 7") == u"target 7"
+    assert store.findunit(u"caf\xe9").target == u"kafee"
+    assert store.findunit(u"missing") is None
+    assert store.findunit(u"\u0431") is None
+    assert store._units is None
+    assert [(unit.source, unit.target) for unit in store.units] == messages
+    store.close()
+    assert store.translate(u"source 8") == u"target 8"
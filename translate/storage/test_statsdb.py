@@ -147,3 +147,62 @@ class TestStatsDb:
         f1, cache1 = self.setup_file_and_db(jtoolkit_extract)
         f2, cache2 = self.setup_file_and_db(fr_terminology_extract)
         assert cache1 == cache2
+
+    def test_recheck_changed_units(self):
+        """checks that only the units that changed are checked again"""
+        f, cache = self.setup_file_and_db(jtoolkit_extract)
+        checker = checks.StandardChecker()
+        checked = []
+        run_filters = checker.run_filters
+
+        def counting_run_filters(unit, *args, **kwargs):
+            checked.append(unit.source)
+            return run_filters(unit, *args, **kwargs)
+        checker.run_filters = counting_run_filters
+
+        s = cache.filestats(f.filename, checker)
+        assert len(checked) == 6
+        assert 'check-printf' not in s
+        assert s['check-endpunc'] == [3]
+        assert s['check-untranslated'] == [6]
+
+        # A new unit is added before the changed unit, which moves the others
+        open(f.filename, "w").write(jtoolkit_extract.replace(
+            '#: web/server.py:91', 'msgid "New %s"\nmsgstr "Nuut"\n\n#: web/server.py:91').replace(
+            'msgstr "Meld aan vir %s"', 'msgstr "Meld aan"'))
+        os.utime(f.filename, (0, 0))
+        checked = []
+        s = cache.filestats(f.filename, checker)
+        assert sorted(checked) == ["Login for %s", "New %s"]
+        assert s['check-printf'] == [1, 2]
+        assert s['check-endpunc'] == [4]
+        assert s['check-untranslated'] == [7]
+        assert s['total'] == [1, 2, 3, 4, 5, 6, 7]
+
+        checked = []
+        cache.filestats(f.filename, checker)
+        assert checked == []
+
+    def test_recheck_with_suggestions(self):
+        """checks that all the units are checked again if the file has
+        suggestions"""
+        f, cache = self.setup_file_and_db(jtoolkit_extract)
+        open(statsdb.suggestion_filename(f.filename), "w").write(jtoolkit_extract)
+        checker = checks.StandardChecker()
+        checked = []
+        run_filters = checker.run_filters
+
+        def counting_run_filters(unit, *args, **kwargs):
+            checked.append(unit.source)
+            return run_filters(unit, *args, **kwargs)
+        checker.run_filters = counting_run_filters
+
+        cache.filestats(f.filename, checker)
+        assert len(checked) == 6
+        open(f.filename, "w").write(jtoolkit_extract.replace(
+            'msgstr "Meld aan vir %s"', 'msgstr "Meld aan"'))
+        os.utime(f.filename, (0, 0))
+        checked = []
+        s = cache.filestats(f.filename, checker)
+        assert len(checked) == 6
+        assert s['check-printf'] == [1]
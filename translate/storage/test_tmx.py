@@ -1,7 +1,9 @@
 #!/usr/bin/env python
 
+from pytest import raises
+
 from translate.misc import wStringIO
-from translate.storage import test_base, tmx
+from translate.storage import base, test_base, tmx
 
 
 class TestTMXUnit(test_base.TestTranslationUnit):
@@ -83,3 +85,84 @@ class TestTMXfile(test_base.TestTranslationStore):
         assert tmxfile.translate('Five < ten') == 'Vyf < tien'
         assert xmltext.index('Five &lt; ten')
         assert xmltext.find('Five < ten') == -1
+
+    def test_iterparse(self):
+        """Test that streaming gives the same units and drops the ones that
+        were handled"""
+        tmxfile = tmx.tmxfile()
+        for i in range(10):
+            tmxfile.addtranslation("Source %d" % i, "en", "Bron %d" % i, "af")
+        units = []
+        elements = []
+        for unit in tmx.tmxfile.iterparse(wStringIO.StringIO(str(tmxfile))):
+            units.append((unit.source, unit.target))
+            elements.append(unit.xmlelement)
+            # The previous unit is only cleared, the ones before it are gone
+            if len(elements) > 1:
+                assert len(elements[-2]) == 0
+            if len(elements) > 2:
+                assert elements[-3].getparent() is None
+        assert units == [(unit.source, unit.target) for unit in tmxfile.units]
+
+    def test_iterparse_wrong_root(self):
+        """Test that streaming rejects a document that is not TMX"""
+        xlfsource = '<?xml version="1.0"?>\n<xliff version="1.1"><file/></xliff>'
+        with raises(base.ParseError):
+            list(tmx.tmxfile.iterparse(wStringIO.StringIO(xlfsource)))
+
+    def test_incremental_save(self, tmpdir):
+        """Tests that incremental saves keep notes and errors on TMX units."""
+        tmxfilename = str(tmpdir.join("test.tmx"))
+        tmxfile = tmx.tmxfile()
+        tmxfile.addtranslation("One", "en", "Een", "af")
+        tmxfile.addtranslation("Two", "en", "Twee", "af")
+        tmxfile.savefile(tmxfilename)
+        tmxfile = tmx.tmxfile.parsefile(tmxfilename)
+        tmxfile.units[0].addnote("A note")
+        tmxfile.units[1].adderror("sentencecount", "Different sentences")
+        tmxfile.save(incremental=True)
+        newfile = tmx.tmxfile.parsefile(tmxfilename)
+        assert newfile.units[0].getnotes() == "A note"
+        assert newfile.units[1].geterrors() == {
+            "sentencecount": "Different sentences"}
+
+    def test_translate_languages(self):
+        """Tests translating between any of the languages in the units."""
+        tmxsource = '''<?xml version="1.0" encoding="utf-8"?>
+<tmx version="1.4">
+        <header srclang="en"/>
+        <body>
+                <tu>
+                        <tuv xml:lang="en"><seg>File</seg></tuv>
+                        <tuv xml:lang="af"><seg>L\xc3\xaaer</seg></tuv>
+                        <tuv xml:lang="fr"><seg>Fichier</seg></tuv>
+                </tu>
+                <tu>
+                        <tuv xml:lang="en"><seg>Edit</seg></tuv>
+                        <tuv xml:lang="pt_BR"><seg>Editar</seg></tuv>
+                </tu>
+        </body>
+</tmx>'''
+        tmxfile = self.tmxparse(tmxsource)
+        assert tmxfile.translate("File") == u"L\xeaer"
+        assert tmxfile.translate("File", "en", "fr") == u"Fichier"
+        assert tmxfile.translate("L\xc3\xaaer", "af", "fr") == u"Fichier"
+        assert tmxfile.translate("Fichier", "fr", "en") == u"File"
+        assert tmxfile.translate("Edit", "en", "pt-br") == u"Editar"
+        assert tmxfile.translate("Edit", "en", "af") is None
+        assert tmxfile.translate("File", "en") == u"L\xeaer"
+        assert tmxfile.translate("Edit", "en") == u"Editar"
+        assert tmxfile.translate("File", targetlang="fr") == u"Fichier"
+        assert tmxfile.translate("Fichier", "fr") == u"File"
+
+        # The index is updated for new units
+        tmxfile.addtranslation("View", "en", "Aansig", "af")
+        assert tmxfile.translate("View", "en", "af") == u"Aansig"
+
+        # and for changed units
+        tmxfile.units[0].target = u"Lys"
+        assert tmxfile.translate("File") == u"Lys"
+        assert tmxfile.translate("File", "en", "af") == u"Lys"
+        tmxfile.units[0].source = u"Files"
+        assert tmxfile.translate("File") is None
+        assert tmxfile.translate("Files") == u"Lys"
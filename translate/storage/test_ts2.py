@@ -254,3 +254,22 @@ class TestTSfile(test_base.TestTranslationStore):
         """test that ts files are read and output properly"""
         tsfile = ts.tsfile.parsestring(TS_NUMERUS)
         assert str(tsfile) == TS_NUMERUS
+
+    def test_incremental_save(self, tmpdir):
+        """test that an incremental save only rewrites the changed units"""
+        tsfilename = str(tmpdir.join("numerus.ts"))
+        with open(tsfilename, "w") as f:
+            f.write(TS_NUMERUS)
+        tsfile = ts.tsfile.parsefile(tsfilename)
+        tsfile.units[2].target = u"Ouderdom: %1"
+        tsfile.save(incremental=True)
+        expected = TS_NUMERUS.replace(
+            '<translation type="unfinished"></translation>\n    </message>\n    <message id',
+            '<translation type="unfinished">Ouderdom: %1</translation>\n    </message>\n    <message id')
+        assert open(tsfilename).read() == expected
+
+        # Structural changes need the whole file to be written
+        tsfile.settargetlanguage("af")
+        tsfile.units[3].target = u"funksie3"
+        tsfile.save(incremental=True)
+        assert open(tsfilename).read() == str(tsfile)
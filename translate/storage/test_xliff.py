@@ -1,6 +1,7 @@
 #!/usr/bin/env python
 
 from lxml import etree
+from pytest import raises
 
 from translate.storage import lisa, test_base, xliff
 from translate.storage.placeables import StringElem
@@ -48,6 +49,35 @@ class TestXLIFFUnit(test_base.TestTranslationUnit):
         unit.adderror(errorname='test1', errortext='New error 1.')
         assert unit.geterrors()['test1'] == 'New error 1.'
 
+    def test_cached_nodes(self):
+        """Tests that cached elements follow changes to the unit."""
+        unit = self.unit
+        assert unit.target is None
+        unit.target = "Toets"
+        assert unit.target == "Toets"
+        unit.source = "Test"
+        unit.target = "Toets weer"
+        assert unit.source == "Test"
+        assert unit.target == "Toets weer"
+
+        unit.addnote("First", origin="translator")
+        assert unit.getnotes() == "First"
+        unit.removenotes()
+        assert unit.getnotes() == ""
+
+        unit.createcontextgroup("po-entry", [("x-po-trancomment", "Comment")])
+        assert unit.getcontextgroups("po-entry") == [[("x-po-trancomment", "Comment")]]
+        unit.addalttrans("Alternatief")
+        assert [alt.target for alt in unit.getalttrans()] == ["Alternatief"]
+        unit.delalttrans(unit.getalttrans()[0])
+        assert unit.getalttrans() == []
+
+        # Changes made directly to the element are noticed too
+        etree.SubElement(unit.xmlelement, unit.namespaced("note")).text = "Direct"
+        assert unit.getnotes() == "Direct"
+        unit.xmlelement.remove(unit.xmlelement[1])
+        assert unit.target is None
+
 
 class TestXLIFFfile(test_base.TestTranslationStore):
     StoreClass = xliff.xlifffile
@@ -378,3 +408,189 @@ class TestXLIFFfile(test_base.TestTranslationStore):
                </trans-unit>'''
         xlifffile = xliff.xlifffile.parsestring(xlfsource)
         assert xlifffile.units[0].istranslatable()
+
+    def test_multiple_files(self):
+        """Tests adding units to several files in one XLIFF file."""
+        xlifffile = xliff.xlifffile()
+        for filename in ("a.po", "b.po", "a.po", "c.po", "b.po"):
+            xlifffile.addsourceunit("Source", filename=filename,
+                                    createifmissing=True)
+        assert xlifffile.getfilenames() == ["a.po", "b.po", "c.po"]
+        assert [unit.getid() for unit in xlifffile.units] == [
+            u"a.po\x041", u"b.po\x041", u"a.po\x042", u"c.po\x041",
+            u"b.po\x042"]
+        assert xlifffile.addsourceunit("Source", filename="d.po") is None
+
+        # Files renamed or added outside of the store are found too
+        xlifffile.setfilename(xlifffile.getfilenode("c.po"), "d.po")
+        assert xlifffile.getfilenode("c.po") is None
+        assert xlifffile.getfilenode("d.po") is not None
+        xlifffile.getfilenode("a.po").set("original", "e.po")
+        assert xlifffile.getfilenode("a.po") is None
+        assert xlifffile.getfilenode("e.po") is not None
+        filenode = xlifffile.createfilenode("f.po")
+        xlifffile.document.getroot().append(filenode)
+        assert xlifffile.getfilenode("f.po") is filenode
+
+    def test_lazy_units(self):
+        """Tests that units are only created when they are used."""
+        xlfsource = self.skeleton % '''<trans-unit id="1">
+                   <source>One</source>
+               </trans-unit>
+               <trans-unit id="2">
+                   <source>Two</source>
+               </trans-unit>
+               <trans-unit id="3">
+                   <source>Three</source>
+               </trans-unit>'''
+        xlifffile = xliff.xlifffile.parsestring(xlfsource)
+        units = xlifffile.units
+        assert len(units) == 3
+        # Only the first unit was needed to check for a PO header
+        assert etree.iselement(units._items[1])
+        assert etree.iselement(units._items[2])
+
+        unit = xlifffile.findid(u"doc.txt\x042")
+        assert unit.source == u"Two"
+        assert unit is units[1]
+        assert etree.iselement(units._items[2])
+        assert xlifffile.findid(u"doc.txt\x044") is None
+
+        assert [u.source for u in units] == [u"One", u"Two", u"Three"]
+        assert units[1] is unit
+        assert [u.source for u in units[-2:]] == [u"Two", u"Three"]
+        assert [u.source for u in reversed(units)] == [u"Three", u"Two", u"One"]
+
+        newunit = xlifffile.addsourceunit(u"Four", filename="doc.txt")
+        newunit.setid(u"4")
+        assert xlifffile.findid(u"doc.txt\x044") is newunit
+
+    def test_lazy_units_compare(self):
+        """Tests that the list of lazily created units compares units."""
+        xlfsource = self.skeleton % '''<trans-unit id="1">
+                   <source>One</source>
+               </trans-unit>
+               <trans-unit id="2">
+                   <source>Two</source>
+               </trans-unit>
+               <trans-unit id="3">
+                   <source>Two</source>
+               </trans-unit>'''
+        units = xliff.xlifffile.parsestring(xlfsource).units
+        otherunits = xliff.xlifffile.parsestring(xlfsource).units
+        assert xliff.xliffunit(u"Zzz") not in units
+        assert xliff.xliffunit(u"Two") in units
+        assert units.index(otherunits[1]) == 1
+        assert units.index(otherunits[1], 2) == 2
+        with raises(ValueError):
+            units.index(xliff.xliffunit(u"Zzz"))
+        assert units.count(otherunits[2]) == 2
+        assert units == otherunits
+        assert not units != otherunits
+        assert units == list(otherunits)
+        otherunits.remove(xliff.xliffunit(u"Two"))
+        assert [unit.xmlelement.get("id") for unit in otherunits] == ["1", "3"]
+        assert units != otherunits
+
+    def test_lazy_units_operations(self):
+        """Tests that list operations on the lazily created units only give
+        units."""
+        xlfsource = self.skeleton % '''<trans-unit id="1">
+                   <source>Two</source>
+               </trans-unit>
+               <trans-unit id="2">
+                   <source>One</source>
+               </trans-unit>
+               <trans-unit id="3">
+                   <source>Three</source>
+               </trans-unit>'''
+
+        def sources(units):
+            return [unit.source for unit in units]
+        units = xliff.xlifffile.parsestring(xlfsource).units
+        assert not isinstance(units, list)
+        assert sources([] + units) == [u"Two", u"One", u"Three"]
+        assert sources(units + []) == [u"Two", u"One", u"Three"]
+        assert sources(units * 2) == [u"Two", u"One", u"Three"] * 2
+        assert sources(2 * units) == [u"Two", u"One", u"Three"] * 2
+        assert sources(units[1:]) == [u"One", u"Three"]
+        assert sources(list(units)) == [u"Two", u"One", u"Three"]
+        assert sources(sorted(units, key=lambda unit: unit.source)) == \
+                [u"One", u"Three", u"Two"]
+
+        units = xliff.xlifffile.parsestring(xlfsource).units
+        units.sort(key=lambda unit: unit.source)
+        assert sources(units) == [u"One", u"Three", u"Two"]
+
+        units = xliff.xlifffile.parsestring(xlfsource).units
+        extra = xliff.xliffunit(u"Four")
+        units += [extra]
+        units.extend([extra])
+        units.insert(0, extra)
+        units.append(extra)
+        assert sources(units) == [u"Four", u"Two", u"One", u"Three", u"Four",
+                                  u"Four", u"Four"]
+        del units[-3:]
+        units.reverse()
+        assert sources(units) == [u"Three", u"One", u"Two", u"Four"]
+        assert units.pop(0).source == u"Three"
+        units[0] = extra
+        assert sources(units) == [u"Four", u"Two", u"Four"]
+        del units[:]
+        assert len(units) == 0
+
+    def test_lazy_removeunit(self):
+        """Tests that removing a unit doesn't create the other units."""
+        xlfsource = self.skeleton % '''<trans-unit id="1">
+                   <source>One</source>
+               </trans-unit>
+               <trans-unit id="2">
+                   <source>Two</source>
+               </trans-unit>
+               <trans-unit id="3">
+                   <source>Three</source>
+               </trans-unit>'''
+        xlifffile = xliff.xlifffile.parsestring(xlfsource)
+        unit = xlifffile.findid(u"doc.txt\x042")
+        xlifffile.removeunit(unit)
+        assert len(xlifffile.units) == 2
+        assert etree.iselement(xlifffile.units._items[1])
+        with raises(ValueError):
+            xlifffile.removeunit(unit)
+        assert [u.source for u in xlifffile.units] == [u"One", u"Three"]
+        assert "Two" not in str(xlifffile)
+
+    def test_incremental_save(self, tmpdir):
+        """Tests that an incremental save only rewrites the changed units."""
+        unitsource = '''<trans-unit id='1'><source>One</source></trans-unit>
+               <trans-unit id="2">
+                   <source>Two</source>
+               </trans-unit>'''
+        xlffilename = str(tmpdir.join("doc.xlf"))
+        with open(xlffilename, "w") as f:
+            f.write(self.skeleton % unitsource)
+        xlifffile = xliff.xlifffile.parsefile(xlffilename)
+        xlifffile.findid(u"doc.txt\x042").target = u"Twee"
+        xlifffile.save(incremental=True)
+        unitsource = unitsource.replace('''<trans-unit id="2">
+                   <source>Two</source>
+               </trans-unit>''', '''<trans-unit id="2">
+                   <source>Two</source>
+               <target>Twee</target></trans-unit>''')
+        assert open(xlffilename).read() == self.skeleton % unitsource
+
+        # Units are located again after an incremental save
+        xlifffile.findid(u"doc.txt\x041").addnote(u"Note")
+        xlifffile.save(incremental=True)
+        unitsource = unitsource.replace(
+            "<trans-unit id='1'><source>One</source></trans-unit>",
+            '<trans-unit id="1"><source>One</source><note>Note</note></trans-unit>')
+        assert open(xlffilename).read() == self.skeleton % unitsource
+
+        # A unit tag in a comment prevents locating units
+        with open(xlffilename, "w") as f:
+            f.write(self.skeleton % ('<!-- <trans-unit id="0"> -->' + unitsource))
+        xlifffile = xliff.xlifffile.parsefile(xlffilename)
+        xlifffile.units[0].target = u"Een"
+        xlifffile.save(incremental=True)
+        assert open(xlffilename).read() == str(xlifffile)
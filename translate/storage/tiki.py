@@ -81,6 +81,7 @@ class TikiUnit(base.TranslationUnit):
         """
         if location in ['unused', 'untranslated', 'possiblyuntranslated', 'translated']:
             self.location.append(location)
+            self._update_store_index()
 
     def getlocations(self):
         """Returns the a list of the location(s) of the string."""
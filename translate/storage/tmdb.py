@@ -252,8 +252,12 @@ DROP TRIGGER IF EXISTS sources_delete_trig;
 
     def add_store(self, store, source_lang, target_lang, commit=True):
         """insert all units in store in database"""
+        return self.add_units(store.units, source_lang, target_lang, commit)
+
+    def add_units(self, units, source_lang, target_lang, commit=True):
+        """insert all units from the given iterable in database"""
         count = 0
-        for unit in store.units:
+        for unit in units:
             if unit.istranslatable() and unit.istranslated():
                 self.add_unit(unit, source_lang, target_lang, commit=False)
                 count += 1
@@ -23,6 +23,7 @@
 from lxml import etree
 
 from translate import __version__
+from translate.lang import data
 from translate.storage import lisa
 
 
@@ -44,6 +45,12 @@ class tmxunit(lisa.LISAunit):
         seg.text = text
         return langset
 
+    def settarget(self, text, lang='xx', append=False):
+        super(tmxunit, self).settarget(text, lang, append)
+        # The store indexes translations as well
+        self._update_store_index()
+    target = property(lisa.LISAunit.gettarget, settarget)
+
     def getid(self):
         """Returns the identifier for this unit. The optional tuid property is
         used if available, otherwise we inherit .getid(). Note that the tuid
@@ -154,6 +161,68 @@ class tmxfile(lisa.LISAfile):
         lisa.setXMLlang(tuvs.next(), srclang)
         lisa.setXMLlang(tuvs.next(), translang)
 
+    def _gettranslationindex(self, sourcelang, targetlang):
+        """Returns a dictionary of source text to target text for the given
+        pair of languages, over all the units that have both.
+
+        Without languages, the first two languages of the units are used, and
+        without one of them the first other language of every unit. The
+        first unit wins for duplicate source texts, like it does for
+        :meth:`findunit`. Each pair is indexed on first use, and the indexes
+        are dropped when units are added, removed or change their text.
+        """
+        units = self.units
+        cache = getattr(self, "_translationindex", None)
+        if cache is None or cache[0] is not units or cache[1] != len(units):
+            cache = self._translationindex = (units, len(units), {})
+        indexes = cache[2]
+        index = indexes.get((sourcelang, targetlang))
+        if index is None:
+            index = indexes[sourcelang, targetlang] = {}
+            tuvtag = self.namespaced(self.UnitClass.languageNode)
+            segtag = self.namespaced(self.UnitClass.textNode)
+            if isinstance(units, lisa.LazyUnitList):
+                elements = (units.getelement(i) for i in xrange(len(units)))
+            else:
+                elements = (unit.xmlelement for unit in units)
+            for element in elements:
+                xml_space = lisa.getXMLspace(element, self.UnitClass._default_xml_space)
+                texts = []
+                for tuv in element.iterchildren(tuvtag):
+                    seg = tuv.find(".//" + segtag)
+                    if seg is not None:
+                        lang = data.normalize_code(lisa.getXMLlang(tuv) or tuv.get("lang"))
+                        texts.append((lang, lisa.getText(seg, xml_space)))
+                if sourcelang is None and targetlang is None:
+                    if texts:
+                        index.setdefault(texts[0][1], len(texts) > 1 and texts[1][1] or None)
+                    continue
+                # A missing language is the first other language of the unit
+                source = target = None
+                for lang, text in texts:
+                    if source is None and (lang == sourcelang or
+                                           sourcelang is None and lang != targetlang):
+                        source = text
+                    elif target is None and (lang == targetlang or
+                                             targetlang is None and lang != sourcelang):
+                        target = text
+                if source is not None and target is not None:
+                    index.setdefault(source, target)
+        return index
+
+    def update_unit_index(self, unit):
+        self._translationindex = None
+        super(tmxfile, self).update_unit_index(unit)
+
     def translate(self, sourcetext, sourcelang=None, targetlang=None):
-        """method to test old unit tests"""
-        return getattr(self.findunit(sourcetext), "target", None)
+        """Returns the translation of sourcetext, or None.
+
+        If the languages are not given, the first two languages of the units
+        are used. If only one of them is given, the first other language of
+        every unit is used for the other one.
+        """
+        if isinstance(sourcetext, str):
+            sourcetext = sourcetext.decode("utf-8")
+        index = self._gettranslationindex(data.normalize_code(sourcelang),
+                                          data.normalize_code(targetlang))
+        return index.get(sourcetext)
@@ -72,6 +72,7 @@ class tsunit(lisa.LISAunit):
     textNode = ""
     namespace = ''
     rich_parsers = general.parsers
+    _tracksdirty = True
 
     S_OBSOLETE = state.OBSOLETE
     S_UNTRANSLATED = state.EMPTY
@@ -141,6 +142,7 @@ class tsunit(lisa.LISAunit):
         self._rich_target = None
         if self.gettarget() == text:
             return
+        self._markdirty()
         strings = []
         if isinstance(text, multistring):
             strings = text.strings
@@ -194,6 +196,7 @@ class tsunit(lisa.LISAunit):
             note.text = "\n".join(filter(None, [current_notes, text.strip()]))
         else:
             note.text = text.strip()
+        self._markdirty()
 
     def getnotes(self, origin=None):
         # TODO: consider only responding when origin has certain values
@@ -218,6 +221,7 @@ class tsunit(lisa.LISAunit):
             note = self.xmlelement.find(self.namespaced("translatorcomment"))
             if not note is None:
                 self.xmlelement.remove(note)
+        self._markdirty()
 
     def _gettype(self):
         """Returns the type of this translation."""
@@ -234,6 +238,7 @@ class tsunit(lisa.LISAunit):
             # lxml recommends against using .attrib, but there seems to be no
             # other way
             self._gettargetnode().attrib.pop("type")
+        self._markdirty()
 
     def isreview(self):
         """States whether this unit needs to be reviewed"""
@@ -303,6 +308,8 @@ class tsunit(lisa.LISAunit):
         newlocation.set("filename", filename)
         if line is not None:
             newlocation.set("line", line)
+        self._markdirty()
+        self._update_store_index()
 
     def getlocations(self):
         location_tags = self.xmlelement.iterfind(self.namespaced("location"))
@@ -413,6 +420,7 @@ class tsfile(lisa.LISAfile):
         """
         if targetlanguage:
             self.header.set('language', targetlanguage)
+            self._markchanged()
 
     def _createcontext(self, contextname, comment=None):
         """Creates a context node with an optional comment"""
@@ -422,6 +430,7 @@ class tsfile(lisa.LISAfile):
         if comment:
             comment_node = context.SubElement(context, "comment")
             comment_node.text = comment
+        self._markchanged()
         return context
 
     def _getcontextname(self, contextnode):
@@ -479,6 +488,12 @@ class tsfile(lisa.LISAfile):
         else:
             return 1
 
+    def _serializeunit(self, element):
+        # Avoid self-closing tags like __str__ does
+        for e in element.xpath(".//*[not(./node()) and not(text())]"):
+            e.text = ""
+        return super(tsfile, self)._serializeunit(element)
+
     def __str__(self):
         """Converts to a string containing the file's XML."""
         root = self.document.getroot()
@@ -76,6 +76,7 @@ class TxtUnit(base.TranslationUnit):
             source = source.decode(self.encoding)
         self._rich_source = None
         self._source = source
+        self._update_store_index()
 
     def getsource(self):
         """gets the unquoted source string"""
@@ -94,6 +95,7 @@ class TxtUnit(base.TranslationUnit):
 
     def addlocation(self, location):
         self.location.append(location)
+        self._update_store_index()
 
     def getlocations(self):
         return self.location
@@ -139,7 +139,8 @@ class UtxUnit(base.TranslationUnit):
 
     def setsource(self, newsource):
         self._rich_source = None
-        return self._set_field('src', newsource)
+        self._set_field('src', newsource)
+        self._update_store_index()
     source = property(getsource, setsource)
 
     def gettarget(self):
@@ -328,7 +328,8 @@ class WordfastUnit(base.TranslationUnit):
 
     def setsource(self, newsource):
         self._rich_source = None
-        return self._set_source_or_target('source', newsource)
+        self._set_source_or_target('source', newsource)
+        self._update_store_index()
     source = property(getsource, setsource)
 
     def gettarget(self):
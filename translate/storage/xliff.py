@@ -27,7 +27,7 @@ from lxml import etree
 
 from translate.misc.multistring import multistring
 from translate.storage import base, lisa
-from translate.storage.lisa import getXMLspace
+from translate.storage.lisa import getXMLspace, namespaced
 from translate.storage.placeables.lisa import strelem_to_xml, xml_to_strelem
 from translate.storage.workflow import StateEnum as state
 
@@ -52,6 +52,7 @@ class xliffunit(lisa.LISAunit):
     namespace = 'urn:oasis:names:tc:xliff:document:1.1'
 
     _default_xml_space = "default"
+    _tracksdirty = True
 
     # TODO: id and all the trans-unit level stuff
 
@@ -84,6 +85,8 @@ class xliffunit(lisa.LISAunit):
         S_SIGNED_OFF: (state.FINAL, state.MAX),
     }
 
+    _nodecache = None
+
     def __init__(self, source, empty=False, **kwargs):
         """Override the constructor to set xml:space="preserve"."""
         super(xliffunit, self).__init__(source, empty, **kwargs)
@@ -91,6 +94,55 @@ class xliffunit(lisa.LISAunit):
             return
         lisa.setXMLspace(self.xmlelement, "preserve")
 
+    def _getnodecache(self):
+        """Returns the dictionary of element lists cached for this unit.
+
+        The cache is kept until the unit is changed through its methods, or
+        its element gets a different number of children.
+        """
+        xmlelement = self.xmlelement
+        cache = self._nodecache
+        if (cache is None or cache[0] is not xmlelement or
+            cache[1] != len(xmlelement) or cache[2] != self.namespace):
+            cache = (xmlelement, len(xmlelement), self.namespace, {})
+            self._nodecache = cache
+        return cache[3]
+
+    def _getnodes(self, name, descendants=False):
+        """Returns the children (or descendants) of this unit's element with
+        the given name.
+
+        Descendants of plural groups (as used by poxliff) are not cached,
+        since the units inside the group can change them.
+        """
+        cache = self._getnodecache()
+        nodes = cache.get((name, descendants))
+        if nodes is None:
+            xmlelement = self.xmlelement
+            if descendants:
+                nodes = list(xmlelement.iterdescendants(self.namespaced(name)))
+                if xmlelement.tag != self.namespaced(self.rootNode):
+                    return nodes
+            else:
+                nodes = list(xmlelement.iterchildren(self.namespaced(name)))
+            cache[name, descendants] = nodes
+        return nodes
+
+    def _clearnodes(self):
+        """Forgets the element lists cached by :meth:`_getnodes` after a
+        change to the unit."""
+        self._nodecache = None
+        self._markdirty()
+
+    def set_source_dom(self, dom_node):
+        super(xliffunit, self).set_source_dom(dom_node)
+        self._clearnodes()
+    source_dom = property(lisa.LISAunit.get_source_dom, set_source_dom)
+
+    def set_target_dom(self, dom_node, append=False):
+        super(xliffunit, self).set_target_dom(dom_node, append)
+        self._clearnodes()
+
     def createlanguageNode(self, lang, text, purpose):
         """Returns an xml Element setup with given parameters."""
 
@@ -108,19 +160,17 @@ class xliffunit(lisa.LISAunit):
 
     def getlanguageNodes(self):
         """We override this to get source and target nodes."""
-        source = None
-        target = None
-        nodes = []
-        try:
-            source = self.xmlelement.iterchildren(self.namespaced(self.languageNode)).next()
-            target = self.xmlelement.iterchildren(self.namespaced('target')).next()
-            nodes = [source, target]
-        except StopIteration:
-            if source is not None:
-                nodes.append(source)
-            if not target is None:
-                nodes.append(target)
-        return nodes
+        cache = self._getnodecache()
+        nodes = cache.get("languageNodes")
+        if nodes is None:
+            nodes = []
+            try:
+                nodes.append(self.xmlelement.iterchildren(self.namespaced(self.languageNode)).next())
+                nodes.append(self.xmlelement.iterchildren(self.namespaced('target')).next())
+            except StopIteration:
+                pass
+            cache["languageNodes"] = nodes
+        return nodes[:]
 
     def set_rich_source(self, value, sourcelang='en'):
         sourcelanguageNode = self.get_source_dom()
@@ -134,6 +184,7 @@ class xliffunit(lisa.LISAunit):
         sourcelanguageNode.text = None
 
         strelem_to_xml(sourcelanguageNode, value[0])
+        self._markdirty()
 
     def get_rich_source(self):
         #rsrc = xml_to_strelem(self.source_dom)
@@ -164,6 +215,7 @@ class xliffunit(lisa.LISAunit):
         languageNode.text = None
 
         strelem_to_xml(languageNode, value[0])
+        self._markdirty()
         ### currently giving some issues in Virtaal: self._rich_target = value
 
     def get_rich_target(self, lang=None):
@@ -204,12 +256,13 @@ class xliffunit(lisa.LISAunit):
             alttrans.set("origin", origin)
         if lang:
             lisa.setXMLlang(alttrans, lang)
+        self._clearnodes()
 
     def getalttrans(self, origin=None):
         """Returns <alt-trans> for the given origin as a list of units. No
         origin means all alternatives."""
         translist = []
-        for node in self.xmlelement.iterdescendants(self.namespaced("alt-trans")):
+        for node in self._getnodes("alt-trans", descendants=True):
             if self.correctorigin(node, origin):
                 # We build some mini units that keep the xmlelement. This
                 # makes it easier to delete it if it is passed back to us.
@@ -237,6 +290,7 @@ class xliffunit(lisa.LISAunit):
     def delalttrans(self, alternative):
         """Removes the supplied alternative from the list of alt-trans tags"""
         self.xmlelement.remove(alternative.xmlelement)
+        self._clearnodes()
 
     def addnote(self, text, origin=None, position="append"):
         """Add a note specifically in a "note" tag"""
@@ -253,6 +307,7 @@ class xliffunit(lisa.LISAunit):
         note.text = text
         if origin:
             note.set("from", origin)
+        self._clearnodes()
 
     def _getnotelist(self, origin=None):
         """Returns the text from notes matching ``origin`` or all notes.
@@ -262,7 +317,7 @@ class xliffunit(lisa.LISAunit):
         :return: The text from notes matching ``origin``
         :rtype: List
         """
-        note_nodes = self.xmlelement.iterdescendants(self.namespaced("note"))
+        note_nodes = self._getnodes("note", descendants=True)
         # TODO: consider using xpath to construct initial_list directly
         # or to simply get the correct text from the outset (just remember to
         # check for duplication.
@@ -279,10 +334,11 @@ class xliffunit(lisa.LISAunit):
 
     def removenotes(self, origin="translator"):
         """Remove all the translator notes."""
-        notes = self.xmlelement.iterdescendants(self.namespaced("note"))
+        notes = self._getnodes("note", descendants=True)
         for note in notes:
             if self.correctorigin(note, origin=origin):
                 self.xmlelement.remove(note)
+        self._clearnodes()
 
     def adderror(self, errorname, errortext):
         """Adds an error message to this unit."""
@@ -338,6 +394,7 @@ class xliffunit(lisa.LISAunit):
             if targetnode is not None:
                 xmlstate = self.statemap_r.get(value)
                 targetnode.set("state", xmlstate)
+        self._markdirty()
 
         self.markapproved(value > self.S_NEEDS_REVIEW)
 
@@ -351,6 +408,7 @@ class xliffunit(lisa.LISAunit):
             self.xmlelement.set("approved", "yes")
         elif self.isapproved():
             self.xmlelement.set("approved", "no")
+        self._markdirty()
 
     def isreview(self):
         """States whether this unit needs to be reviewed"""
@@ -413,20 +471,26 @@ class xliffunit(lisa.LISAunit):
     def setid(self, id):
         # sanitize id in case ID_SEPERATOR is present
         self.xmlelement.set("id", id.replace(ID_SEPARATOR, ID_SEPARATOR_SAFE))
+        self._markdirty()
+        self._update_store_index()
 
-    def getid(self):
+    @staticmethod
+    def _getelementid(element, namespace):
         uid = u""
         try:
-            filename = self.xmlelement.iterancestors(self.namespaced('file')).next().get('original')
+            filename = element.iterancestors(namespaced(namespace, 'file')).next().get('original')
             if filename:
                 uid = filename + ID_SEPARATOR
         except StopIteration:
             # unit has no proper file ancestor, probably newly created
             pass
         # hide the fact that we sanitize ID_SEPERATOR
-        uid += unicode(self.xmlelement.get("id") or u"").replace(ID_SEPARATOR_SAFE, ID_SEPARATOR)
+        uid += unicode(element.get("id") or u"").replace(ID_SEPARATOR_SAFE, ID_SEPARATOR)
         return uid
 
+    def getid(self):
+        return self._getelementid(self.xmlelement, self.namespace)
+
     def addlocation(self, location):
         self.setid(location)
 
@@ -460,11 +524,12 @@ class xliffunit(lisa.LISAunit):
             context = etree.SubElement(group, self.namespaced("context"))
             context.text = text
             context.set("context-type", type)
+        self._clearnodes()
 
     def getcontextgroups(self, name):
         """Returns the contexts in the context groups with the specified name"""
         groups = []
-        grouptags = self.xmlelement.iterdescendants(self.namespaced("context-group"))
+        grouptags = self._getnodes("context-group", descendants=True)
         # TODO: conbine name in query
         for group in grouptags:
             if group.get("name") == name:
@@ -546,6 +611,8 @@ class xlifffile(lisa.LISAfile):
 
     def __init__(self, *args, **kwargs):
         self._filename = None
+        self._filenodeindex = None
+        self._unitcounts = {}
         lisa.LISAfile.__init__(self, *args, **kwargs)
         self._messagenum = 0
 
@@ -560,6 +627,8 @@ class xlifffile(lisa.LISAfile):
             # by simply using the xmlns default namespace
             self.namespace = self.document.getroot().nsmap.get(None, None)
 
+        self._filenodeindex = None
+        self._unitcounts = {}
         if self._filename:
             filenode = self.getfilenode(self._filename, createifmissing=True)
         else:
@@ -570,6 +639,30 @@ class xlifffile(lisa.LISAfile):
         """Initialise the file header."""
         pass
 
+    def _getfilenodeindex(self):
+        """Returns a dictionary of file names to their file nodes.
+
+        The dictionary is kept up to date by the methods of this class, and
+        is rebuilt if file nodes were added or removed in some other way.
+        """
+        root = self.document.getroot()
+        cache = self._filenodeindex
+        if cache is None or cache[0] is not root or cache[1] != len(root):
+            index = {}
+            for filenode in root.iterchildren(self.namespaced("file")):
+                index.setdefault(self.getfilename(filenode), filenode)
+            cache = self._filenodeindex = (root, len(root), index)
+        return cache[2]
+
+    def _appendfilenode(self, filenode):
+        """Adds filenode to the document, and to the index of file nodes."""
+        index = self._getfilenodeindex()
+        root = self.document.getroot()
+        root.append(filenode)
+        self._markchanged()
+        index.setdefault(self.getfilename(filenode), filenode)
+        self._filenodeindex = (root, len(root), index)
+
     def createfilenode(self, filename, sourcelanguage=None,
                        targetlanguage=None, datatype='plaintext'):
         """creates a filenode with the given filename. All parameters
@@ -580,13 +673,13 @@ class xlifffile(lisa.LISAfile):
             targetlanguage = self.targetlanguage
 
         # find the default NoName file tag and use it instead of creating a new one
-        for filenode in self.document.getroot().iterchildren(self.namespaced("file")):
-            if filenode.get("original") == "NoName":
-                filenode.set("original", filename)
-                filenode.set("source-language", sourcelanguage)
-                if targetlanguage:
-                    filenode.set("target-language", targetlanguage)
-                return filenode
+        filenode = self._getfilenodeindex().get("NoName")
+        if filenode is not None:
+            self.setfilename(filenode, filename)
+            filenode.set("source-language", sourcelanguage)
+            if targetlanguage:
+                filenode.set("target-language", targetlanguage)
+            return filenode
 
         filenode = etree.Element(self.namespaced("file"))
         filenode.set("original", filename)
@@ -603,6 +696,9 @@ class xlifffile(lisa.LISAfile):
 
     def setfilename(self, filenode, filename):
         """set the name of the given file"""
+        self._filenodeindex = None
+        self._unitcounts.pop(self.getfilename(filenode), None)
+        self._markchanged()
         return filenode.set("original", filename)
 
     def getfilenames(self):
@@ -616,10 +712,13 @@ class xlifffile(lisa.LISAfile):
 
     def getfilenode(self, filename, createifmissing=False):
         """finds the filenode with the given name"""
-        filenodes = self.document.getroot().iterchildren(self.namespaced("file"))
-        for filenode in filenodes:
-            if self.getfilename(filenode) == filename:
-                return filenode
+        filenode = self._getfilenodeindex().get(filename)
+        if filenode is not None and self.getfilename(filenode) != filename:
+            # The file was renamed behind our back
+            self._filenodeindex = None
+            filenode = self._getfilenodeindex().get(filename)
+        if filenode is not None:
+            return filenode
         if createifmissing:
             filenode = self.createfilenode(filename)
             return filenode
@@ -641,6 +740,7 @@ class xlifffile(lisa.LISAfile):
             return
         filenode = self.document.getroot().iterchildren(self.namespaced('file')).next()
         filenode.set("source-language", language)
+        self._markchanged()
 
     def getsourcelanguage(self):
         filenode = self.document.getroot().iterchildren(self.namespaced('file')).next()
@@ -652,6 +752,7 @@ class xlifffile(lisa.LISAfile):
             return
         filenode = self.document.getroot().iterchildren(self.namespaced('file')).next()
         filenode.set("target-language", language)
+        self._markchanged()
 
     def gettargetlanguage(self):
         filenode = self.document.getroot().iterchildren(self.namespaced('file')).next()
@@ -699,6 +800,7 @@ class xlifffile(lisa.LISAfile):
                 if (filenode.get("original") == "NoName" and
                     not list(filenode.iterdescendants(self.namespaced(self.UnitClass.rootNode)))):
                     self.document.getroot().remove(filenode)
+                    self._markchanged()
                 break
 
     def getheadernode(self, filenode, createifmissing=False):
@@ -712,6 +814,7 @@ class xlifffile(lisa.LISAfile):
         if not createifmissing:
             return None
         headernode = etree.SubElement(filenode, self.namespaced("header"))
+        self._markchanged()
         return headernode
 
     def getbodynode(self, filenode, createifmissing=False):
@@ -724,6 +827,7 @@ class xlifffile(lisa.LISAfile):
         if not createifmissing:
             return None
         bodynode = etree.SubElement(filenode, self.namespaced("body"))
+        self._markchanged()
         return bodynode
 
     def addsourceunit(self, source, filename="NoName", createifmissing=False):
@@ -738,6 +842,18 @@ class xlifffile(lisa.LISAfile):
         unit.setid("%d" % self._messagenum)
         return unit
 
+    def addunit(self, unit, new=True):
+        super(xlifffile, self).addunit(unit, new)
+        if new:
+            self._countunits(unit.xmlelement)
+
+    def _countunits(self, element):
+        """Adds the trans-units in element to the count of units in the
+        current file."""
+        if self._filename in self._unitcounts:
+            self._unitcounts[self._filename] += \
+                len(list(element.iter(self.namespaced(self.UnitClass.rootNode))))
+
     def switchfile(self, filename, createifmissing=False):
         """Adds the given trans-unit (will create the nodes required if asked).
 
@@ -750,12 +866,14 @@ class xlifffile(lisa.LISAfile):
             if not createifmissing:
                 return False
             filenode = self.createfilenode(filename)
-            self.document.getroot().append(filenode)
+            self._appendfilenode(filenode)
 
         self.body = self.getbodynode(filenode, createifmissing=createifmissing)
         if self.body is None:
             return False
-        self._messagenum = len(list(self.body.iterdescendants(self.namespaced("trans-unit"))))
+        if filename not in self._unitcounts:
+            self._unitcounts[filename] = len(list(self.body.iterdescendants(self.namespaced("trans-unit"))))
+        self._messagenum = self._unitcounts[filename]
         # TODO: was 0 based before - consider
     #    messagenum = len(self.units)
         # TODO: we want to number them consecutively inside a body/file tag
@@ -769,6 +887,7 @@ class xlifffile(lisa.LISAfile):
             if not self.switchfile(filename, createifmissing):
                 return None
         group = etree.SubElement(self.body, self.namespaced("group"))
+        self._markchanged()
         if restype:
             group.set("restype", restype)
         return group
@@ -48,16 +48,16 @@ class Builder:
         self.tmdb.connection.commit()
 
     def handlefile(self, filename):
+        # Streamed files are only parsed while their units are added, so
+        # parse errors can come from add_units. The units of every file are
+        # committed separately, so that those of a bad file can be dropped.
         try:
-            store = factory.getobject(filename)
+            units = factory.iterunits(filename)
+            self.tmdb.add_units(units, self.source_lang, self.target_lang)
         except Exception as e:
-            logger.error(str(e))
+            self.tmdb.connection.rollback()
+            logger.error("cannot process %s: %s", filename, e)
             return
-        # do something useful with the store and db
-        try:
-            self.tmdb.add_store(store, self.source_lang, self.target_lang, commit=False)
-        except Exception as e:
-            print(e)
         print("File added:", filename)
 
     def handlefiles(self, dirname, filenames):
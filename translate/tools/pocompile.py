@@ -35,6 +35,11 @@ def _do_msgidcomment(string):
 class POCompile:
 
     def convertstore(self, inputfile, includefuzzy=False):
+        return str(self.buildstore(inputfile, includefuzzy))
+
+    def buildstore(self, inputfile, includefuzzy=False):
+        """Returns an MO store with the units of inputfile that should be
+        compiled"""
         outputfile = mo.mofile()
         for unit in inputfile.units:
             if unit.istranslated() or (unit.isfuzzy() and includefuzzy and unit.target) or unit.isheader():
@@ -53,7 +58,7 @@ class POCompile:
                         mounit.msgctxt = [context]
                 mounit.target = unit.target
                 outputfile.addunit(mounit)
-        return str(outputfile)
+        return outputfile
 
 
 def convertmo(inputfile, outputfile, templatefile, includefuzzy=False):
@@ -63,12 +68,11 @@ def convertmo(inputfile, outputfile, templatefile, includefuzzy=False):
     if inputstore.isempty():
         return 0
     convertor = POCompile()
-    outputmo = convertor.convertstore(inputstore, includefuzzy)
+    outputmo = convertor.buildstore(inputstore, includefuzzy)
     # We have to make sure that we write the files in binary mode, therefore we
     # reopen the file accordingly
     outputfile.close()
-    outputfile = open(outputfile.name, 'wb')
-    outputfile.write(outputmo)
+    outputmo.savefile(outputfile.name)
     return 1
 
 
@@ -163,7 +163,7 @@ def pretranslate_store(input_store, template_store, tm=None,
     matchers = []
     # prepare template
     if template_store is not None:
-        template_store.makeindex()
+        template_store.require_index()
         # template preparation based on type
         prepare_template = "prepare_template_%s" % template_store.__class__.__name__
         if prepare_template in globals():
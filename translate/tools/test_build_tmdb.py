@@ -0,0 +1,24 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from translate.storage import tmx
+from translate.tools import build_tmdb
+
+
+def test_bad_file_skipped(tmpdir):
+    """checks that the units of a file that can't be parsed are not added"""
+    tmxfile = tmx.tmxfile()
+    tmxfile.addtranslation("Good", "en", "Goed", "af")
+    tmpdir.join("good.tmx").write(str(tmxfile))
+    tmxfile = tmx.tmxfile()
+    tmxfile.addtranslation("Bad", "en", "Sleg", "af")
+    tmxfile.addtranslation("Worse", "en", "Slegter", "af")
+    # The first unit can be streamed before the error is found
+    badsource = str(tmxfile)
+    tmpdir.join("bad.tmx").write(badsource[:badsource.rindex("<tu")])
+
+    builder = build_tmdb.Builder(str(tmpdir.join("tm.db")), "en", "af",
+                                 [str(tmpdir.join("bad.tmx")),
+                                  str(tmpdir.join("good.tmx"))])
+    builder.tmdb.cursor.execute("SELECT text FROM sources")
+    assert builder.tmdb.cursor.fetchall() == [(u"Good",)]